@@ -1,26 +1,15 @@
 import json
-from reportlab.platypus import SimpleDocTemplate
-from layout_lib.renderer import interpret_layout
-from layout_lib.table import build_table, build_data_table
-
-def generate_pdf_from_layout(layout, filename="output.pdf"):
-    doc = SimpleDocTemplate(filename)
-    data_rows = layout.get("data_rows", [])
-    layout_tree = {
-        "type": layout.get("type", "column"),
-        "children": layout.get("children", layout.get("layout", [])),
-        "columns": layout.get("columns", 2)
-    }
-    flowables = interpret_layout(layout_tree, data_rows)
-    doc.build(flowables)
-    print(f"✅ PDF generated: {filename}")
+import logging
+from layout_lib.document import generate_pdf_from_layout
+from layout_lib.sources import open_source
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
     with open("layout.json") as f:
         layout = json.load(f)
-    with open("data/data.json") as f:
-        data = json.load(f)
-    layout["data_rows"] = data
+    # Rows are streamed from the file instead of loaded up front
+    layout["data_rows"] = open_source("data/data.json")
 
     # Load group data from JSON file
     with open("data/group_data2.json") as gf:
@@ -35,7 +24,7 @@ if __name__ == "__main__":
 
     # The table will use negative_filter to exclude objects used by groups
     # No need to manually filter data - the table handles it automatically
-    print(f"📊 Total objects available: {len(data)}")
-    print(f"🔍 Table will automatically exclude objects matching negative_filter")
+    print("📊 Streaming objects from data/data.json")
+    print("🔍 Table will automatically exclude objects matching negative_filter")
 
     generate_pdf_from_layout(layout, "custom_headers_table.pdf")
\ No newline at end of file
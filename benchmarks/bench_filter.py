@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compare the compiled filter engine against the per-row interpreter.
+
+Usage:
+    python benchmarks/bench_filter.py [rows]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_lib.filter_utils import FilterEvaluator, compile_filter
+from layout_lib.filter_index import FilterIndex
+from synthetic import make_rows
+
+FILTERS = {
+    "legacy": "RIC=RIC42.O",
+    "equality": {"Exchange": "NASDAQ"},
+    "comparison": {"Last": {">": 500}},
+    "in": {"Currency": {"in": ["USD", "EUR"]}},
+    "nested": {
+        "or": [
+            {"and": [{"Exchange": "NASDAQ"}, {"Last": {">": 250}}]},
+            {"and": [{"Exchange": "NYSE"}, {"not": {"Currency": "USD"}}]},
+            {"RIC": {"starts_with": "RIC1"}},
+        ]
+    },
+}
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rows = make_rows(rows_count)
+    evaluator = FilterEvaluator(rows)
+
+    print(f"Filtering {rows_count:,} rows")
+    print(f"{'filter':<12} {'interpreted':>12} {'compiled':>12} {'speedup':>8}")
+    for name, condition in FILTERS.items():
+        spec = {"RIC": "RIC42.O"} if isinstance(condition, str) else condition
+
+        def interpreted():
+            return [item for item in rows if evaluator.evaluate_condition(item, spec)]
+
+        def compiled():
+            return compile_filter(condition).filter(rows)
+
+        assert interpreted() == compiled()
+        t_interp = best_of(interpreted)
+        t_compiled = best_of(compiled)
+        print(f"{name:<12} {t_interp:>11.3f}s {t_compiled:>11.3f}s {t_interp / t_compiled:>7.1f}x")
+
+    # Many groups filtering the same dataset, as in a one-group-per-RIC layout
+    groups = [f"RIC=RIC{i * 97}.O" for i in range(50)]
+
+    def scan_groups():
+        return [compile_filter(group).filter(rows) for group in groups]
+
+    def indexed_groups():
+        index = FilterIndex(rows)
+        return [index.filter(group) for group in groups]
+
+    assert scan_groups() == indexed_groups()
+    t_scan = best_of(scan_groups)
+    t_indexed = best_of(indexed_groups)
+    print(f"\n{len(groups)} group filters: scan {t_scan:.3f}s, "
+          f"indexed {t_indexed:.3f}s ({t_scan / t_indexed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
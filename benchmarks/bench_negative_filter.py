@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Scaling of table negative_filter exclusion: the former per-filter
+``obj in filtered_data`` scan against single-pass exclusion.
+
+Usage:
+    python benchmarks/bench_negative_filter.py [max_rows]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_lib.filter_index import FilterIndex
+from layout_lib.filter_utils import apply_filter, exclude_matching
+from synthetic import make_rows
+
+# The legacy path is quadratic, stop timing it past this size
+LEGACY_MAX_ROWS = 10_000
+
+NEGATIVE_FILTERS = (
+    [f"RIC=RIC{i * 13}.O" for i in range(15)]
+    + [
+        {"Exchange": "LSE"},
+        {"Currency": {"in": ["JPY"]}},
+        {"Last": {"<": 10}},
+        {"and": [{"Exchange": "TSE"}, {"Volume1": {">": 40_000_000}}]},
+        {"RIC": {"starts_with": "RIC99"}},
+    ]
+)
+
+
+def legacy_exclude(rows, filters):
+    excluded_indices = set()
+    for filter_condition in filters:
+        filtered_data = apply_filter(rows, filter_condition)
+        for i, obj in enumerate(rows):
+            if obj in filtered_data:
+                excluded_indices.add(i)
+    return [obj for i, obj in enumerate(rows) if i not in excluded_indices]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sizes = [n for n in (1_000, 10_000, 100_000, 1_000_000) if n <= max_rows]
+
+    print(f"{len(NEGATIVE_FILTERS)} negative filters")
+    print(f"{'rows':>10} {'legacy':>10} {'single pass':>12} {'indexed':>10}")
+    for size in sizes:
+        rows = make_rows(size)
+        single, t_single = timed(exclude_matching, rows, NEGATIVE_FILTERS)
+        indexed, t_indexed = timed(
+            lambda r, f: exclude_matching(r, f, FilterIndex(r)), rows, NEGATIVE_FILTERS
+        )
+        assert single == indexed
+        if size <= LEGACY_MAX_ROWS:
+            legacy, t_legacy = timed(legacy_exclude, rows, NEGATIVE_FILTERS)
+            assert legacy == single
+            legacy_text = f"{t_legacy:.3f}s"
+        else:
+            legacy_text = "skipped"
+        print(f"{size:>10,} {legacy_text:>10} {t_single:>11.3f}s {t_indexed:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time of turning source rows into table cells: the former
+apply_transforms + build_data_table pipeline against build_body_rows.
+
+Usage:
+    python benchmarks/bench_table_memory.py [rows]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_lib.field_map import compile_field_map
+from layout_lib.table import build_body_rows, build_data_table
+from layout_lib.transform_utils import apply_transforms
+from synthetic import make_rows
+
+FIELD_MAP = [
+    {
+        "label": "Market Data",
+        "group": True,
+        "children": [
+            {"label": "Ticker", "key": "Ticker"},
+            {"label": "RIC", "key": "RIC"},
+            {"label": "Last", "key": "Last", "transform": "dollarize"},
+            {"label": "Volume", "key": "Volume1", "transform": "volume_millions"},
+        ],
+    },
+    {"label": "Exchange", "key": "Exchange"},
+    {"label": "Currency", "key": "Currency", "transform": "lambda x: x.lower()"},
+]
+
+
+def legacy(rows):
+    return build_data_table(FIELD_MAP, apply_transforms(FIELD_MAP, rows))
+
+
+def single_pass(rows):
+    return compile_field_map(FIELD_MAP).header_rows() + build_body_rows(FIELD_MAP, rows)
+
+
+def measure(func, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    rows_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = make_rows(rows_count)
+    compile_field_map(FIELD_MAP)
+
+    old, t_old, peak_old = measure(legacy, rows)
+    del old
+    new, t_new, peak_new = measure(single_pass, rows)
+    del new
+
+    print(f"Materializing {rows_count:,} rows x {len(compile_field_map(FIELD_MAP).leaves)} columns")
+    print(f"{'pipeline':<28} {'time':>8} {'peak MiB':>9}")
+    print(f"{'apply_transforms+build_data':<28} {t_old:>7.2f}s {peak_old / 2**20:>9.1f}")
+    print(f"{'build_body_rows':<28} {t_new:>7.2f}s {peak_new / 2**20:>9.1f}")
+    print(f"peak reduction: {100 * (1 - peak_new / peak_old):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
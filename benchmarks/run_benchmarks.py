@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the layout pipeline on synthetic datasets.
+
+Times apply_filter, apply_transforms, build_data_table, build_table and
+end-to-end generate_pdf_from_layout (table and grid layouts) over a matrix
+of row counts, column counts, header depths and filter complexities.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1k,10k,100k --save baseline.json
+    python benchmarks/run_benchmarks.py --sizes 1k,10k,100k --compare baseline.json
+
+With --compare, cases slower than the baseline by more than --threshold
+are reported and the script exits with status 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_lib.document import generate_pdf_from_layout
+from layout_lib.field_map import compile_field_map
+from layout_lib.filter_utils import apply_filter
+from layout_lib.logging_utils import disable_logging
+from layout_lib.table import build_data_table, build_table
+from layout_lib.text_metrics import WIDTH_STRATEGIES, estimate_col_widths
+from layout_lib.transform_utils import apply_transforms
+from synthetic import FILTERS, make_field_map, make_grid_layout, make_rows, make_table_layout
+
+
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        multiplier = 1
+        if part.endswith("k"):
+            multiplier, part = 1_000, part[:-1]
+        elif part.endswith("m"):
+            multiplier, part = 1_000_000, part[:-1]
+        sizes.append(int(float(part) * multiplier))
+    return sizes
+
+
+def parse_ints(text):
+    return [int(part) for part in text.split(",")]
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args):
+    results = {}
+
+    def record(name, func, repeat=args.repeat):
+        seconds = best_of(func, repeat)
+        results[name] = seconds
+        print(f"{name:<60} {seconds:>10.4f}s", flush=True)
+
+    tmp = tempfile.mkdtemp(prefix="layout-bench-")
+    for size in args.sizes:
+        for columns in args.columns:
+            rows = make_rows(size, columns)
+            for name, condition in FILTERS.items():
+                record(f"apply_filter/rows={size}/cols={columns}/filter={name}",
+                       lambda: apply_filter(rows, condition))
+
+            for depth in args.depths:
+                field_map = make_field_map(columns, depth)
+                case = f"rows={size}/cols={columns}/depth={depth}"
+                record(f"apply_transforms/{case}", lambda: apply_transforms(field_map, rows))
+
+                transformed = apply_transforms(field_map, rows)
+                record(f"build_data_table/{case}", lambda: build_data_table(field_map, transformed))
+
+                table_data = build_data_table(field_map, transformed)
+                block = {"field_map": field_map, "data_rows": rows, "style": {"font_size": 8}}
+                record(f"build_table/{case}",
+                       lambda: build_table([list(r) for r in table_data], block))
+                for strategy in WIDTH_STRATEGIES:
+                    record(f"column_widths/{case}/strategy={strategy}",
+                           lambda: estimate_col_widths(table_data, depth, "Helvetica-Bold", 8,
+                                                       strategy=strategy))
+
+                if size <= args.e2e_max_rows:
+                    layout = make_table_layout(rows, columns, depth, args.negative_filters)
+                    out = os.path.join(tmp, "table.pdf")
+                    record(f"generate_pdf/table/{case}",
+                           lambda: generate_pdf_from_layout(layout, out), repeat=1)
+
+            if size <= args.e2e_max_rows:
+                for grid_columns in args.grid_columns:
+                    layout = make_grid_layout(rows, grid_columns)
+                    out = os.path.join(tmp, "grid.pdf")
+                    record(f"generate_pdf/grid/rows={size}/cols={columns}/grid={grid_columns}",
+                           lambda: generate_pdf_from_layout(layout, out), repeat=1)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'case':<60} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = seconds / before if before else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<60} {before:>9.4f}s {seconds:>9.4f}s {ratio:>6.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("1k,10k,100k"),
+                        help="row counts, e.g. 1k,10k,100k,1m")
+    parser.add_argument("--columns", type=parse_ints, default=[6, 12], help="value columns per row")
+    parser.add_argument("--depths", type=parse_ints, default=[1, 3], help="field_map header depths")
+    parser.add_argument("--grid-columns", type=parse_ints, default=[3], help="grid layout columns")
+    parser.add_argument("--negative-filters", type=int, default=5,
+                        help="negative filters on end-to-end table layouts")
+    parser.add_argument("--e2e-max-rows", type=parse_sizes, default=[10_000],
+                        help="largest size rendered end-to-end to PDF")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, best is kept")
+    parser.add_argument("--save", help="write results to this baseline file")
+    parser.add_argument("--compare", help="compare against this baseline file")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+    args.e2e_max_rows = args.e2e_max_rows[0]
+
+    disable_logging()
+    # Warm the plan and lambda caches so the first case is not penalized
+    for columns in args.columns:
+        for depth in args.depths:
+            compile_field_map(make_field_map(columns, depth))
+
+    results = run(args)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.2f}x")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
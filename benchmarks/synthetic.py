@@ -0,0 +1,121 @@
+"""
+Synthetic market-data rows, field maps, filters and layouts for benchmarks.
+
+Everything is generated from a seed so runs are comparable.
+"""
+
+import random
+
+EXCHANGES = ["NASDAQ", "NYSE", "COMEX", "LSE", "TSE"]
+CURRENCIES = ["USD", "EUR", "GBP", "JPY"]
+
+# Numeric columns cycled through when more columns are requested
+NUMERIC_COLUMNS = ["Last", "Volume1", "Ask", "Bid", "Volume2", "Volume3", "Volume4", "Volume5"]
+
+
+def make_rows(count, columns=6, seed=7):
+    """
+    Build ``count`` rows with RIC/Ticker/Exchange/Currency plus enough
+    numeric columns to reach ``columns`` value columns in total.
+    """
+    rng = random.Random(seed)
+    numeric = numeric_columns(columns)
+    rows = []
+    for i in range(count):
+        last = round(rng.uniform(1, 1000), 2)
+        row = {
+            "RIC": f"RIC{i}.O",
+            "Ticker": f"T{i}",
+            "Exchange": rng.choice(EXCHANGES),
+            "Currency": rng.choice(CURRENCIES),
+        }
+        for name in numeric:
+            if name.startswith("Volume"):
+                row[name] = rng.randint(1000, 50_000_000)
+            else:
+                row[name] = round(last * rng.uniform(0.99, 1.01), 2)
+        rows.append(row)
+    return rows
+
+
+def numeric_columns(columns):
+    """Names of the numeric columns used for a ``columns``-wide dataset."""
+    count = max(columns - 4, 1)
+    names = []
+    for i in range(count):
+        base = NUMERIC_COLUMNS[i % len(NUMERIC_COLUMNS)]
+        names.append(base if i < len(NUMERIC_COLUMNS) else f"{base}_{i // len(NUMERIC_COLUMNS)}")
+    return names
+
+
+def _leaf(name):
+    if name.startswith("Volume"):
+        return {"label": name, "key": name, "transform": "volume_millions"}
+    if name in ("RIC", "Ticker", "Exchange", "Currency"):
+        return {"label": name, "key": name}
+    return {"label": name, "key": name, "transform": "dollarize"}
+
+
+def make_field_map(columns=6, depth=1):
+    """
+    A field map over ``make_rows(columns=columns)`` with ``depth`` header
+    levels: the leaves are nested in groups of two per extra level.
+    """
+    leaves = [_leaf(name) for name in ["RIC", "Ticker", "Exchange", "Currency"] + numeric_columns(columns)]
+    items = leaves
+    for level in range(depth - 1):
+        items = [
+            {"label": f"Group {level}.{i // 2}", "group": True, "children": items[i:i + 2]}
+            for i in range(0, len(items), 2)
+        ]
+    return items
+
+
+FILTERS = {
+    "simple": "Exchange=NASDAQ",
+    "comparison": {"Last": {">": 500}},
+    "nested": {
+        "or": [
+            {"and": [{"Exchange": "NASDAQ"}, {"Last": {">": 250}}]},
+            {"and": [{"Exchange": "NYSE"}, {"not": {"Currency": "USD"}}]},
+            {"RIC": {"starts_with": "RIC1"}},
+        ]
+    },
+}
+
+
+def make_negative_filters(count):
+    """``count`` negative filters mixing equality and compound conditions."""
+    filters = []
+    for i in range(count):
+        if i % 4 == 3:
+            filters.append({"and": [{"Exchange": EXCHANGES[i % len(EXCHANGES)]}, {"Last": {"<": 5 + i}}]})
+        else:
+            filters.append(f"RIC=RIC{i * 13}.O")
+    return filters
+
+
+def make_table_layout(rows, columns=6, depth=1, negative_filters=0):
+    """A column layout with one table block over ``rows``."""
+    table = {
+        "type": "table",
+        "field_map": make_field_map(columns, depth),
+        "style": {"font_size": 8, "body_font_size": 8, "grid": True},
+    }
+    if negative_filters:
+        table["negative_filter"] = make_negative_filters(negative_filters)
+    return {"type": "column", "children": [table], "data_rows": rows}
+
+
+def make_grid_layout(rows, columns=3):
+    """A grid layout rendering ``columns`` variables per data row."""
+    keys = ["RIC", "Last", "Volume1", "Exchange", "Currency", "Ask", "Bid"]
+    children = []
+    for key in keys[:columns]:
+        child = {"type": "variable", "label": key, "key": key}
+        if key == "Last":
+            child["transform"] = "dollarize"
+        elif key == "Volume1":
+            child["transform"] = "volume_millions"
+        children.append(child)
+    return {"type": "grid", "columns": columns, "children": children, "data_rows": rows}
@@ -0,0 +1,175 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from layout_lib.dataset import MISSING, Dataset, np
+
+AGGREGATE_FUNCTIONS = ("total", "average", "min", "max", "count")
+
+_ALIASES = {"sum": "total", "avg": "average", "mean": "average"}
+
+
+def aggregate_function(name: Any) -> str:
+    """The canonical name of an aggregate function (``sum`` -> ``total``...)."""
+    function = _ALIASES.get(name, name)
+    if function not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"Unsupported aggregate '{name}'. Supported: {', '.join(AGGREGATE_FUNCTIONS)}")
+    return function
+
+
+class Accumulator:
+    """
+    Running count, total, min and max of one field, fed a value at a time
+    (or a whole column) so every aggregate function comes out of one pass.
+
+    ``count`` counts present values (not None, "" or missing); the other
+    functions only see numbers, skipping NaN and bools.
+    """
+
+    __slots__ = ("count", "numbers", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.numbers = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value: Any) -> None:
+        if value is None or value == "" or value is MISSING:
+            return
+        self.count += 1
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+            return
+        self.numbers += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def add_column(self, column: Sequence[Any]) -> None:
+        """Add every value of a Dataset column, reduced in C for numeric arrays."""
+        if np is None or not isinstance(column, np.ndarray) or column.dtype.kind not in "if" or not len(column):
+            for value in column:
+                self.add(value)
+            return
+        self.count += len(column)
+        if column.dtype.kind == "f":
+            column = column[~np.isnan(column)]
+            if not len(column):
+                return
+        self.numbers += len(column)
+        # Back to Python numbers so results format like row values
+        self.total += column.sum().item()
+        low, high = column.min().item(), column.max().item()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def result(self, function: str) -> Any:
+        """The value of an aggregate function, None when there were no numbers."""
+        if function == "count":
+            return self.count
+        if not self.numbers:
+            return None
+        if function == "total":
+            return self.total
+        if function == "average":
+            return self.total / self.numbers
+        return self.min if function == "min" else self.max
+
+
+def aggregate_rows(rows: Iterable[Dict], fields: Sequence[str]) -> Dict[str, Accumulator]:
+    """Accumulate ``fields`` over ``rows`` in a single pass (column-wise for a Dataset)."""
+    accumulators = {field: Accumulator() for field in fields}
+    if isinstance(rows, Dataset):
+        for field, accumulator in accumulators.items():
+            accumulator.add_column(rows.column(field))
+        return accumulators
+    pairs = list(accumulators.items())
+    for row in rows:
+        for field, accumulator in pairs:
+            accumulator.add(row.get(field))
+    return accumulators
+
+
+class FooterRow:
+    """One aggregate footer row of a table block: a label and (column, function) cells."""
+
+    __slots__ = ("label", "cells")
+
+    def __init__(self, label: str, cells: List[Tuple[int, str]]):
+        self.label = label
+        self.cells = cells
+
+
+def footer_rows(layout: Dict, plan) -> List[FooterRow]:
+    """
+    Parse a table block's ``aggregates`` option against its field-map plan.
+
+    Each entry is ``{"label": ..., "columns": {<field_map key>: <function>}}``
+    and becomes one footer row; only single-key columns can be aggregated.
+    """
+    aggregates = layout.get("aggregates") or []
+    if isinstance(aggregates, dict):
+        aggregates = [aggregates]
+    columns = {leaf.key: index for index, leaf in enumerate(plan.leaves)}
+    rows = []
+    for entry in aggregates:
+        if not isinstance(entry, dict) or not isinstance(entry.get("columns"), dict):
+            raise ValueError(f'aggregates entries must be {{"label": ..., "columns": {{...}}}}, got {entry!r}')
+        cells = []
+        for key, function in entry["columns"].items():
+            index = columns.get(key)
+            if index is None or plan.leaves[index].keys:
+                raise ValueError(f"Cannot aggregate '{key}': not a single-key column of the field_map")
+            cells.append((index, aggregate_function(function)))
+        rows.append(FooterRow(str(entry.get("label", "")), cells))
+    return rows
+
+
+def footer_accumulators(footers: List[FooterRow]) -> Dict[int, Accumulator]:
+    """One Accumulator per aggregated column of ``footers``."""
+    return {index: Accumulator() for footer in footers for index, _ in footer.cells}
+
+
+def footer_cells(footers: List[FooterRow], accumulators: Dict[int, Accumulator], plan) -> List[List[Any]]:
+    """
+    The footer rows as table cells. Results go through the column's
+    transform (except counts); the label takes the first column without
+    an aggregate.
+    """
+    width = len(plan.leaves)
+    rows = []
+    for footer in footers:
+        row = [""] * width
+        for index, function in footer.cells:
+            value = accumulators[index].result(function)
+            if value is None:
+                continue
+            row[index] = str(value) if function == "count" else plan.leaves[index].format(value)
+        used = {index for index, _ in footer.cells}
+        label_index = next((i for i in range(width) if i not in used), None)
+        if label_index is not None:
+            row[label_index] = footer.label
+        rows.append(row)
+    return rows
+
+
+def variable_aggregate(block: Dict) -> Optional[str]:
+    """The aggregate function of a variable block, None for a plain variable."""
+    name = block.get("aggregate")
+    if name is None:
+        return None
+    if "|" in (block.get("key") or ""):
+        raise ValueError(f"Variable '{block.get('key')}' cannot aggregate several keys")
+    return aggregate_function(name)
+
+
+def aggregate_fields(node: Dict) -> List[str]:
+    """The fields aggregated by the variable blocks under a container."""
+    fields = []
+    for block in node.get("children", []):
+        if "children" in block:
+            fields.extend(aggregate_fields(block))
+        elif block.get("type") == "variable" and block.get("aggregate") is not None and block.get("key"):
+            fields.append(block["key"])
+    return list(dict.fromkeys(fields))
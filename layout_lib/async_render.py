@@ -0,0 +1,164 @@
+from typing import Any, Dict, Optional, Union
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from layout_lib.compiled_layout import CompiledLayout
+from layout_lib.document import pdf_bytes_from_layout, write_pdf
+from layout_lib.logging_utils import get_logger
+from layout_lib.sources import IterableSource, as_rows
+
+logger = get_logger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class RenderQueueFull(Exception):
+    """Raised by ``AsyncRenderer.render`` when ``wait`` is False and no slot is free."""
+
+
+def _render_layout(layout: Dict, group_context: Optional[Dict]) -> bytes:
+    # Module level so process pools can pickle it
+    return pdf_bytes_from_layout(layout, group_context=group_context)
+
+
+def _render_compiled(compiled: CompiledLayout, data: Any, group_context: Optional[Dict]) -> bytes:
+    return compiled.render(data, group_context)
+
+
+class AsyncRenderer:
+    """
+    Renders layouts from asyncio code without blocking the event loop.
+
+    Loading, filtering, layout and ``doc.build`` all run on a bounded
+    executor. At most ``max_pending`` renders are admitted at once
+    (running or queued in the executor); further callers wait for a slot,
+    which is the backpressure, or fail fast with ``wait=False``.
+
+    Cancelling a caller (or hitting its timeout) drops a render that has
+    not started yet. A render already running on a worker cannot be
+    interrupted: it finishes in the background and keeps its slot until
+    then, so the limit always reflects the real load.
+
+    Args:
+        executor: "thread" (default), "process", or an Executor to use
+            (not shut down by ``close``)
+        max_workers: Worker count of the executor created here
+        max_pending: Admitted renders; defaults to twice the worker count
+        timeout: Default per-render timeout in seconds, None for no limit
+
+    Process pools need a picklable layout and data (file paths are read in
+    the worker) and cannot render a CompiledLayout; threads can, and share
+    its precomputed state.
+    """
+
+    def __init__(self, executor: Union[str, Executor] = "thread", max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, timeout: Optional[float] = None):
+        if isinstance(executor, Executor):
+            self.executor = executor
+            self._owns_executor = False
+            self.kind = "process" if isinstance(executor, ProcessPoolExecutor) else "thread"
+        elif executor in EXECUTOR_KINDS:
+            pool = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+            self.executor = pool(max_workers=max_workers)
+            self._owns_executor = True
+            self.kind = executor
+        else:
+            raise ValueError(f"Unsupported executor '{executor}'. Supported: {', '.join(EXECUTOR_KINDS)}")
+
+        workers = getattr(self.executor, "_max_workers", None) or max_workers or 1
+        self.max_pending = max_pending if max_pending is not None else 2 * workers
+        if self.max_pending < 1:
+            raise ValueError(f"max_pending must be positive, got {self.max_pending!r}")
+        self.timeout = timeout
+        self.pending = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def render(self, layout: Union[Dict, CompiledLayout], out: Any = None,
+                     group_context: Optional[Dict] = None, data: Any = None,
+                     timeout: Optional[float] = None, wait: bool = True) -> Optional[bytes]:
+        """
+        Render a layout dict (with its ``data_rows``) or a CompiledLayout.
+
+        Args:
+            layout: The layout dict or a CompiledLayout
+            out: File path or binary file-like object written off the event
+                loop; None returns the PDF bytes
+            group_context: Optional data per group name
+            data: ``data_rows`` overriding the layout's own; may also be an
+                async iterable of rows, collected without blocking
+            timeout: Seconds before giving up, overriding the default
+            wait: Wait for a free slot; False raises RenderQueueFull instead
+
+        Returns:
+            The PDF bytes when ``out`` is None, otherwise None
+
+        Raises:
+            asyncio.TimeoutError: The render did not finish within ``timeout``
+        """
+        timeout = self.timeout if timeout is None else timeout
+        slots = self._semaphore()
+        if not wait and slots.locked():
+            raise RenderQueueFull(f"{self.max_pending} renders already pending")
+        await slots.acquire()
+
+        loop = asyncio.get_running_loop()
+        try:
+            if data is not None or not isinstance(layout, CompiledLayout):
+                data = await self._collect(layout.get("data_rows") if data is None else data)
+            if isinstance(layout, CompiledLayout):
+                if self.kind == "process":
+                    raise TypeError("A CompiledLayout can only be rendered on a thread executor")
+                future = self.executor.submit(_render_compiled, layout, data, group_context)
+            else:
+                future = self.executor.submit(_render_layout, dict(layout, data_rows=data), group_context)
+        except BaseException:
+            slots.release()
+            raise
+
+        # The slot is held until the worker is done with it, even when the
+        # caller stops waiting
+        self.pending += 1
+        future.add_done_callback(lambda _: self._release(loop, slots))
+        pdf = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        if out is None:
+            return pdf
+        await asyncio.to_thread(write_pdf, pdf, out)
+        return None
+
+    async def _collect(self, data: Any) -> Any:
+        """Make ``data_rows`` safe to hand to a worker."""
+        if hasattr(data, "__aiter__"):
+            return [row async for row in data]
+        rows = as_rows(data)
+        if isinstance(rows, IterableSource):
+            # Iterators may block and cannot be pickled; drain them off the loop
+            return await asyncio.to_thread(list, rows)
+        return data
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            # Created lazily so it binds to the loop that first renders
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    def _release(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore) -> None:
+        def release():
+            self.pending -= 1
+            slots.release()
+
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # The loop is already closed; nobody is waiting for the slot
+            pass
+
+    def close(self, wait: bool = True) -> None:
+        """Shut down the executor created by this renderer."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncRenderer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.to_thread(self.close)
@@ -0,0 +1,295 @@
+"""
+Mail-merge rendering: one layout, one PDF per partition of a dataset.
+
+    python -m layout_lib.batch layout.json data/group_data2.json --key RIC \
+        --table-data data/data.json --out-dir out --workers 4
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from layout_lib.document import generate_pdf_from_layout
+from layout_lib.field_map import compile_field_map
+from layout_lib.logging_utils import get_logger
+from layout_lib.sources import FileSource, as_rows, open_source
+from layout_lib.styles import body_text_style
+from layout_lib.text_metrics import DEFAULT_CELL_FONT, char_widths
+
+logger = get_logger(__name__)
+
+DEFAULT_FILENAME_PATTERN = "{value}.pdf"
+
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]+")
+
+
+class DocumentResult:
+    """Outcome of rendering one partition."""
+
+    __slots__ = ("value", "path", "rows", "seconds", "error")
+
+    def __init__(self, value: Any, path: str, rows: int, seconds: float = 0.0, error: Optional[str] = None):
+        self.value = value
+        self.path = path
+        self.rows = rows
+        self.seconds = seconds
+        # Formatted traceback when rendering failed
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BatchReport:
+    """Per-document results of a batch, in partition order."""
+
+    def __init__(self, documents: List[DocumentResult], seconds: float, unpartitioned: int = 0):
+        self.documents = documents
+        self.seconds = seconds
+        # Rows skipped because they have no value for the partition key
+        self.unpartitioned = unpartitioned
+
+    @property
+    def failures(self) -> List[DocumentResult]:
+        return [doc for doc in self.documents if not doc.ok]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "documents": [doc.to_dict() for doc in self.documents],
+            "seconds": self.seconds,
+            "succeeded": len(self.documents) - len(self.failures),
+            "failed": len(self.failures),
+            "unpartitioned": self.unpartitioned,
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), default=str, **kwargs)
+
+
+def partition_rows(rows: Iterable[Dict], key: str):
+    """
+    Split rows by their ``key`` value in a single pass.
+
+    Returns an OrderedDict of value -> rows (in first-appearance order) and
+    the number of rows without a value for ``key``.
+    """
+    partitions: "OrderedDict[Any, List[Dict]]" = OrderedDict()
+    missing = 0
+    for row in rows:
+        value = row.get(key)
+        if value is None:
+            missing += 1
+            continue
+        bucket = partitions.get(value)
+        if bucket is None:
+            bucket = partitions[value] = []
+        bucket.append(row)
+    return partitions, missing
+
+
+def document_filename(pattern: str, value: Any, index: int) -> str:
+    """Output file name for one partition; ``{value}`` is made filesystem safe."""
+    return pattern.format(value=_UNSAFE_FILENAME.sub("_", str(value)), index=index)
+
+
+def unique_paths(paths: List[str]) -> List[str]:
+    """
+    ``paths`` with later duplicates renamed ``<name>-<index><ext>``, so
+    partition values that clean up to the same file name (``a/b`` and
+    ``a_b``) never overwrite each other. Names are compared case-insensitively
+    for case-insensitive file systems.
+    """
+    seen = set()
+    unique = []
+    for index, path in enumerate(paths):
+        candidate = path
+        root, ext = os.path.splitext(path)
+        suffix = index
+        while candidate.casefold() in seen:
+            candidate = f"{root}-{suffix}{ext}"
+            suffix += 1
+        if candidate != path:
+            logger.warning("Output file %s is already used by another partition; writing %s", path, candidate)
+        seen.add(candidate.casefold())
+        unique.append(candidate)
+    return unique
+
+
+def _group_names(layout: Dict) -> List[str]:
+    names = []
+    for block in layout.get("children", layout.get("layout", [])):
+        if block.get("type") == "group" and block.get("group_name"):
+            names.append(block["group_name"])
+        elif "children" in block:
+            names.extend(_group_names(block))
+    return names
+
+
+def _table_blocks(layout: Dict):
+    for block in layout.get("children", layout.get("layout", [])):
+        if block.get("type") == "table":
+            yield block
+        elif "children" in block:
+            yield from _table_blocks(block)
+
+
+# Per-process state set once by _init_worker, so tasks only carry their partition
+_worker_layout: Optional[Dict] = None
+_worker_shared_rows: Any = None
+_worker_groups: List[str] = []
+
+
+def _init_worker(layout: Dict, shared_rows: Any, groups: List[str]) -> None:
+    """Load the layout once per process and warm the caches every document uses."""
+    global _worker_layout, _worker_shared_rows, _worker_groups
+    _worker_layout = layout
+    # Shared table files are read once per process, not once per document
+    _worker_shared_rows = list(shared_rows) if isinstance(shared_rows, FileSource) else shared_rows
+    _worker_groups = groups
+
+    body_text_style()
+    fonts = {DEFAULT_CELL_FONT}
+    for block in _table_blocks(layout):
+        compile_field_map(block["field_map"])
+        fonts.add(block.get("style", {}).get("font_name", "Helvetica"))
+    for font in fonts:
+        try:
+            widths = char_widths(font)
+            for char in map(chr, range(32, 127)):
+                widths[char]
+        except Exception:
+            # Unknown or unregistered font: the render reports it
+            pass
+
+
+def _render_document(value: Any, rows: List[Dict], path: str) -> DocumentResult:
+    start = time.perf_counter()
+    try:
+        group_context = {name: rows for name in _worker_groups}
+        data_rows = _worker_shared_rows if _worker_shared_rows is not None else rows
+        generate_pdf_from_layout(dict(_worker_layout, data_rows=data_rows), path, group_context=group_context)
+    except Exception:
+        return DocumentResult(value, path, len(rows), time.perf_counter() - start, traceback.format_exc())
+    return DocumentResult(value, path, len(rows), time.perf_counter() - start)
+
+
+def render_batch(
+    layout: Dict,
+    rows: Iterable[Dict],
+    key: str,
+    out_dir: str = ".",
+    data_rows: Any = None,
+    filename_pattern: str = DEFAULT_FILENAME_PATTERN,
+    workers: Optional[int] = None,
+) -> BatchReport:
+    """
+    Render ``layout`` once per distinct ``key`` value of ``rows``.
+
+    Each document gets its partition as the data of every group block in
+    the layout (group ``filter``s are not evaluated). Its ``data_rows`` are
+    ``data_rows`` if given, else the layout's own ``data_rows``, else the
+    partition itself.
+
+    Args:
+        layout: The layout dict (loaded once per worker process)
+        rows: Rows to partition (list, iterable, RowSource or file path)
+        key: Field whose value selects the partition, e.g. "RIC"
+        out_dir: Directory for the PDFs (created if missing)
+        data_rows: Table data shared by every document
+        filename_pattern: ``str.format`` pattern with ``{value}`` and ``{index}``
+        workers: Process count; 0 renders in this process, None uses all CPUs
+
+    Returns:
+        A BatchReport; failures are reported there, never raised
+    """
+    start = time.perf_counter()
+    partitions, missing = partition_rows(as_rows(rows), key)
+    if missing:
+        logger.warning("%d rows have no '%s' value and were skipped", missing, key)
+
+    shared_rows = data_rows if data_rows is not None else layout.get("data_rows")
+    # Shared rows travel to each worker once, separately from the layout
+    layout = {k: v for k, v in layout.items() if k != "data_rows"}
+    groups = _group_names(layout)
+    os.makedirs(out_dir, exist_ok=True)
+    # Every path is known before any document is written
+    paths = unique_paths([os.path.join(out_dir, document_filename(filename_pattern, value, index))
+                          for index, value in enumerate(partitions)])
+    tasks = [(value, part, path) for (value, part), path in zip(partitions.items(), paths)]
+
+    results: List[Optional[DocumentResult]] = [None] * len(tasks)
+    if workers == 0:
+        _init_worker(layout, shared_rows, groups)
+        for index, task in enumerate(tasks):
+            results[index] = _render_document(*task)
+            _log_result(results[index])
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(layout, shared_rows, groups)) as executor:
+            futures = {executor.submit(_render_document, *task): index for index, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception:
+                    # The worker itself died (e.g. BrokenProcessPool)
+                    value, part, path = tasks[index]
+                    results[index] = DocumentResult(value, path, len(part), error=traceback.format_exc())
+                _log_result(results[index])
+
+    report = BatchReport(results, time.perf_counter() - start, missing)
+    logger.info("Batch rendered %d documents (%d failed) in %.2fs",
+                len(report.documents), len(report.failures), report.seconds)
+    return report
+
+
+def _log_result(result: DocumentResult) -> None:
+    if result.ok:
+        logger.info("Rendered %s (%d rows) in %.3fs", result.path, result.rows, result.seconds)
+    else:
+        logger.warning("Failed to render %s:\n%s", result.path, result.error)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("layout", help="layout JSON file")
+    parser.add_argument("data", help="rows to partition (.json, .jsonl/.ndjson or .csv)")
+    parser.add_argument("--key", required=True, help="partition field, e.g. RIC")
+    parser.add_argument("--table-data", help="table data shared by every document")
+    parser.add_argument("--out-dir", default="out", help="output directory")
+    parser.add_argument("--pattern", default=DEFAULT_FILENAME_PATTERN, help="file name pattern")
+    parser.add_argument("--workers", type=int, default=None, help="processes (0 = in-process)")
+    parser.add_argument("--report", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    with open(args.layout) as f:
+        layout = json.load(f)
+    # Partitions are sent to workers, so they are held in memory here anyway
+    rows = list(open_source(args.data))
+    table_data = open_source(args.table_data) if args.table_data else None
+
+    report = render_batch(layout, rows, args.key, args.out_dir, table_data, args.pattern, args.workers)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report.to_json(indent=2))
+    for doc in report.failures:
+        print(f"FAILED {doc.value}: {doc.error.strip().splitlines()[-1]}", file=sys.stderr)
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
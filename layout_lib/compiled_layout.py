@@ -0,0 +1,159 @@
+from copy import deepcopy
+from typing import Any, Dict, Optional
+from layout_lib.aggregates import variable_aggregate
+from layout_lib.document import PDF_CHUNK_SIZE, iter_chunks, layout_tree, render_pdf
+from layout_lib.field_map import compile_field_map
+from layout_lib.filter_utils import compile_filter
+from layout_lib.logging_utils import get_logger
+from layout_lib.renderer import separator_args
+from layout_lib.separator import Separator
+from layout_lib.sqlite_source import SqliteSource
+from layout_lib.styles import body_text_style
+from layout_lib.table import TableOptions
+from layout_lib.transform_utils import resolve_transform
+
+logger = get_logger(__name__)
+
+LAYOUT_TYPES = ("column", "row", "grid")
+BLOCK_TYPES = ("table", "separator", "variable", "group")
+
+
+class PreparedBlock:
+    """The data-independent parts of one block, computed by ``compile_layout``."""
+
+    __slots__ = ("table_options", "negative_filter", "separator_args", "transform", "style", "aggregate")
+
+    def __init__(self):
+        self.table_options = None
+        self.negative_filter = None
+        self.separator_args = None
+        self.transform = None
+        self.style = None
+        self.aggregate = None
+
+
+class CompiledLayout:
+    """
+    A validated layout with everything that does not depend on the data
+    worked out once: field-map plans, table styles, fonts and colors,
+    compiled filters, resolved transforms and separator settings.
+
+    Group data is data: unless ``render`` is given a ``group_context``,
+    every render resolves the group blocks again, so a SqliteSource (or a
+    list edited in place) is read as it is at render time.
+
+    ``render`` never modifies the compiled state, so one instance can be
+    shared between threads and reused for any number of renders. The
+    layout's options are deep-copied at compile time, so later edits to
+    the original dict are not seen (compile again instead); block ``data``
+    is shared, not copied.
+    """
+
+    def __init__(self, layout: Dict):
+        self.tree = _copy_tree(layout_tree(layout))
+        self.data_rows = layout.get("data_rows")
+        self.prepared: Dict[int, PreparedBlock] = {}
+        self._prepare_container(self.tree)
+
+    def render(self, data: Any = None, group_context: Optional[Dict] = None, out: Any = None, stats=None):
+        """
+        Render the layout to a PDF.
+
+        Args:
+            data: The ``data_rows`` (anything generate_pdf_from_layout accepts);
+                defaults to the layout's own ``data_rows``
+            group_context: Data per group name; by default the group blocks
+                are resolved from their data and filters for this render
+            out: File path or binary file-like object (written in chunks);
+                None returns bytes
+            stats: Optional RenderStats for this render
+
+        Returns:
+            The PDF bytes when ``out`` is None, otherwise None
+        """
+        if data is None:
+            data = self.data_rows
+        context = {} if group_context is None else dict(group_context)
+        return render_pdf(self.tree, data, out, stats, context, self.prepared)
+
+    def iter_render(self, data: Any = None, group_context: Optional[Dict] = None,
+                    chunk_size: int = PDF_CHUNK_SIZE, stats=None):
+        """
+        Like ``render`` to bytes, but yield the PDF in pieces of at most
+        ``chunk_size`` bytes for a streaming response. Rendering starts
+        when the first piece is requested.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size!r}")
+
+        def stream():
+            yield from iter_chunks(self.render(data, group_context, None, stats), chunk_size)
+
+        return stream()
+
+    def _prepare_container(self, node: Dict) -> None:
+        layout_type = node.get("type", "column")
+        if layout_type not in LAYOUT_TYPES:
+            raise ValueError(f"Unsupported layout type '{layout_type}'. Supported types are: {', '.join(LAYOUT_TYPES)}")
+        for block in node.get("children", []):
+            if "children" in block:
+                self._prepare_container(block)
+            else:
+                self._prepare_block(block)
+
+    def _prepare_block(self, block: Dict) -> None:
+        block_type = block.get("type")
+        prep = PreparedBlock()
+
+        if block_type == "table":
+            if "field_map" not in block:
+                raise ValueError("Table block is missing 'field_map'")
+            plan = compile_field_map(block["field_map"])
+            try:
+                prep.table_options = TableOptions(block, plan.depth)
+            except AttributeError as e:
+                raise ValueError(f"Unknown color in table style: {e}") from e
+            negative_filter = block.get("negative_filter")
+            if negative_filter:
+                conditions = negative_filter if isinstance(negative_filter, list) else [negative_filter]
+                prep.negative_filter = [_compile_condition(c) for c in conditions]
+
+        elif block_type == "separator":
+            prep.separator_args = separator_args(block)
+            Separator(*prep.separator_args)  # validates the direction
+
+        elif block_type == "variable":
+            prep.transform = resolve_transform(block.get("transform"))
+            prep.style = body_text_style()
+            prep.aggregate = variable_aggregate(block)
+
+        elif block_type == "group":
+            if isinstance(block.get("data"), (list, SqliteSource)) and not block.get("filter"):
+                raise ValueError(f"Group '{block.get('group_name')}' is a list but missing 'filter' field.")
+            if block.get("filter"):
+                _compile_condition(block["filter"])
+
+        else:
+            raise ValueError(f"Unsupported block type '{block_type}'. Supported: {', '.join(BLOCK_TYPES)}")
+
+        self.prepared[id(block)] = prep
+
+
+def _compile_condition(condition):
+    try:
+        return compile_filter(condition)
+    except Exception as e:
+        raise ValueError(f"Invalid filter {condition!r}: {e}") from e
+
+
+def _copy_tree(node: Dict) -> Dict:
+    """Deep-copy a layout node so the compiled tree cannot change under us, sharing block ``data``."""
+    copy = {key: value if key == "data" else deepcopy(value) for key, value in node.items() if key != "children"}
+    if "children" in node:
+        copy["children"] = [_copy_tree(child) for child in node["children"]]
+    return copy
+
+
+def compile_layout(layout: Dict) -> CompiledLayout:
+    """Validate ``layout`` and precompute everything independent of the data."""
+    return CompiledLayout(layout)
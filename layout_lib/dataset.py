@@ -0,0 +1,369 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from itertools import compress
+
+from layout_lib.filter_utils import OPERATORS, _freeze, compile_filter
+from layout_lib.sources import RowSource
+from layout_lib.transform_utils import dollarize, volume_millions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+
+class _Missing:
+    """Marks a key absent from a row (``row.get`` gives None, cells give "")."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+_NUMERIC_OPS = {
+    "=": lambda column, value: column == value,
+    "!=": lambda column, value: column != value,
+    ">": lambda column, value: column > value,
+    ">=": lambda column, value: column >= value,
+    "<": lambda column, value: column < value,
+    "<=": lambda column, value: column <= value,
+}
+
+
+def _is_number(value: Any) -> bool:
+    # bool included: Python and NumPy both treat True == 1
+    return isinstance(value, (int, float))
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float))
+
+
+def _as_array(values: List[Any]) -> Union[List[Any], Any]:
+    """
+    A NumPy array for all-int, all-float or all-str columns, else the list.
+
+    Mixed int/float columns stay lists so every value keeps its Python type
+    (an int must still render as "5", not "5.0"). String columns become
+    object arrays, which compare and slice without a Python-level loop.
+    """
+    if np is None or not values:
+        return values
+    kinds = {type(v) for v in values}
+    if kinds == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            return values
+    if kinds == {float}:
+        return np.array(values, dtype=np.float64)
+    if kinds == {str}:
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    return values
+
+
+class Dataset(RowSource):
+    """
+    Column-oriented table of rows.
+
+    Homogeneous int or float columns are stored as NumPy arrays when NumPy
+    is installed; every other column (and every column without NumPy) is a
+    plain list. Filters evaluate to boolean masks, numeric comparisons a
+    whole column at a time, and tables are built from column slices. The
+    dataset is also iterable as row dicts, so it works anywhere
+    ``data_rows`` is accepted.
+
+    Args:
+        columns: Mapping of column name to equal-length arrays or lists
+    """
+
+    def __init__(self, columns: Dict[str, Sequence[Any]]):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Dataset columns have different lengths: {sorted(lengths)}")
+        self.columns = dict(columns)
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], numeric: bool = True) -> "Dataset":
+        """
+        Build a dataset from row dicts in one pass. Keys absent from a row
+        are recorded as MISSING; with ``numeric`` False no arrays are made.
+        """
+        columns: Dict[str, List[Any]] = {}
+        count = 0
+        for row in rows:
+            for key, value in row.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [MISSING] * count
+                column.append(value)
+            count += 1
+            for column in columns.values():
+                if len(column) < count:
+                    column.append(MISSING)
+        if numeric:
+            columns = {key: _as_array(values) for key, values in columns.items()}
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __repr__(self) -> str:
+        return f"Dataset({self._length} rows, columns={list(self.columns)})"
+
+    def __iter__(self) -> Iterator[Dict]:
+        names = list(self.columns)
+        values = [self.values(name, MISSING) for name in names]
+        for row_values in zip(*values):
+            yield {name: value for name, value in zip(names, row_values) if value is not MISSING}
+
+    def column(self, name: str) -> Sequence[Any]:
+        """The stored column (array or list); absent columns are all MISSING."""
+        column = self.columns.get(name)
+        if column is None:
+            return [MISSING] * self._length
+        return column
+
+    def values(self, name: str, default: Any = None) -> List[Any]:
+        """Column ``name`` as Python values, with ``default`` for missing keys."""
+        column = self.column(name)
+        if np is not None and isinstance(column, np.ndarray):
+            return column.tolist()
+        if default is MISSING:
+            return list(column)
+        return [default if v is MISSING else v for v in column]
+
+    def take(self, mask: Sequence[bool]) -> "Dataset":
+        """The rows where ``mask`` is true, in order."""
+        columns = {}
+        for name, column in self.columns.items():
+            if np is not None and isinstance(column, np.ndarray):
+                columns[name] = column[np.asarray(mask, dtype=bool)]
+            else:
+                columns[name] = list(compress(column, mask))
+        return Dataset(columns)
+
+    def select(self, positions: Sequence[int]) -> "Dataset":
+        """The rows at ``positions``, in the given order."""
+        columns = {}
+        for name, column in self.columns.items():
+            if np is not None and isinstance(column, np.ndarray):
+                columns[name] = column[np.asarray(positions, dtype=np.intp)]
+            else:
+                columns[name] = [column[i] for i in positions]
+        return Dataset(columns)
+
+    def partition(self, names: Sequence[str]) -> List[Tuple[Any, "Dataset"]]:
+        """
+        Split the rows by their values of ``names`` (a tuple of values when
+        there are several, None for missing keys), partitions in order of
+        first appearance.
+        """
+        keys = [self.values(name) for name in names]
+        keys = keys[0] if len(names) == 1 else list(zip(*keys))
+        return [(key, self.select(positions)) for key, positions in group_positions(keys)]
+
+    def mask(self, condition: Union[str, Dict]) -> Sequence[bool]:
+        """Boolean mask of the rows matching ``condition``."""
+        everything = _full(self._length, True)
+        return _evaluate(self, compile_filter(condition).node, everything)
+
+    def filter(self, condition: Union[str, Dict]) -> "Dataset":
+        """The rows matching ``condition`` (same semantics as ``apply_filter``)."""
+        return self.take(self.mask(condition))
+
+    def exclude(self, conditions: Union[str, Dict, List]) -> "Dataset":
+        """The rows matching none of ``conditions`` (like ``exclude_matching``)."""
+        if not isinstance(conditions, list):
+            conditions = [conditions]
+        keep = _full(self._length, True)
+        for condition in conditions:
+            matched = _evaluate(self, compile_filter(condition).node, keep)
+            keep = _and_not(keep, matched)
+        return self.take(keep)
+
+
+def group_positions(keys: Iterable[Any]) -> List[Tuple[Any, List[int]]]:
+    """
+    ``(key, positions)`` for each distinct key, in order of first appearance,
+    hashed in one pass. Unhashable keys are grouped by content.
+    """
+    groups: Dict[Any, Tuple[Any, List[int]]] = {}
+    for position, key in enumerate(keys):
+        try:
+            group = groups.get(key)
+            hashed = key
+        except TypeError:
+            hashed = ("unhashable", _freeze(key))
+            group = groups.get(hashed)
+        if group is None:
+            group = groups[hashed] = (key, [])
+        group[1].append(position)
+    return list(groups.values())
+
+
+# Mask helpers: NumPy bool arrays when available, lists of bools otherwise
+
+def _full(length: int, value: bool) -> Sequence[bool]:
+    if np is not None:
+        return np.full(length, value, dtype=bool)
+    return [value] * length
+
+
+def _and_not(a, b):
+    if np is not None:
+        return a & ~b
+    return [x and not y for x, y in zip(a, b)]
+
+
+def _any(mask) -> bool:
+    return bool(mask.any()) if np is not None else any(mask)
+
+
+def _elementwise(values: Sequence[Any], candidates, test: Callable[[Any], bool]):
+    """Apply ``test`` to the candidate positions only, False elsewhere."""
+    if np is not None:
+        if candidates.all():
+            return np.fromiter(map(test, values), dtype=bool, count=len(values))
+        result = np.zeros(len(values), dtype=bool)
+        positions = np.flatnonzero(candidates)
+        result[positions] = np.fromiter((test(values[i]) for i in positions.tolist()),
+                                        dtype=bool, count=len(positions))
+        return result
+    result = [False] * len(values)
+    for i, candidate in enumerate(candidates):
+        if candidate:
+            result[i] = test(values[i])
+    return result
+
+
+def _compare(dataset: Dataset, node, candidates):
+    _, field, op, value = node
+    column = dataset.column(field)
+
+    if np is not None and isinstance(column, np.ndarray):
+        if column.dtype == object:
+            # All-str column: equality with any scalar and ordering against
+            # strings behave exactly like the Python operators
+            if (op is None or op in _NUMERIC_OPS) and (
+                    isinstance(value, str) or (op in (None, "=", "!=") and _is_scalar(value))):
+                return np.asarray(_NUMERIC_OPS[op or "="](column, value), dtype=bool) & candidates
+        else:
+            if (op is None or op in _NUMERIC_OPS) and _is_number(value):
+                return _NUMERIC_OPS[op or "="](column, value) & candidates
+            if op in (None, "=", "!=") and (value is None or isinstance(value, str)):
+                # Numbers never equal None or strings
+                if op == "!=":
+                    return candidates.copy()
+                return _full(len(column), False)
+            if op in ("in", "not_in") and isinstance(value, (list, tuple, set, frozenset)) \
+                    and all(_is_number(v) for v in value):
+                found = np.isin(column, list(value))
+                return (~found if op == "not_in" else found) & candidates
+
+    # Everything else is evaluated like the row predicate, one value at a time
+    values = dataset.values(field) if np is not None and isinstance(column, np.ndarray) else \
+        [None if v is MISSING else v for v in column]
+    if op is None:
+        return _elementwise(values, candidates, lambda v: v == value)
+    if op in ("in", "not_in") and isinstance(value, (list, tuple, set, frozenset)):
+        members = value
+        try:
+            members = frozenset(value)
+        except TypeError:
+            pass
+        negate = op == "not_in"
+
+        def member(v):
+            try:
+                found = v in members
+            except TypeError:
+                found = v in value
+            return not found if negate else found
+
+        return _elementwise(values, candidates, member)
+    compare = OPERATORS[op]
+    return _elementwise(values, candidates, lambda v: compare(v, value))
+
+
+def _evaluate(dataset: Dataset, node, candidates):
+    """
+    Mask of the candidate rows matching a parsed condition node.
+
+    Only candidate rows are evaluated one by one, so ``and``/``or`` keep the
+    short-circuit behaviour of the row predicates (a later child is never
+    tried on a row an earlier child already decided).
+    """
+    kind = node[0]
+    if kind == "cmp":
+        return _compare(dataset, node, candidates)
+    if kind == "and":
+        result = candidates
+        for child in node[1]:
+            if not _any(result):
+                break
+            result = _evaluate(dataset, child, result)
+        return result
+    if kind == "or":
+        result = _full(len(dataset), False)
+        remaining = candidates
+        for child in node[1]:
+            if not _any(remaining):
+                break
+            matched = _evaluate(dataset, child, remaining)
+            result = result | matched if np is not None else [x or y for x, y in zip(result, matched)]
+            remaining = _and_not(remaining, matched)
+        return result
+    if kind == "not":
+        return _and_not(candidates, _evaluate(dataset, node[1], candidates))
+    return _full(len(dataset), False)
+
+
+# Whole-column versions of the built-in transforms, keyed by the scalar transform
+
+def dollarize_column(column) -> List[str]:
+    return list(map("${:,.2f}".format, column.astype(np.float64).tolist()))
+
+
+def volume_millions_column(column) -> List[str]:
+    return list(map("{:.2f}M".format, (column.astype(np.float64) / 1000000).tolist()))
+
+
+COLUMN_TRANSFORMS: Dict[Callable, Callable] = {
+    dollarize: dollarize_column,
+    volume_millions: volume_millions_column,
+}
+
+
+def format_column(dataset: Dataset, leaf) -> List[Any]:
+    """
+    Cell values of one field-map leaf for every row of ``dataset``.
+
+    Numeric array columns with a built-in transform are formatted in one
+    vectorized call; other columns go through ``leaf.format`` per value,
+    exactly like the row-by-row path.
+    """
+    if leaf.keys is not None:
+        columns = [dataset.values(key, "") for key in leaf.keys]
+        return [leaf.format(list(values)) for values in zip(*columns)]
+
+    column = dataset.column(leaf.key)
+    if np is not None and isinstance(column, np.ndarray):
+        if column.dtype == object:
+            if leaf.transform is None:
+                return column.tolist()
+            return [leaf.format(value) for value in column.tolist()]
+        vectorized = COLUMN_TRANSFORMS.get(leaf.transform)
+        if vectorized is not None:
+            return vectorized(column)
+        if leaf.transform is None:
+            return list(map(str, column.tolist()))
+    return [leaf.format(value) for value in dataset.values(leaf.key, "")]
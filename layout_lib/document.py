@@ -0,0 +1,147 @@
+from typing import Iterator, List
+import os
+from reportlab.platypus import SimpleDocTemplate
+from layout_lib.renderer import interpret_layout
+from layout_lib.logging_utils import get_logger
+from layout_lib.profiling import NULL_STATS
+from layout_lib.sources import as_rows
+
+logger = get_logger(__name__)
+
+# Bytes per write/yield when streaming a PDF to a file object or iterator
+PDF_CHUNK_SIZE = 1 << 16
+
+def layout_tree(layout):
+    """The root container of a layout file (without its data)."""
+    return {
+        "type": layout.get("type", "column"),
+        "children": layout.get("children", layout.get("layout", [])),
+        "columns": layout.get("columns", 2)
+    }
+
+class _PdfSink:
+    """
+    Write target for ``doc.build`` that keeps the bytes objects it is given.
+
+    ReportLab serializes the whole document and writes it in one call, so
+    holding the reference avoids the copy a BytesIO would make.
+    """
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def getvalue(self) -> bytes:
+        # join returns a lone bytes part itself, without copying
+        return b"".join(self.parts)
+
+def iter_chunks(data: bytes, chunk_size: int = PDF_CHUNK_SIZE) -> Iterator[bytes]:
+    """Split ``data`` into consecutive pieces of at most ``chunk_size`` bytes."""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size!r}")
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size].tobytes()
+
+def render_pdf(tree, data_rows, out, stats=None, group_context=None, prepared=None,
+               chunk_size=PDF_CHUNK_SIZE):
+    """
+    Lay out ``tree`` over ``data_rows`` and write the PDF to ``out``.
+
+    ``out`` is a file path, a binary file-like object (written in
+    ``chunk_size`` pieces, so sockets and response streams never get one
+    huge write), or None to return the PDF as bytes. Shared by
+    ``generate_pdf_from_layout``, ``pdf_bytes_from_layout`` and
+    ``CompiledLayout.render``.
+    """
+    profiler = stats if stats is not None else NULL_STATS
+    profiler.start()
+    try:
+        with profiler.phase("render") as render_record:
+            data_rows = as_rows(data_rows)
+            if isinstance(data_rows, list):
+                render_record.rows = len(data_rows)
+            with profiler.phase("layout"):
+                flowables = interpret_layout(tree, data_rows, group_context, stats=stats, prepared=prepared)
+
+            sink = _PdfSink()
+            doc = SimpleDocTemplate(sink)
+            with profiler.phase("doc_build") as record:
+                record.rows = len(flowables)
+                doc.build(flowables)
+            with profiler.phase("write"):
+                return write_pdf(sink.getvalue(), out, chunk_size)
+    finally:
+        profiler.stop()
+
+def write_pdf(pdf, out, chunk_size=PDF_CHUNK_SIZE):
+    """
+    Deliver finished PDF bytes to ``out`` like ``render_pdf`` does: a path
+    is written in one go, a file object in ``chunk_size`` pieces, and None
+    returns the bytes.
+    """
+    if out is None:
+        return pdf
+    if isinstance(out, (str, os.PathLike)):
+        with open(out, "wb") as f:
+            f.write(pdf)
+    else:
+        for chunk in iter_chunks(pdf, chunk_size):
+            out.write(chunk)
+    return None
+
+def generate_pdf_from_layout(layout, filename="output.pdf", stats=None, group_context=None):
+    """
+    Render a layout (with its ``data_rows``) to a PDF.
+
+    Args:
+        layout: The layout dict; ``data_rows`` holds the table data as a
+            list, any iterable of row dicts, a RowSource or the path of a
+            .jsonl/.ndjson, .csv or .json file (read as a stream)
+        filename: Path of the PDF to write or a binary file-like object
+            (e.g. a BytesIO or a response stream); use
+            ``pdf_bytes_from_layout`` to get the bytes instead
+        stats: Optional RenderStats collecting per-block and per-phase
+            timings, row/cell counts and allocation deltas
+        group_context: Optional data per group name; when given, group
+            blocks are not resolved from their own data and filters
+
+    Returns:
+        ``stats`` when profiling, otherwise None
+    """
+    if filename is None:
+        raise ValueError("filename is required; use pdf_bytes_from_layout to get the PDF bytes")
+    render_pdf(layout_tree(layout), layout.get("data_rows"), filename, stats, group_context)
+    logger.info("PDF generated: %s", filename)
+    return stats
+
+def pdf_bytes_from_layout(layout, stats=None, group_context=None) -> bytes:
+    """
+    Render a layout like ``generate_pdf_from_layout`` and return the PDF
+    bytes instead of writing them.
+    """
+    pdf = render_pdf(layout_tree(layout), layout.get("data_rows"), None, stats, group_context)
+    logger.info("PDF generated: %d bytes", len(pdf))
+    return pdf
+
+def iter_pdf(layout, chunk_size=PDF_CHUNK_SIZE, stats=None, group_context=None):
+    """
+    Render a layout and yield the PDF in pieces of at most ``chunk_size`` bytes.
+
+    Nothing is rendered until the first piece is requested, so the
+    generator can be handed straight to a streaming HTTP response. Takes
+    the same ``layout``, ``stats`` and ``group_context`` as
+    ``generate_pdf_from_layout``.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size!r}")
+
+    def stream():
+        pdf = render_pdf(layout_tree(layout), layout.get("data_rows"), None, stats, group_context)
+        logger.info("PDF generated: %d bytes", len(pdf))
+        yield from iter_chunks(pdf, chunk_size)
+
+    return stream()
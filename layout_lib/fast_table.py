@@ -0,0 +1,201 @@
+from reportlab.platypus import Flowable
+from reportlab.lib import colors
+from layout_lib.text_metrics import text_width
+
+# Top + bottom cell padding used by platypus Table, kept for similar row heights
+BODY_PADDING = 6
+HEADER_PADDING = 13
+
+
+def is_fast_table_eligible(data, header_rows_count):
+    """
+    Whether ``data`` can be drawn by FastTable: every body cell is plain
+    single-line text (no Paragraphs or other flowables).
+    """
+    for row in data[header_rows_count:]:
+        for cell in row:
+            if isinstance(cell, str):
+                if "\n" in cell:
+                    return False
+            elif hasattr(cell, "wrap"):
+                return False
+    return True
+
+
+class FastTable(Flowable):
+    """
+    Plain-text grid drawn straight onto the canvas.
+
+    Every body row has the same height, so the flowable knows its height
+    without laying anything out and splits in O(1) by slicing its body row
+    range; both halves share ``data``. Header rows (with their field-map
+    spans) are repeated at the top of every piece.
+
+    Args:
+        data: Header rows followed by body rows, all padded to the same length
+        col_widths: Precomputed column widths
+        header_rows_count: Number of leading header rows
+        spans: (start_col, start_row, end_col, end_row) header spans
+        footer_rows: Number of trailing aggregate footer rows, drawn in
+            ``footer_font`` under a heavier rule
+        start, stop: Range of body rows (indexes into ``data``) drawn by this piece
+    """
+
+    def __init__(
+        self,
+        data,
+        col_widths,
+        header_rows_count,
+        spans=(),
+        header_font="Helvetica",
+        header_font_size=10,
+        body_font="Helvetica",
+        body_font_size=10,
+        header_background=colors.grey,
+        header_text_color=colors.whitesmoke,
+        body_background=colors.beige,
+        grid=True,
+        row_height=None,
+        header_height=None,
+        footer_rows=0,
+        footer_font="Helvetica-Bold",
+        start=None,
+        stop=None,
+    ):
+        super().__init__()
+        self.data = data
+        self.col_widths = list(col_widths)
+        self.header_rows_count = header_rows_count
+        self.spans = list(spans)
+        self.header_font = header_font
+        self.header_font_size = header_font_size
+        self.body_font = body_font
+        self.body_font_size = body_font_size
+        self.header_background = header_background
+        self.header_text_color = header_text_color
+        self.body_background = body_background
+        self.grid = grid
+        self.row_height = row_height or body_font_size * 1.2 + BODY_PADDING
+        self.header_height = header_height or header_font_size * 1.2 + HEADER_PADDING
+        self.footer_rows = footer_rows
+        self.footer_font = footer_font
+        self.start = header_rows_count if start is None else start
+        self.stop = len(data) if stop is None else stop
+
+        self.width = sum(self.col_widths)
+        self.height = self._height(self.stop - self.start)
+
+    def _height(self, body_rows):
+        return self.header_rows_count * self.header_height + body_rows * self.row_height
+
+    def _piece(self, start, stop):
+        piece = FastTable.__new__(FastTable)
+        piece.__dict__.update(self.__dict__)
+        # Drop per-placement state platypus attaches (canvas, frame, postponement)
+        for name in ("canv", "_frame", "_postponed"):
+            piece.__dict__.pop(name, None)
+        piece.start, piece.stop = start, stop
+        piece.height = self._height(stop - start)
+        return piece
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        fit = int((availHeight - self._height(0)) // self.row_height)
+        if fit <= 0:
+            return []
+        if fit >= self.stop - self.start:
+            return [self]
+        middle = self.start + fit
+        return [self._piece(self.start, middle), self._piece(middle, self.stop)]
+
+    def draw(self):
+        c = self.canv
+        c.saveState()
+        header_bottom = self.height - self.header_rows_count * self.header_height
+
+        if self.header_rows_count:
+            c.setFillColor(self.header_background)
+            c.rect(0, header_bottom, self.width, self.height - header_bottom, stroke=0, fill=1)
+        if self.stop > self.start:
+            c.setFillColor(self.body_background)
+            c.rect(0, 0, self.width, header_bottom, stroke=0, fill=1)
+
+        lefts = [0]
+        for width in self.col_widths:
+            lefts.append(lefts[-1] + width)
+
+        self._draw_header(c, lefts)
+        self._draw_body(c, lefts, header_bottom)
+        c.restoreState()
+
+    def _header_cells(self):
+        """(col0, row0, col1, row1) for each drawn header cell, spans merged."""
+        covered = set()
+        cells = []
+        last_row = self.header_rows_count - 1
+        for c0, r0, c1, r1 in self.spans:
+            r1 = last_row if r1 is None else r1
+            cells.append((c0, r0, c1, r1))
+            covered.update((r, col) for r in range(r0, r1 + 1) for col in range(c0, c1 + 1))
+        for r in range(self.header_rows_count):
+            for col in range(len(self.col_widths)):
+                if (r, col) not in covered:
+                    cells.append((col, r, col, r))
+        return cells
+
+    def _draw_header(self, c, lefts):
+        if not self.header_rows_count:
+            return
+        size = self.header_font_size
+        c.setFont(self.header_font, size)
+        c.setFillColor(self.header_text_color)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1)
+        for c0, r0, c1, r1 in self._header_cells():
+            text = str(self.data[r0][c0])
+            x0, x1 = lefts[c0], lefts[c1 + 1]
+            top = self.height - r0 * self.header_height
+            bottom = self.height - (r1 + 1) * self.header_height
+            if text:
+                x = (x0 + x1 - text_width(text, self.header_font, size)) / 2
+                c.drawString(x, bottom + (top - bottom - size) / 2 + size * 0.2, text)
+            if self.grid:
+                c.rect(x0, bottom, x1 - x0, top - bottom, stroke=1, fill=0)
+
+    def _draw_body(self, c, lefts, header_bottom):
+        size = self.body_font_size
+        font = self.body_font
+        height = self.row_height
+        offset = (height - size) / 2 + size * 0.2
+        centers = [(lefts[i] + lefts[i + 1]) / 2 for i in range(len(self.col_widths))]
+
+        footer_start = len(self.data) - self.footer_rows if self.footer_rows else self.stop
+        if self.start >= footer_start:
+            font = self.footer_font
+        c.setFont(font, size)
+        c.setFillColor(colors.black)
+        y = header_bottom
+        for r in range(self.start, self.stop):
+            if r == footer_start and r != self.start:
+                font = self.footer_font
+                c.setFont(font, size)
+            y -= height
+            for center, cell in zip(centers, self.data[r]):
+                text = cell if isinstance(cell, str) else str(cell)
+                if text:
+                    c.drawString(center - text_width(text, font, size) / 2, y + offset, text)
+
+        if self.grid and self.stop > self.start:
+            c.setStrokeColor(colors.black)
+            c.setLineWidth(1)
+            lines = [(x, 0, x, header_bottom) for x in lefts]
+            lines.extend((0, header_bottom - i * height, self.width, header_bottom - i * height)
+                         for i in range(self.stop - self.start + 1))
+            c.lines(lines)
+        if self.start <= footer_start < self.stop:
+            rule = header_bottom - (footer_start - self.start) * height
+            c.setStrokeColor(colors.black)
+            c.setLineWidth(1.5)
+            c.line(0, rule, self.width, rule)
@@ -0,0 +1,176 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from layout_lib.logging_utils import get_logger
+from layout_lib.transform_utils import resolve_transform
+
+logger = get_logger(__name__)
+
+# Upper bound on the number of distinct field maps kept compiled
+FIELD_MAP_CACHE_SIZE = 256
+
+_plan_cache: "OrderedDict[str, FieldMapPlan]" = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def _is_group(item: Dict) -> bool:
+    return bool(item.get("group")) or "children" in item
+
+
+class FieldLeaf:
+    """One table column: where its value comes from and how it is formatted."""
+
+    __slots__ = ("label", "key", "keys", "path", "transform", "extract")
+
+    def __init__(self, item: Dict, path: Tuple[str, ...]):
+        self.label = item.get("label", "")
+        self.key = item.get("key", "")
+        self.path = path
+
+        if "|" in self.key:
+            # Pre-split multi-keys: "Volume1|Volume2" -> ("Volume1", "Volume2")
+            self.keys = tuple(k.strip() for k in self.key.split("|"))
+            keys = self.keys
+            self.extract = lambda row: [row.get(k, "") for k in keys]
+        else:
+            self.keys = None
+            key = self.key
+            self.extract = lambda row: row.get(key, "")
+
+        try:
+            self.transform = resolve_transform(item.get("transform"))
+        except ValueError as e:
+            logger.warning("Transform error for field '%s': %s", self.key, e)
+            self.transform = None
+
+    def format(self, values: Any) -> Any:
+        """Apply the column transform to extracted value(s)."""
+        if self.transform is not None:
+            try:
+                return self.transform(values)
+            except Exception as e:
+                logger.warning("Transform error for field '%s': %s", self.key, e)
+                return str(values)
+        # No transform, just join if list
+        if isinstance(values, list):
+            return " ".join(str(v) for v in values)
+        return str(values)
+
+
+class FieldMapPlan:
+    """
+    A table ``field_map`` compiled once: leaf columns with pre-split keys and
+    resolved transforms, the multi-level header rows and the header SPANs.
+
+    Plans are shared between renders (see ``compile_field_map``) and must be
+    treated as read-only; ``header_rows()`` hands out fresh copies.
+    """
+
+    def __init__(self, field_map: List[Dict]):
+        self.leaves: List[FieldLeaf] = []
+        self.depth = self._get_depth(field_map)
+        self._header_rows: List[List[str]] = [[] for _ in range(self.depth)]
+        # (start_col, row, end_col, end_row); end_row None spans to the last header row
+        self.spans: List[Tuple[int, int, int, Optional[int]]] = []
+        self._compile(field_map, 0, ())
+
+        max_len = max((len(r) for r in self._header_rows), default=0)
+        for r in self._header_rows:
+            while len(r) < max_len:
+                r.append("")
+
+        self.final_keys = [leaf.key for leaf in self.leaves]
+        # Distinct row keys read by the columns, for column pruning at the source
+        self.source_keys = list(dict.fromkeys(
+            key for leaf in self.leaves for key in (leaf.keys or (leaf.key,)) if key
+        ))
+
+    @classmethod
+    def _get_depth(cls, items: List[Dict]) -> int:
+        max_depth = 0
+        for item in items:
+            if _is_group(item):
+                max_depth = max(max_depth, 1 + cls._get_depth(item.get("children", [])))
+            else:
+                max_depth = max(max_depth, 1)
+        return max_depth
+
+    @classmethod
+    def _count_leaf_keys(cls, items: List[Dict]) -> int:
+        return sum(cls._count_leaf_keys(i.get("children", [])) if _is_group(i) else 1 for i in items)
+
+    def _compile(self, items: List[Dict], row: int, path: Tuple[str, ...]) -> None:
+        header_rows = self._header_rows
+        for item in items:
+            col = len(self.leaves)
+            header_rows[row] += [""] * (col - len(header_rows[row]))
+            header_rows[row].append(item.get("label", ""))
+            if _is_group(item):
+                children = item.get("children", [])
+                span = self._count_leaf_keys(children)
+                for _ in range(1, span):
+                    header_rows[row].append("")
+                self.spans.append((col, row, col + span - 1, row))
+                self._compile(children, row + 1, path + (item.get("label", ""),))
+            else:
+                for r in range(row + 1, self.depth):
+                    header_rows[r] += [""] * (col - len(header_rows[r]))
+                    header_rows[r].append("")
+                self.spans.append((col, row, col, None))
+                self.leaves.append(FieldLeaf(item, path))
+
+    def header_rows(self) -> List[List[str]]:
+        """A fresh copy of the header rows (callers may pad or extend them)."""
+        return [list(r) for r in self._header_rows]
+
+    def span_commands(self, max_row: Optional[int] = None) -> List[Tuple]:
+        """TableStyle SPAN commands for the header, leaves spanning to ``max_row``."""
+        if max_row is None:
+            max_row = self.depth - 1
+        return [
+            ('SPAN', (c0, r0), (c1, max_row if r1 is None else r1))
+            for c0, r0, c1, r1 in self.spans
+        ]
+
+
+def _content_key(field_map: List[Dict]) -> str:
+    def default(value):
+        if callable(value):
+            # Functions are identified by object, names alone could collide
+            return f"<callable {getattr(value, '__qualname__', '?')} {id(value)}>"
+        return repr(value)
+
+    text = json.dumps(field_map, default=default, ensure_ascii=False)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def compile_field_map(field_map: Union[List[Dict], FieldMapPlan]) -> FieldMapPlan:
+    """
+    Compile a table ``field_map``, reusing the cached plan for identical
+    content so repeated blocks and renders only pay for it once.
+    """
+    if isinstance(field_map, FieldMapPlan):
+        return field_map
+
+    key = _content_key(field_map)
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan
+
+    plan = FieldMapPlan(field_map)
+    with _plan_cache_lock:
+        _plan_cache[key] = plan
+        while len(_plan_cache) > FIELD_MAP_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+def clear_field_map_cache() -> None:
+    """Drop all cached field map plans (e.g. after changing TRANSFORMS)."""
+    with _plan_cache_lock:
+        _plan_cache.clear()
@@ -0,0 +1,232 @@
+from typing import Dict, Hashable, List, Optional, Set, Tuple, Union
+from bisect import bisect_left, bisect_right
+import math
+
+from layout_lib.filter_utils import OPERATORS, _build_predicate, compile_filter
+
+# Operators the index knows how to answer, captured so that a replaced entry
+# in OPERATORS falls back to per-row evaluation instead of being ignored
+_STOCK_OPERATORS = {op: OPERATORS[op] for op in
+                    ("=", "!=", ">", ">=", "<", "<=", "in", "not_in", "starts_with")}
+
+# Datasets smaller than this are cheaper to scan than to index
+INDEX_MIN_ROWS = 64
+
+_MISSING = object()
+
+
+class FilterIndex:
+    """
+    Lazily built field indexes over one list of rows.
+
+    Hash indexes answer ``=``, ``!=``, ``in`` and ``not_in``; sorted indexes
+    answer ``>``, ``>=``, ``<``, ``<=`` and ``starts_with``. Conditions resolve
+    to sets of row ids combined with set algebra. Anything the indexes cannot
+    answer exactly (mixed types, ``contains``, custom operators...) is
+    evaluated per row, but only over the rows still in play, so ``and``/``or``
+    short-circuit exactly like ``FilterEvaluator`` does.
+
+    The rows must not be modified while the index is in use.
+    """
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self._hash: Dict[str, Optional[Dict[Hashable, List[int]]]] = {}
+        self._sorted: Dict[str, Optional[Tuple[list, List[int]]]] = {}
+        self._strings: Dict[str, Tuple[List[str], List[int]]] = {}
+        self._all: Optional[Set[int]] = None
+
+    def all_ids(self) -> Set[int]:
+        """The ids of every row (shared, do not mutate)."""
+        if self._all is None:
+            self._all = set(range(len(self.rows)))
+        return self._all
+
+    def hash_index(self, field: str) -> Optional[Dict[Hashable, List[int]]]:
+        """Map each value of ``field`` to the ids of the rows holding it."""
+        index = self._hash.get(field, _MISSING)
+        if index is _MISSING:
+            index = {}
+            try:
+                for i, row in enumerate(self.rows):
+                    value = row.get(field)
+                    bucket = index.get(value)
+                    if bucket is None:
+                        index[value] = [i]
+                    else:
+                        bucket.append(i)
+            except TypeError:
+                # Unhashable values in this field
+                index = None
+            self._hash[field] = index
+        return index
+
+    def sorted_index(self, field: str) -> Optional[Tuple[list, List[int]]]:
+        """
+        Sorted ``(values, ids)`` for ``field``, or None when its values are
+        not all numbers or not all strings (comparisons could raise).
+        """
+        index = self._sorted.get(field, _MISSING)
+        if index is _MISSING:
+            index = None
+            values = [row.get(field) for row in self.rows]
+            if values and (
+                all(isinstance(v, (int, float)) and not (isinstance(v, float) and math.isnan(v))
+                    for v in values)
+                or all(isinstance(v, str) for v in values)
+            ):
+                order = sorted(range(len(values)), key=values.__getitem__)
+                index = ([values[i] for i in order], order)
+            self._sorted[field] = index
+        return index
+
+    def string_index(self, field: str) -> Tuple[List[str], List[int]]:
+        """Sorted ``(values, ids)`` over the string values of ``field`` only."""
+        index = self._strings.get(field)
+        if index is None:
+            pairs = sorted(
+                (value, i) for i, value in
+                ((i, row.get(field)) for i, row in enumerate(self.rows))
+                if isinstance(value, str)
+            )
+            index = ([value for value, _ in pairs], [i for _, i in pairs])
+            self._strings[field] = index
+        return index
+
+    def resolve(self, filter_condition: Union[str, Dict], candidates: Optional[Set[int]] = None) -> Set[int]:
+        """Return the ids of the rows (within ``candidates``) matching the condition."""
+        return set(self._resolve(compile_filter(filter_condition).node, candidates))
+
+    def filter(self, filter_condition: Union[str, Dict]) -> List[Dict]:
+        """Return the matching rows in their original order."""
+        rows = self.rows
+        return [rows[i] for i in sorted(self.resolve(filter_condition))]
+
+    def _resolve(self, node: Tuple, candidates: Optional[Set[int]]) -> Set[int]:
+        # ``candidates`` is None while every row is still in play; the result
+        # may then be a shared set, so callers must not mutate it in place
+        if candidates is not None and not candidates:
+            return set()
+
+        kind = node[0]
+        if kind == "and":
+            for child in node[1]:
+                candidates = self._resolve(child, candidates)
+                if not candidates:
+                    break
+            return self.all_ids() if candidates is None else candidates
+
+        if kind == "or":
+            matched: Set[int] = set()
+            remaining = candidates
+            for child in node[1]:
+                hits = self._resolve(child, remaining)
+                if hits:
+                    matched |= hits
+                    remaining = (self.all_ids() if remaining is None else remaining) - hits
+                    if not remaining:
+                        break
+            return matched
+
+        if kind == "not":
+            return (self.all_ids() if candidates is None else candidates) - self._resolve(node[1], candidates)
+
+        if kind == "cmp":
+            ids = self._lookup(node, candidates)
+            if ids is not None:
+                return ids
+            predicate = _build_predicate(node)
+            rows = self.rows
+            if candidates is None:
+                return {i for i, row in enumerate(rows) if predicate(row)}
+            return {i for i in candidates if predicate(rows[i])}
+
+        return set()
+
+    def _lookup(self, node: Tuple, candidates: Optional[Set[int]]) -> Optional[Set[int]]:
+        """Answer a comparison from an index, or None if it has to be scanned."""
+        if candidates is None:
+            candidates = self.all_ids()
+        _, field, op, value = node
+        if op is not None and OPERATORS.get(op) is not _STOCK_OPERATORS.get(op, _MISSING):
+            return None
+
+        if op is None or op in ("=", "!="):
+            try:
+                hash(value)
+            except TypeError:
+                return None
+            if value != value:
+                # NaN never equals itself, but a dict lookup would find it
+                return None
+            index = self.hash_index(field)
+            if index is None:
+                return None
+            hits = candidates.intersection(index.get(value, ()))
+            return candidates - hits if op == "!=" else hits
+
+        if op in ("in", "not_in"):
+            if not isinstance(value, (list, tuple, set, frozenset)) or any(v != v for v in value):
+                return None
+            index = self.hash_index(field)
+            if index is None:
+                return None
+            hits: Set[int] = set()
+            try:
+                for member in value:
+                    hits.update(candidates.intersection(index.get(member, ())))
+            except TypeError:
+                return None
+            return candidates - hits if op == "not_in" else hits
+
+        if op == "starts_with":
+            if not isinstance(value, str):
+                return None
+            keys, ids = self.string_index(field)
+            start = end = bisect_left(keys, value)
+            while end < len(keys) and keys[end].startswith(value):
+                end += 1
+            return candidates.intersection(ids[start:end])
+
+        # Range comparisons
+        index = self.sorted_index(field)
+        if index is None:
+            return None
+        keys, ids = index
+        if isinstance(keys[0], str) != isinstance(value, str):
+            return None
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        if not isinstance(value, (str, int, float)):
+            return None
+
+        if op == ">":
+            selected = ids[bisect_right(keys, value):]
+        elif op == ">=":
+            selected = ids[bisect_left(keys, value):]
+        elif op == "<":
+            selected = ids[:bisect_left(keys, value)]
+        else:
+            selected = ids[:bisect_right(keys, value)]
+        return candidates.intersection(selected)
+
+
+class IndexRegistry:
+    """
+    Per-render registry handing out one ``FilterIndex`` per row list, so every
+    group and table filtering the same dataset shares its indexes.
+    """
+
+    def __init__(self, min_rows: int = INDEX_MIN_ROWS):
+        self.min_rows = min_rows
+        self._indexes: Dict[int, FilterIndex] = {}
+
+    def get(self, rows) -> Optional[FilterIndex]:
+        """Return the index for ``rows`` or None if it is not worth indexing."""
+        if not isinstance(rows, list) or len(rows) < self.min_rows:
+            return None
+        index = self._indexes.get(id(rows))
+        if index is None or index.rows is not rows:
+            index = FilterIndex(rows)
+            self._indexes[id(rows)] = index
+        return index
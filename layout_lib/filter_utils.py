@@ -1,5 +1,7 @@
-from typing import Any, Dict, List, Union
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
 import operator
+import threading
+from collections import OrderedDict
 from functools import reduce
 
 # Define comparison operators
@@ -17,12 +19,345 @@ OPERATORS = {
     "ends_with": lambda x, y: x.endswith(y) if isinstance(x, str) else False
 }
 
+# Upper bound on the number of distinct filter specs kept compiled
+FILTER_CACHE_SIZE = 1024
+
+_filter_cache: "OrderedDict[Hashable, CompiledFilter]" = OrderedDict()
+_filter_cache_lock = threading.Lock()
+
+
+def parse_condition(condition: Union[str, Dict]) -> Tuple:
+    """
+    Parse a filter condition into a tree of plain tuples.
+
+    The tree mirrors exactly what ``FilterEvaluator.evaluate_condition``
+    decides on each call, so it only has to be worked out once:
+
+        ("or", (node, ...))
+        ("and", (node, ...))
+        ("not", node)
+        ("cmp", field, op, value)   # op is None for the implicit equality
+        ("false",)                  # no usable comparison in the dict
+    """
+    if isinstance(condition, str):
+        # Handle legacy format: "field=value"
+        field, value = [f.strip() for f in condition.split("=", 1)]
+        return ("cmp", field, None, value)
+
+    if "or" in condition:
+        return ("or", tuple(parse_condition(c) for c in condition["or"]))
+
+    if "and" in condition:
+        return ("and", tuple(parse_condition(c) for c in condition["and"]))
+
+    if "not" in condition:
+        return ("not", parse_condition(condition["not"]))
+
+    # Only the first field that carries a known operator (or a plain value)
+    # is used, like the interpreter does
+    for field, value in condition.items():
+        if isinstance(value, dict):
+            for op, op_value in value.items():
+                if op in OPERATORS:
+                    return ("cmp", field, op, op_value)
+        else:
+            return ("cmp", field, None, value)
+
+    return ("false",)
+
+
+def _build_predicate(node: Tuple) -> Callable[[Dict], bool]:
+    """Turn a parsed condition into a closure evaluated once per row."""
+    kind = node[0]
+
+    if kind == "cmp":
+        _, field, op, value = node
+        if op is None:
+            return lambda item: item.get(field) == value
+
+        if op in ("in", "not_in") and isinstance(value, (list, tuple, set, frozenset)):
+            try:
+                members = frozenset(value)
+            except TypeError:
+                members = None
+            if members is not None:
+                negate = op == "not_in"
+
+                def member_predicate(item):
+                    field_value = item.get(field)
+                    try:
+                        found = field_value in members
+                    except TypeError:
+                        # Unhashable field value, fall back to list semantics
+                        found = field_value in value
+                    return not found if negate else found
+
+                return member_predicate
+
+        compare = OPERATORS[op]
+        return lambda item: compare(item.get(field), value)
+
+    if kind == "and":
+        predicates = tuple(_build_predicate(child) for child in node[1])
+
+        def and_predicate(item):
+            for predicate in predicates:
+                if not predicate(item):
+                    return False
+            return True
+
+        return and_predicate
+
+    if kind == "or":
+        predicates = tuple(_build_predicate(child) for child in node[1])
+
+        def or_predicate(item):
+            for predicate in predicates:
+                if predicate(item):
+                    return True
+            return False
+
+        return or_predicate
+
+    if kind == "not":
+        inner = _build_predicate(node[1])
+        return lambda item: not inner(item)
+
+    return lambda item: False
+
+
+class CompiledFilter:
+    """A filter condition compiled once into a reusable row predicate."""
+
+    __slots__ = ("condition", "node", "predicate")
+
+    def __init__(self, condition: Union[str, Dict]):
+        self.condition = condition
+        self.node = parse_condition(condition)
+        self.predicate = _build_predicate(self.node)
+
+    def __call__(self, item: Dict) -> bool:
+        return self.predicate(item)
+
+    def filter(self, data: List[Dict]) -> List[Dict]:
+        """Return the items of ``data`` matching the condition, in order."""
+        predicate = self.predicate
+        return [item for item in data if predicate(item)]
+
+
+def _freeze(value: Any) -> Hashable:
+    """Build a hashable cache key from a (possibly nested) filter spec."""
+    if isinstance(value, dict):
+        return ("dict", tuple((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ("list", tuple(_freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(_freeze(v) for v in value))
+    return (type(value).__name__, value)
+
+
+def compile_filter(filter_condition: Union[str, Dict]) -> CompiledFilter:
+    """
+    Compile a filter condition, reusing a cached predicate when possible.
+
+    Identical specs (by content, not identity) share one ``CompiledFilter``,
+    so group filters and negative filters repeated across blocks and renders
+    are only parsed once per process.
+    """
+    if isinstance(filter_condition, CompiledFilter):
+        return filter_condition
+
+    try:
+        key = _freeze(filter_condition)
+        hash(key)
+    except TypeError:
+        # Unhashable values somewhere in the spec, compile without caching
+        return CompiledFilter(filter_condition)
+
+    with _filter_cache_lock:
+        compiled = _filter_cache.get(key)
+        if compiled is not None:
+            _filter_cache.move_to_end(key)
+            return compiled
+
+    compiled = CompiledFilter(filter_condition)
+    with _filter_cache_lock:
+        _filter_cache[key] = compiled
+        while len(_filter_cache) > FILTER_CACHE_SIZE:
+            _filter_cache.popitem(last=False)
+    return compiled
+
+
+def clear_filter_cache() -> None:
+    """Drop all cached compiled filters (e.g. after changing OPERATORS)."""
+    with _filter_cache_lock:
+        _filter_cache.clear()
+
+
+# Captured so that a replaced "in" operator is never answered by hashing
+_STOCK_IN = OPERATORS["in"]
+
+
+def _hash_terms(node: Tuple) -> Optional[Tuple[str, Tuple[Hashable, ...], bool]]:
+    """
+    ``(field, values, exact)`` when a row can only match ``node`` if its
+    ``field`` equals one of ``values``; ``exact`` means that is also
+    enough. Equality and ``in`` tests qualify, as does an ``and`` through
+    its first such term (the full predicate then confirms the candidates).
+    """
+    kind = node[0]
+    if kind == "cmp":
+        _, field, op, value = node
+        if op is None or (op == "=" and OPERATORS["="] is operator.eq):
+            values = (value,)
+        elif op == "in" and OPERATORS["in"] is _STOCK_IN and isinstance(value, (list, tuple, set, frozenset)):
+            values = tuple(value)
+        else:
+            return None
+        try:
+            hash(values)
+        except TypeError:
+            return None
+        if any(v != v for v in values):
+            # NaN never equals itself, but a dict lookup would find it
+            return None
+        return field, values, True
+    if kind == "and":
+        for child in node[1]:
+            terms = _hash_terms(child)
+            if terms is not None:
+                return terms[0], terms[1], False
+    return None
+
+
+class FilterSet:
+    """
+    Several filter conditions evaluated together in one pass over the rows.
+
+    Conditions that come down to "field equals one of these values" are
+    looked up in one hash table per field, so a row costs one dict lookup
+    per field however many such conditions there are; only the remaining
+    conditions are evaluated one by one. Used to resolve many groups over
+    the same data, and for negative filter lists.
+    """
+
+    def __init__(self, conditions: Iterable[Union[str, Dict]]):
+        self.conditions = list(conditions)
+        # field -> value -> [(condition number, predicate or None when exact)]
+        self._tables: Dict[str, Dict[Hashable, List[Tuple[int, Optional[Callable]]]]] = {}
+        self._scanned: List[Tuple[int, Callable[[Dict], bool]]] = []
+        for number, condition in enumerate(self.conditions):
+            compiled = compile_filter(condition)
+            terms = _hash_terms(compiled.node)
+            if terms is None:
+                self._scanned.append((number, compiled.predicate))
+                continue
+            field, values, exact = terms
+            table = self._tables.setdefault(field, {})
+            check = None if exact else compiled.predicate
+            for value in dict.fromkeys(values):
+                table.setdefault(value, []).append((number, check))
+
+    def _candidates(self, table, value):
+        try:
+            return table.get(value, ())
+        except TypeError:
+            # Unhashable row value: compare it like the predicate would
+            return [entry for key, entries in table.items() if value == key for entry in entries]
+
+    def matching(self, item: Dict) -> List[int]:
+        """Numbers of the conditions ``item`` matches, unordered."""
+        matched = []
+        for field, table in self._tables.items():
+            for number, check in self._candidates(table, item.get(field)):
+                if check is None or check(item):
+                    matched.append(number)
+        for number, predicate in self._scanned:
+            if predicate(item):
+                matched.append(number)
+        return matched
+
+    def any_match(self, item: Dict) -> bool:
+        """Whether ``item`` matches at least one condition."""
+        for field, table in self._tables.items():
+            for _, check in self._candidates(table, item.get(field)):
+                if check is None or check(item):
+                    return True
+        for _, predicate in self._scanned:
+            if predicate(item):
+                return True
+        return False
+
+    def any_match_isolated(self, item: Dict, errors: Dict[int, Exception]) -> bool:
+        """
+        ``any_match`` where a condition raising on ``item`` counts as not
+        matching it; the first error of each condition is kept in ``errors``.
+        The outcome for a row doesn't depend on the rows before it.
+        """
+        for field, table in self._tables.items():
+            for number, check in self._candidates(table, item.get(field)):
+                if check is None:
+                    return True
+                try:
+                    if check(item):
+                        return True
+                except Exception as e:
+                    errors.setdefault(number, e)
+        for number, predicate in self._scanned:
+            try:
+                if predicate(item):
+                    return True
+            except Exception as e:
+                errors.setdefault(number, e)
+        return False
+
+    def partition(self, rows: Iterable[Dict]) -> Tuple[List[List[Dict]], Dict[int, Exception]]:
+        """
+        Distribute ``rows`` to every condition they match, in one pass.
+
+        Returns the matching rows per condition (in row order) and the
+        error raised by each condition that failed on some row; a failed
+        condition is no longer evaluated and its rows are meaningless.
+        """
+        buckets: List[List[Dict]] = [[] for _ in self.conditions]
+        errors: Dict[int, Exception] = {}
+        tables = list(self._tables.items())
+        scanned = self._scanned
+        for item in rows:
+            for field, table in tables:
+                for number, check in self._candidates(table, item.get(field)):
+                    if check is None:
+                        buckets[number].append(item)
+                    elif number not in errors:
+                        try:
+                            if check(item):
+                                buckets[number].append(item)
+                        except Exception as e:
+                            errors[number] = e
+            for number, predicate in scanned:
+                if number in errors:
+                    continue
+                try:
+                    if predicate(item):
+                        buckets[number].append(item)
+                except Exception as e:
+                    errors[number] = e
+        return buckets, errors
+
+
 class FilterEvaluator:
-    def __init__(self, data: Union[Dict, List]):
+    def __init__(self, data: Union[Dict, List], index=None):
         self.data = data if isinstance(data, list) else [data]
+        # Optional FilterIndex built over the same list (see filter_index)
+        self.index = index if index is not None and index.rows is self.data else None
 
     def evaluate_condition(self, item: Dict, condition: Dict) -> bool:
-        """Evaluate a single condition against an item."""
+        """
+        Evaluate a single condition against an item.
+
+        This interprets the condition from scratch on every call; ``filter``
+        uses the compiled form from ``compile_filter`` instead.
+        """
         if "or" in condition:
             return any(self.evaluate_condition(item, sub_condition) 
                       for sub_condition in condition["or"])
@@ -48,26 +383,93 @@ class FilterEvaluator:
 
     def filter(self, filter_condition: Union[str, Dict]) -> List[Dict]:
         """Filter data based on the provided condition."""
-        if isinstance(filter_condition, str):
-            # Handle legacy format: "field=value"
-            field, value = [f.strip() for f in filter_condition.split("=", 1)]
-            filter_condition = {field: value}
+        if self.index is not None:
+            return self.index.filter(filter_condition)
+        return compile_filter(filter_condition).filter(self.data)
+
+def exclude_matching(data: List[Dict], filter_conditions: Union[str, Dict, List], index=None,
+                     on_error: Optional[Callable[[Union[str, Dict], Exception], None]] = None) -> List[Dict]:
+    """
+    Drop every item matching any of the filter conditions.
+
+    Rows are excluded by position, never by equality, so duplicate rows are
+    kept or dropped independently. With an index the conditions resolve to
+    row-id sets that are merged into one exclusion set; otherwise the
+    conditions are checked together as a FilterSet in a single pass.
+
+    Args:
+        data: The items to filter
+        filter_conditions: A filter condition or a list of them
+        index: Optional FilterIndex over ``data``
+        on_error: Optional ``on_error(condition, exception)`` callback; when
+            given, a condition raising on a row counts as not matching it
+            instead of the error propagating (see ``iter_excluding``); the
+            rows are then scanned rather than looked up in ``index``
+
+    Returns:
+        The items matching none of the conditions, in their original order
+    """
+    if not isinstance(filter_conditions, list):
+        filter_conditions = [filter_conditions]
+
+    if index is not None and index.rows is data and on_error is None:
+        excluded = set()
+        for condition in filter_conditions:
+            excluded |= index.resolve(condition)
+        return [item for i, item in enumerate(data) if i not in excluded]
+
+    return list(iter_excluding(data, filter_conditions, on_error))
+
+def iter_excluding(rows: Iterable[Dict], filter_conditions: Union[str, Dict, List],
+                   on_error: Optional[Callable[[Union[str, Dict], Exception], None]] = None) -> Iterator[Dict]:
+    """
+    Generator stage yielding the rows that match none of the conditions.
+
+    The conditions are compiled up front into a FilterSet, so errors
+    surface here rather than on the first row, and equality conditions
+    cost one hash lookup per row together.
+
+    With ``on_error``, a condition raising on a row counts as not matching
+    that row while the other conditions still apply, and
+    ``on_error(condition, exception)`` is called once per failing condition.
+    """
+    if not isinstance(filter_conditions, list):
+        filter_conditions = [filter_conditions]
+    filter_set = FilterSet(filter_conditions)
+    if on_error is None:
+        matches = filter_set.any_match
+        return (item for item in rows if not matches(item))
+    return _iter_excluding_isolated(rows, filter_set, on_error)
+
+def _iter_excluding_isolated(rows, filter_set, on_error):
+    errors: Dict[int, Exception] = {}
+    for item in rows:
+        reported = len(errors)
+        excluded = filter_set.any_match_isolated(item, errors)
+        if len(errors) > reported:
+            for number in list(errors)[reported:]:
+                on_error(filter_set.conditions[number], errors[number])
+        if not excluded:
+            yield item
 
-        return [item for item in self.data 
-                if self.evaluate_condition(item, filter_condition)]
+def iter_filter(rows: Iterable[Dict], filter_condition: Union[str, Dict]) -> Iterator[Dict]:
+    """Generator stage yielding the rows matching ``filter_condition``."""
+    predicate = compile_filter(filter_condition).predicate
+    return (item for item in rows if predicate(item))
 
-def apply_filter(data: Union[Dict, List], filter_condition: Union[str, Dict]) -> Union[Dict, List]:
+def apply_filter(data: Union[Dict, List], filter_condition: Union[str, Dict], index=None) -> Union[Dict, List]:
     """
     Apply a filter condition to the data.
     
     Args:
         data: The data to filter (dict or list)
         filter_condition: The filter condition (string or dict)
+        index: Optional FilterIndex over ``data`` to resolve the condition with
     
     Returns:
         Filtered data (dict or list)
     """
-    evaluator = FilterEvaluator(data)
+    evaluator = FilterEvaluator(data, index)
     filtered = evaluator.filter(filter_condition)
     
     # Return single item if input was dict, otherwise return list
@@ -0,0 +1,48 @@
+from typing import Union
+import logging
+
+# Every module logs under this name, e.g. "layout_lib.renderer"
+LOGGER_NAME = "layout_lib"
+
+_library_logger = logging.getLogger(LOGGER_NAME)
+# Applications without logging configured get no "lastResort" output on stderr
+_library_logger.addHandler(logging.NullHandler())
+_level_before_disable = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the logger for a layout_lib module."""
+    if name != LOGGER_NAME and not name.startswith(LOGGER_NAME + "."):
+        name = f"{LOGGER_NAME}.{name}"
+    return logging.getLogger(name)
+
+
+def set_log_level(level: Union[int, str]) -> None:
+    """
+    Set the level of all layout_lib loggers.
+
+    INFO logs one summary line per table block (row and column counts);
+    DEBUG additionally dumps block options, rows and cell data.
+    """
+    _library_logger.setLevel(level)
+
+
+def disable_logging() -> None:
+    """
+    Silence layout_lib completely, warnings included.
+
+    Level checks then fail before any message or argument is formatted,
+    so instrumentation costs nothing in production renders.
+    """
+    global _level_before_disable
+    if _level_before_disable is None:
+        _level_before_disable = _library_logger.level
+    _library_logger.setLevel(logging.CRITICAL + 1)
+
+
+def enable_logging() -> None:
+    """Undo ``disable_logging``, restoring the previous level."""
+    global _level_before_disable
+    if _level_before_disable is not None:
+        _library_logger.setLevel(_level_before_disable)
+        _level_before_disable = None
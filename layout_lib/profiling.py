@@ -0,0 +1,124 @@
+from typing import Any, Callable, Dict, List, Optional
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class PhaseRecord:
+    """Timing and counters for one phase of one block."""
+
+    __slots__ = ("phase", "block", "seconds", "rows", "cells", "alloc_bytes")
+
+    def __init__(self, phase: str, block: Optional[str] = None):
+        self.phase = phase
+        self.block = block
+        self.seconds = 0.0
+        self.rows: Optional[int] = None
+        self.cells: Optional[int] = None
+        # Net traced allocation change, only set when tracking allocations
+        self.alloc_bytes: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RenderStats:
+    """
+    Opt-in profiler for ``generate_pdf_from_layout`` / ``interpret_layout``.
+
+    Phases are recorded in completion order, so nested phases (e.g.
+    ``column_widths`` inside ``table_build`` inside ``block``) appear before
+    the phase that contains them. ``callback`` is called with every
+    PhaseRecord as soon as it completes, which is the hook for exporting to
+    a metrics pipeline.
+
+    Args:
+        callback: Called with each finished PhaseRecord
+        track_allocations: Record net allocation per phase with tracemalloc
+            (started for the duration of the render if not already running)
+    """
+
+    enabled = True
+
+    def __init__(self, callback: Optional[Callable[[PhaseRecord], None]] = None,
+                 track_allocations: bool = False):
+        self.callback = callback
+        self.track_allocations = track_allocations
+        self.records: List[PhaseRecord] = []
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        """Begin a render (starts tracemalloc when tracking allocations)."""
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        """End a render started with ``start``."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextmanager
+    def phase(self, name: str, block: Optional[str] = None):
+        """Time the enclosed code; the yielded record takes rows/cells counts."""
+        record = PhaseRecord(name, block)
+        tracing = self.track_allocations and tracemalloc.is_tracing()
+        if tracing:
+            alloc_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if tracing:
+                record.alloc_bytes = tracemalloc.get_traced_memory()[0] - alloc_before
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate seconds, rows and cells per phase name."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for record in self.records:
+            total = totals.setdefault(record.phase, {"count": 0, "seconds": 0.0, "rows": 0, "cells": 0})
+            total["count"] += 1
+            total["seconds"] += record.seconds
+            total["rows"] += record.rows or 0
+            total["cells"] += record.cells or 0
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": [record.to_dict() for record in self.records],
+            "totals": self.totals(),
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+class _NullStats:
+    """Stand-in used when profiling is off; phases cost one no-op context."""
+
+    enabled = False
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    @contextmanager
+    def phase(self, name: str, block: Optional[str] = None):
+        yield PhaseRecord(name, block)
+
+
+NULL_STATS = _NullStats()
+
+
+def block_name(block: Dict) -> str:
+    """Short identifier for a layout block in phase records."""
+    name = block.get("name") or block.get("label") or block.get("group_name")
+    return f"{block.get('type', '?')}:{name}" if name else block.get("type", "?")
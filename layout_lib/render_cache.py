@@ -0,0 +1,401 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from layout_lib.dataset import Dataset, np
+from layout_lib.document import layout_tree, pdf_bytes_from_layout, write_pdf
+from layout_lib.logging_utils import get_logger
+from layout_lib.sources import FileSource, IterableSource, RowSource, as_rows
+from layout_lib.sqlite_source import SqliteSource
+
+logger = get_logger(__name__)
+
+# Bumped whenever rendering changes in a way that makes cached PDFs stale
+CACHE_KEY_VERSION = 3
+
+# Default byte budgets of the cache backends
+MEMORY_CACHE_BYTES = 64 << 20
+DIRECTORY_CACHE_BYTES = 1 << 30
+
+# Bytes read per update when hashing a data file
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+class UncacheableInput(Exception):
+    """Raised by ``render_key`` for inputs that cannot be encoded, or hashed without being consumed."""
+
+
+def _canonical(value: Any) -> Any:
+    """
+    ``value`` as JSON-ready data with every container tagged by type, so
+    ``{1: x}`` and ``{"1": x}`` or a tuple and a list never share a key;
+    dict items are sorted by their encoding so key order doesn't matter.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if np is not None and isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, dict):
+        return ["dict", sorted([_dumps(_canonical(k)), _canonical(v)] for k, v in value.items())]
+    if isinstance(value, list):
+        return ["list", [_canonical(item) for item in value]]
+    if isinstance(value, tuple):
+        return ["tuple", [_canonical(item) for item in value]]
+    if isinstance(value, (set, frozenset)):
+        return ["set", sorted(_dumps(_canonical(item)) for item in value)]
+    one_shot = value._one_shot if isinstance(value, IterableSource) else isinstance(value, Iterator)
+    if one_shot:
+        raise UncacheableInput(f"{type(value).__name__} is a one-shot iterator and cannot be hashed "
+                               f"without consuming it")
+    if isinstance(value, SqliteSource):
+        return _sqlite_key(value)
+    if isinstance(value, RowSource):
+        # Other lazy sources (files...) are keyed by the rows they hold now,
+        # never by their repr, so changed data is a miss
+        digest = hashlib.sha256()
+        _hash_rows(digest, value)
+        return ["rows", type(value).__name__, digest.hexdigest()]
+    if callable(value):
+        # Functions are identified by object, like field-map plans are
+        return ["callable", getattr(value, "__qualname__", "?"), id(value)]
+    return ["object", type(value).__qualname__, repr(value)]
+
+
+def _sqlite_key(source: SqliteSource) -> List[Any]:
+    """
+    A SqliteSource by the state of its database file (and write-ahead log),
+    table, columns and conditions, so the cache never runs the query.
+    """
+    files = []
+    for path in (source.database, source.database + "-wal"):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            files.append(None)
+        else:
+            files.append([stat.st_mtime_ns, stat.st_size])
+    return ["SqliteSource", os.path.realpath(source.database), files, source.table,
+            _canonical(source.columns), _canonical(source.conditions)]
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _encode(value: Any) -> bytes:
+    """
+    Canonical, type-tagged JSON of ``value``: key order and whitespace never
+    change the hash.
+
+    Raises:
+        UncacheableInput: ``value`` holds a one-shot iterator or cannot be encoded
+    """
+    try:
+        return _dumps(_canonical(value)).encode("utf-8")
+    except (TypeError, ValueError, RecursionError) as e:
+        raise UncacheableInput(f"cannot encode {type(value).__name__}: {e}") from e
+
+
+_PLAIN_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def _encode_row(row: Any) -> bytes:
+    if (type(row) is dict and all(type(key) is str for key in row)
+            and all(type(value) in _PLAIN_TYPES for value in row.values())):
+        # A flat row of JSON values encodes to an object, which no tagged encoding (an array) can equal
+        return json.dumps(row, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return _encode(row)
+
+
+def _hash_rows(digest, rows: Any) -> None:
+    if isinstance(rows, FileSource):
+        # Content-addressed: the same rows under another path share entries
+        digest.update(_encode([type(rows).__name__, {k: v for k, v in vars(rows).items() if k != "path"}]))
+        with open(rows.path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return
+    if isinstance(rows, Dataset):
+        rows = iter(rows)
+    count = 0
+    for row in rows:
+        digest.update(_encode_row(row))
+        digest.update(b"\n")
+        count += 1
+    digest.update(b"rows:%d" % count)
+
+
+def render_key(layout: Dict, data_rows: Any = None, group_context: Optional[Dict] = None) -> str:
+    """
+    Stable hash of everything a render depends on.
+
+    The layout is normalized to its root container (so ``"layout"`` and
+    ``"children"`` spellings agree) and hashed as canonical JSON; the rows
+    are hashed one at a time, data files by their bytes. ``data_rows``
+    defaults to the layout's own. A SqliteSource inside the layout or the
+    group data is keyed by its database file's size and modification time,
+    table, columns and conditions; other row sources there are hashed by
+    the rows they return.
+
+    Raises:
+        UncacheableInput: The layout or group data holds a one-shot iterator
+            or a value that cannot be encoded
+    """
+    if data_rows is None:
+        data_rows = layout.get("data_rows")
+    digest = hashlib.sha256()
+    digest.update(b"v%d" % CACHE_KEY_VERSION)
+    digest.update(_encode(layout_tree(layout)))
+    digest.update(b"\0")
+    _hash_rows(digest, as_rows(data_rows))
+    digest.update(b"\0")
+    digest.update(_encode(group_context))
+    return digest.hexdigest()
+
+
+class CacheMetrics:
+    """Hit/miss counters of a RenderCache."""
+
+    __slots__ = ("hits", "misses", "bypasses", "hit_bytes", "stored_bytes", "hash_seconds", "render_seconds")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        # Renders done without the cache because an input could not be hashed
+        self.bypasses = 0
+        self.hit_bytes = 0
+        self.stored_bytes = 0
+        # Time spent computing keys, and rendering on misses
+        self.hash_seconds = 0.0
+        self.render_seconds = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result["hit_ratio"] = self.hit_ratio
+        return result
+
+
+class CacheBackend:
+    """Storage of PDF bytes by render key."""
+
+    def __init__(self):
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, pdf: bytes) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU holding at most ``max_bytes`` of PDFs. A document larger
+    than the whole budget is not stored.
+    """
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+            return pdf
+
+    def set(self, key: str, pdf: bytes) -> None:
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = pdf
+            self.size += len(pdf)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DirectoryCache(CacheBackend):
+    """
+    PDFs stored as ``<key>.pdf`` files in ``path``, shared by every process
+    using the directory. When the files exceed ``max_bytes`` the least
+    recently used ones (by modification time, refreshed on every hit) are
+    deleted. Files are written to a temporary name and renamed, so readers
+    never see a partial PDF.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DIRECTORY_CACHE_BYTES):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Never stored, or evicted by another process
+            return None
+        return pdf
+
+    def set(self, key: str, pdf: bytes) -> None:
+        if len(pdf) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp_path, self._file(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._evict()
+
+    def _entries(self) -> Iterable[os.DirEntry]:
+        with os.scandir(self.path) as entries:
+            return [entry for entry in entries if entry.name.endswith(".pdf") and entry.is_file()]
+
+    def _evict(self) -> None:
+        files = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class RenderCache:
+    """
+    Memoizes ``pdf_bytes_from_layout`` by content: identical layout, rows
+    and group data return the stored PDF instead of rendering again, at the
+    cost of hashing the inputs.
+
+    Inputs that cannot be encoded, or hashed without being consumed (a
+    one-shot iterator in a block's ``data`` or the group data), bypass the
+    cache with a warning.
+
+    Keys cover the data, not code (and data files named by path in a
+    block's own ``data`` are keyed by path): after changing a registered
+    transform, a font or the library itself, clear the cache. Transforms
+    given as Python callables are keyed by object, so they only hit within
+    one process.
+
+    Args:
+        backend: A CacheBackend; defaults to a MemoryCache
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.metrics = CacheMetrics()
+        self._lock = threading.Lock()
+
+    def generate_pdf_from_layout(self, layout: Dict, filename: Any = "output.pdf", stats=None,
+                                 group_context: Optional[Dict] = None):
+        """
+        ``generate_pdf_from_layout`` through the cache: writes the PDF to
+        ``filename`` (a path or binary file-like object) and returns ``stats``.
+        """
+        if filename is None:
+            raise ValueError("filename is required; use pdf_bytes_from_layout to get the PDF bytes")
+        write_pdf(self.pdf_bytes_from_layout(layout, stats, group_context), filename)
+        return stats
+
+    def pdf_bytes_from_layout(self, layout: Dict, stats=None, group_context: Optional[Dict] = None) -> bytes:
+        """
+        ``pdf_bytes_from_layout`` through the cache. ``stats`` only receives
+        records when the PDF is actually rendered.
+        """
+        start = time.perf_counter()
+        data_rows = as_rows(layout.get("data_rows"))
+        if isinstance(data_rows, IterableSource):
+            # A one-shot iterator has to be kept for rendering after hashing
+            data_rows = list(data_rows)
+        try:
+            key = render_key(layout, data_rows, group_context)
+        except UncacheableInput as e:
+            logger.warning("Render cache bypassed: %s", e)
+            with self._lock:
+                self.metrics.bypasses += 1
+            return pdf_bytes_from_layout(dict(layout, data_rows=data_rows), stats, group_context)
+        hashed = time.perf_counter()
+
+        pdf = self.backend.get(key)
+        with self._lock:
+            self.metrics.hash_seconds += hashed - start
+            if pdf is not None:
+                self.metrics.hits += 1
+                self.metrics.hit_bytes += len(pdf)
+            else:
+                self.metrics.misses += 1
+        if pdf is not None:
+            logger.debug("Render cache hit %s (%d bytes)", key, len(pdf))
+            return pdf
+
+        pdf = pdf_bytes_from_layout(dict(layout, data_rows=data_rows), stats, group_context)
+        self.backend.set(key, pdf)
+        with self._lock:
+            self.metrics.render_seconds += time.perf_counter() - hashed
+            self.metrics.stored_bytes += len(pdf)
+        logger.debug("Render cache miss %s (%d bytes)", key, len(pdf))
+        return pdf
+
+    def clear(self) -> None:
+        """Drop every stored PDF (metrics are kept)."""
+        self.backend.clear()
@@ -1,68 +1,220 @@
+import logging
 from reportlab.platypus import Spacer, PageBreak, Table as RLTable, Paragraph
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from layout_lib.table import build_table, build_data_table
-from layout_lib.transform_utils import apply_transforms, TRANSFORMS
+from layout_lib.aggregates import (
+    aggregate_fields, aggregate_rows, footer_accumulators, footer_cells, footer_rows, variable_aggregate,
+)
+from layout_lib.table import (
+    TableOptions, build_body_rows, build_grouped_tables, build_table, group_by_keys, order_rows, partition_rows,
+    table_order,
+)
+from layout_lib.dataset import Dataset
+from layout_lib.field_map import compile_field_map
+from layout_lib.transform_utils import resolve_transform
 from layout_lib.separator import Separator
-from layout_lib.filter_utils import apply_filter
+from layout_lib.filter_utils import FilterSet, _freeze, compile_filter, exclude_matching, iter_excluding
+from layout_lib.logging_utils import get_logger
+from layout_lib.profiling import NULL_STATS, block_name
+from layout_lib.sources import as_rows, first_row
+from layout_lib.sqlite_source import SqliteSource, condition_fields, sql_translatable
+from layout_lib.styles import body_text_style
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+class FlowableCache:
+    """
+    Per-render memo of the flowables built for separator and variable blocks.
+
+    Separators are keyed by their block content, variables by their block
+    content and the values they read (from their group or the data row),
+    so a group-bound variable or an identical cell repeated across a grid
+    is built once per render. ReportLab re-wraps a flowable every time it
+    is placed, so one instance can appear several times in a story; it is
+    not shared across renders because drawing sets state on it.
+
+    The aggregates read by variable blocks are memoized per row source, with
+    every field in ``aggregate_fields`` accumulated in the same pass.
+    """
+
+    def __init__(self, aggregate_fields=()):
+        self._flowables = {}
+        self._block_keys = {}
+        self._aggregates = {}
+        self.aggregate_fields = list(aggregate_fields)
+        self.hits = 0
+        self.misses = 0
+
+    def block_key(self, block):
+        """Hashable content key of a block, worked out once per block."""
+        entry = self._block_keys.get(id(block))
+        if entry is None:
+            # The block is kept alongside so its id cannot be reused meanwhile
+            entry = self._block_keys[id(block)] = (block, _freeze(block))
+        return entry[1]
+
+    def get(self, key, build):
+        """The flowable cached under ``key``, calling ``build()`` on a miss."""
+        try:
+            flowable = self._flowables.get(key, _MISSING)
+        except TypeError:
+            # Unhashable values, e.g. a nested dict field
+            return build()
+        if flowable is _MISSING:
+            self.misses += 1
+            flowable = self._flowables[key] = build()
+        else:
+            self.hits += 1
+        return flowable
+
+    def aggregates(self, rows, field):
+        """The Accumulators of ``rows``, including one for ``field``."""
+        entry = self._aggregates.get(id(rows))
+        if entry is None:
+            fields = self.aggregate_fields if field in self.aggregate_fields else [field]
+            # The rows are kept alongside so their id cannot be reused meanwhile
+            entry = self._aggregates[id(rows)] = (rows, aggregate_rows(rows, fields))
+        elif field not in entry[1]:
+            entry[1].update(aggregate_rows(rows, [field]))
+        return entry[1]
+
+def render_block(block, data_rows, group_context=None, indexes=None, stats=None, prepared=None,
+                 flowable_cache=None):
+    if stats is None or not stats.enabled:
+        return _render_block(block, data_rows, group_context, indexes, NULL_STATS, prepared, flowable_cache)
+    with stats.phase("block", block_name(block)):
+        return _render_block(block, data_rows, group_context, indexes, stats, prepared, flowable_cache)
+
+def separator_args(block):
+    """Positional Separator arguments for a separator block."""
+    length = block.get("length", 500)
+    thickness = block.get("thickness", 1)
+    color_name = block.get("color", "black")
+    direction = block.get("direction", "horizontal")
+    color = getattr(colors, color_name, colors.black)
+    margin_before = block.get("margin_before", 10)
+    margin_after = block.get("margin_after", 10)
+    dash = block.get("dash", None)
+    return (length, thickness, color, direction, margin_before, margin_after, dash)
+
+def _render_block(block, data_rows, group_context, indexes, stats, prepared, flowable_cache):
+    # Data-independent parts precomputed by compile_layout, if any
+    prep = prepared.get(id(block)) if prepared else None
 
-def render_block(block, data_rows, group_context=None):
     if block["type"] == "table":
-        print("🔍 Table block found")
-        print(f"🔍 Block data: {block.get('data')}")
-        print(f"🔍 Data rows: {data_rows}")
         # Use block['data'] if present, else fall back to data_rows
-        table_data_rows = block.get("data", data_rows)
-        print(f"🔍 Using table data rows: {table_data_rows}")
+        table_data_rows = as_rows(block["data"]) if "data" in block else data_rows
+        negative_filter = prep.negative_filter if prep else block.get("negative_filter")
+        options = prep.table_options if prep else None
+        plan = options.plan if options else compile_field_map(block["field_map"])
+        group_keys = options.group_by if options else group_by_keys(block)
+        footers = options.footers if options else footer_rows(block, plan)
+        sort_by, offset, limit = (options.sort_by, options.offset, options.limit) if options else table_order(block)
+        if isinstance(table_data_rows, SqliteSource):
+            # The database filters the rows and only returns the columns read here
+            columns = list(plan.source_keys) + list(group_keys) + [field for field, _ in sort_by]
+            if negative_filter:
+                negative_filter = _valid_conditions(negative_filter)
+                if all(sql_translatable(condition) for condition in negative_filter):
+                    table_data_rows = table_data_rows.exclude(negative_filter)
+                    negative_filter = None
+                else:
+                    # Left to the stream stage below, which reads its fields from the rows
+                    columns += [field for condition in negative_filter for field in condition_fields(condition)]
+            table_data_rows = table_data_rows.project(columns)
+        columnar = isinstance(table_data_rows, Dataset)
+        streaming = not columnar and not isinstance(table_data_rows, list)
+        if streaming:
+            # Rows flow through filter and transform as generator stages
+            table_data_rows = counter = _RowCounter(table_data_rows)
+        else:
+            rows_in = len(table_data_rows)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Table block options: %s", {k: v for k, v in block.items() if k not in ("data", "data_rows")})
+            logger.debug("Table data rows: %s", table_data_rows)
         
         # Apply negative filter if specified
-        negative_filter = block.get("negative_filter")
-        if negative_filter and table_data_rows:
-            print(f"🔍 Applying negative filters: {negative_filter}")
-            try:
-                # Handle both single filter and list of filters
-                if not isinstance(negative_filter, list):
-                    negative_filter = [negative_filter]
-                
-                # Track all objects to exclude
-                excluded_indices = set()
-                
-                for filter_condition in negative_filter:
-                    print(f"🔍 Processing negative filter: {filter_condition}")
-                    # Apply filter to find objects that match this condition
-                    filtered_data = apply_filter(table_data_rows, filter_condition)
-                    
-                    # Mark matching objects for exclusion
-                    for i, obj in enumerate(table_data_rows):
-                        if obj in filtered_data:
-                            excluded_indices.add(i)
-                            print(f"🔍 Excluding object {i}: {obj.get('RIC', 'N/A')} (matches: {filter_condition})")
-                
-                # Keep only objects that were NOT excluded by any negative filter
-                table_data_rows = [obj for i, obj in enumerate(table_data_rows) if i not in excluded_indices]
-                print(f"🔍 After negative filters: {len(table_data_rows)} objects remaining")
-            except Exception as e:
-                print(f"⚠️ Negative filter error: {e}")
+        if negative_filter and (streaming or table_data_rows):
+            logger.debug("Applying negative filters: %s", negative_filter)
+            with stats.phase("negative_filter", block_name(block)) as record:
+                # Invalid conditions are dropped; one raising on a row doesn't match that row
+                conditions = _valid_conditions(negative_filter)
+                if streaming:
+                    table_data_rows = iter_excluding(table_data_rows, conditions, _condition_error)
+                elif columnar:
+                    record.rows = rows_in
+                    try:
+                        # Evaluated as boolean masks over whole columns
+                        table_data_rows = table_data_rows.exclude(conditions)
+                    except Exception:
+                        # Row by row, so only the failing condition is skipped where it fails
+                        filter_set = FilterSet(conditions)
+                        errors = {}
+                        positions = [i for i, row in enumerate(table_data_rows)
+                                     if not filter_set.any_match_isolated(row, errors)]
+                        for number, e in errors.items():
+                            _condition_error(conditions[number], e)
+                        table_data_rows = table_data_rows.select(positions)
+                else:
+                    record.rows = rows_in
+                    # One FilterSet pass beats building field indexes for a single use;
+                    # callers can still pass an IndexRegistry they share elsewhere
+                    index = indexes.get(table_data_rows) if indexes is not None else None
+                    # Keep only objects that were NOT excluded by any negative filter
+                    table_data_rows = exclude_matching(table_data_rows, conditions, index, _condition_error)
         
-        block["data_rows"] = table_data_rows
-        field_map = block["field_map"]
-        print(f"🔍 Field map: {field_map}")
-        transformed_rows = apply_transforms(field_map, table_data_rows)
-        print(f"🔍 Transformed rows: {transformed_rows}")
-        table_data = build_data_table(field_map, transformed_rows)
-        print(f"🔍 Final table data: {table_data}")
-        return build_table(table_data, block)
+        if sort_by or offset or limit is not None:
+            with stats.phase("order", block_name(block)) as record:
+                if not streaming:
+                    record.rows = len(table_data_rows)
+                table_data_rows = order_rows(table_data_rows, sort_by, offset, limit)
+
+        with stats.phase("transform", block_name(block)) as record:
+            if group_keys:
+                # One hashed pass splits the rows, then each partition is transformed once
+                sections = []
+                body_count = 0
+                for value, rows in partition_rows(table_data_rows, group_keys):
+                    # Footers are accumulated while the rows are transformed
+                    accumulators = footer_accumulators(footers)
+                    body_rows = build_body_rows(plan, rows, accumulators)
+                    body_count += len(body_rows)
+                    sections.append((value, body_rows + footer_cells(footers, accumulators, plan)))
+            else:
+                accumulators = footer_accumulators(footers)
+                body_rows = build_body_rows(plan, table_data_rows, accumulators)
+                body_count = len(body_rows)
+                body_rows += footer_cells(footers, accumulators, plan)
+            record.rows = body_count
+            record.cells = record.rows * len(plan.leaves)
+        if streaming:
+            rows_in = counter.count
+        logger.info(
+            "Table block: %d rows, %d after negative filters, %d columns, %d header rows",
+            rows_in, body_count, len(plan.leaves), plan.depth,
+        )
+        if group_keys:
+            logger.info("Table block grouped by %s: %d partitions", ", ".join(group_keys), len(sections))
+            with stats.phase("table_build", block_name(block)) as record:
+                record.rows = body_count
+                if options is None:
+                    # Shared by the tables of every partition
+                    options = TableOptions(block, plan.depth)
+                return build_grouped_tables(plan.header_rows(), sections, block, stats, options, len(footers))
+
+        table_data = plan.header_rows() + body_rows
+        logger.debug("Final table data: %s", table_data)
+        with stats.phase("table_build", block_name(block)) as record:
+            record.rows = len(table_data)
+            return build_table(table_data, block, stats, header_rows_count=plan.depth, options=options,
+                               footer_rows_count=len(footers))
 
     elif block["type"] == "separator":
-        length = block.get("length", 500)
-        thickness = block.get("thickness", 1)
-        color_name = block.get("color", "black")
-        direction = block.get("direction", "horizontal")
-        color = getattr(colors, color_name, colors.black)
-        margin_before = block.get("margin_before", 10)
-        margin_after = block.get("margin_after", 10)
-        dash = block.get("dash", None)
-        return Separator(length, thickness, color, direction, margin_before, margin_after, dash)
+        build = lambda: Separator(*(prep.separator_args if prep else separator_args(block)))
+        if flowable_cache is None:
+            return build()
+        return flowable_cache.get(("separator", flowable_cache.block_key(block)), build)
 
     elif block["type"] == "variable":
         label = block.get("label", "")
@@ -70,8 +222,11 @@ def render_block(block, data_rows, group_context=None):
         transform_name = block.get("transform")
         group_name = block.get("group_name")
 
+        aggregate = prep.aggregate if prep else variable_aggregate(block)
         value = ""
-        if group_name and group_context and group_name in group_context:
+        if aggregate:
+            values = _aggregate_value(block, aggregate, data_rows, group_context, flowable_cache)
+        elif group_name and group_context and group_name in group_context:
             group_data = group_context[group_name]
             if isinstance(group_data, list) and group_data:
                 # If group_data is a list, use the first item
@@ -84,48 +239,203 @@ def render_block(block, data_rows, group_context=None):
                 values = group_data.get(key, "")
         else:
             # fallback to first row in data_rows if no group data
-            if data_rows and "|" in key:
+            row = first_row(data_rows) if data_rows else None
+            if row and "|" in key:
                 keys = key.split("|")
-                values = [data_rows[0].get(k.strip(), "") for k in keys]
-            elif data_rows:
-                values = data_rows[0].get(key, "")
+                values = [row.get(k.strip(), "") for k in keys]
+            elif row:
+                values = row.get(key, "")
             else:
                 values = ""
 
-        # Apply transform if specified
-        if transform_name:
-            transform = TRANSFORMS.get(transform_name)
-            if transform:
-                try:
-                    value = transform(values)
-                except Exception as e:
-                    print(f"⚠️ Transform error in variable '{key}': {e}")
-            else:
-                # fallback if transform not found: just join if list else str
-                if isinstance(values, list):
-                    value = " ".join(str(v) for v in values)
-                else:
-                    value = str(values)
+        if flowable_cache is None:
+            return _variable_paragraph(block, prep, label, key, transform_name, values)
+        # Typed key: 1, 1.0 and True must not share a paragraph
+        return flowable_cache.get(
+            ("variable", flowable_cache.block_key(block), _freeze(values)),
+            lambda: _variable_paragraph(block, prep, label, key, transform_name, values),
+        )
+
+    elif block["type"] == "group":
+        # group holds data only; no rendering output
+        return None
+
+    return None
+
+
+def _aggregate_value(block, aggregate, data_rows, group_context, flowable_cache):
+    """
+    The aggregate of a variable block over its group's rows, or over
+    ``data_rows`` without a group; "" when there is nothing to aggregate.
+    """
+    key = block.get("key")
+    group_name = block.get("group_name")
+    if group_name and group_context and group_name in group_context:
+        rows = group_context[group_name]
+        if isinstance(rows, dict):
+            rows = [rows]
+    else:
+        rows = data_rows if data_rows is not None else []
+    if flowable_cache is None:
+        accumulators = aggregate_rows(rows, [key])
+    else:
+        accumulators = flowable_cache.aggregates(rows, key)
+    result = accumulators[key].result(aggregate)
+    return "" if result is None else result
+
+def _variable_paragraph(block, prep, label, key, transform_name, values):
+    """The Paragraph of a variable block for the values it reads."""
+    value = ""
+    # Apply transform if specified
+    if transform_name:
+        transform = prep.transform if prep else resolve_variable_transform(block)
+        if transform:
+            try:
+                value = transform(values)
+            except Exception as e:
+                logger.warning("Transform error in variable '%s': %s", key, e)
         else:
-            # no transform, if list join by space
+            # fallback if transform not found: just join if list else str
             if isinstance(values, list):
                 value = " ".join(str(v) for v in values)
             else:
                 value = str(values)
+    else:
+        # no transform, if list join by space
+        if isinstance(values, list):
+            value = " ".join(str(v) for v in values)
+        else:
+            value = str(values)
 
-        style = getSampleStyleSheet()["BodyText"]
-        return Paragraph(f"{label}: {value}", style)
+    style = prep.style if prep else body_text_style()
+    return Paragraph(f"{label}: {value}", style)
 
-    elif block["type"] == "group":
-        # group holds data only; no rendering output
+
+def resolve_variable_transform(block):
+    """The transform callable of a variable block, None (with a warning) if invalid."""
+    try:
+        return resolve_transform(block.get("transform"))
+    except ValueError as e:
+        logger.warning("Transform error in variable '%s': %s", block.get("key"), e)
         return None
 
-    return None
+
+def _valid_conditions(negative_filter):
+    """The conditions of a negative filter that compile; the others are logged and dropped."""
+    conditions = negative_filter if isinstance(negative_filter, list) else [negative_filter]
+    valid = []
+    for condition in conditions:
+        try:
+            compile_filter(condition)
+        except Exception as e:
+            logger.warning("Negative filter error: %s", e)
+        else:
+            valid.append(condition)
+    return valid
+
+def _condition_error(condition, error):
+    logger.warning("Negative filter error: %s (%r does not match the rows it fails on)", error, condition)
+
+class _RowCounter:
+    """Pass-through stage counting the rows read from a streamed source."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def resolve_groups(children, group_context, stats=NULL_STATS):
+    """
+    Fill ``group_context`` with the data of the group blocks in ``children``:
+    list and SQLite data is narrowed by the group's filter, dict data is
+    used as is.
+
+    All groups over the same list are resolved together: their filters go
+    into one FilterSet and the list is partitioned in a single pass.
+    """
+    groups = [block for block in children if block.get("type") == "group"]
+
+    shared = {}
+    for block in groups:
+        raw_data = block.get("data", {})
+        if isinstance(raw_data, (list, SqliteSource)) and not block.get("filter"):
+            raise ValueError(f"Group '{block.get('group_name')}' is a list but missing 'filter' field.")
+        if isinstance(raw_data, list):
+            shared.setdefault(id(raw_data), (raw_data, []))[1].append(block)
+
+    # id(block) -> matching rows, or the exception its filter raised
+    outcomes = {}
+    for raw_data, blocks in shared.values():
+        name = block_name(blocks[0]) if len(blocks) == 1 else f"groups:{len(blocks)}"
+        with stats.phase("group_filter", name) as record:
+            record.rows = len(raw_data)
+            valid = []
+            for block in blocks:
+                try:
+                    compile_filter(block["filter"])
+                    valid.append(block)
+                except Exception as e:
+                    outcomes[id(block)] = e
+            buckets, errors = FilterSet([block["filter"] for block in valid]).partition(raw_data)
+            for number, block in enumerate(valid):
+                outcomes[id(block)] = errors.get(number, buckets[number])
+
+    for block in groups:
+        group_name = block.get("group_name")
+        raw_data = block.get("data", {})
+        filter_condition = block.get("filter")
+
+        if isinstance(raw_data, (list, SqliteSource)):
+            if isinstance(raw_data, SqliteSource):
+                try:
+                    with stats.phase("group_filter", block_name(block)):
+                        # Evaluated by the database as a WHERE clause
+                        outcome = list(raw_data.filter(filter_condition))
+                except Exception as e:
+                    outcome = e
+            else:
+                outcome = outcomes[id(block)]
+
+            if isinstance(outcome, Exception):
+                logger.warning("Filter error in group '%s': %s", group_name, outcome)
+                group_context[group_name] = {}
+            elif outcome:
+                group_context[group_name] = outcome
+            else:
+                logger.warning("No match found in group '%s' for filter: %s", group_name, filter_condition)
+                group_context[group_name] = {}
+        elif isinstance(raw_data, dict):
+            group_context[group_name] = raw_data
+        else:
+            logger.warning("Unsupported group data format in group '%s'", group_name)
 
 
-def interpret_layout(layout, data_rows, group_context=None):
+def _add_rendered(items, rendered):
+    """
+    Add a block's output to a column, row or grid row: tables split into
+    long-table chunks or group_by sections come back as a list, which is
+    expanded like the flowables of a nested container.
+    """
+    if isinstance(rendered, list):
+        items.extend(rendered)
+    elif rendered:
+        items.append(rendered)
+
+
+def interpret_layout(layout, data_rows, group_context=None, indexes=None, stats=None, prepared=None,
+                     flowable_cache=None):
     if group_context is None:
         group_context = {}
+    if stats is None:
+        stats = NULL_STATS
+    if flowable_cache is None:
+        # Static and group-only flowables are built once per render
+        flowable_cache = FlowableCache(aggregate_fields(layout))
 
     flowables = []
     layout_type = layout.get("type", "column")
@@ -133,30 +443,7 @@ def interpret_layout(layout, data_rows, group_context=None):
     columns = layout.get("columns", 2)
 
     if not group_context:
-        for block in children:
-            if block.get("type") == "group":
-                group_name = block.get("group_name")
-                raw_data = block.get("data", {})
-                filter_condition = block.get("filter")
-
-                if isinstance(raw_data, list):
-                    if not filter_condition:
-                        raise ValueError(f"Group '{group_name}' is a list but missing 'filter' field.")
-
-                    try:
-                        filtered_data = apply_filter(raw_data, filter_condition)
-                        if filtered_data:
-                            group_context[group_name] = filtered_data
-                        else:
-                            print(f"⚠️ No match found in group '{group_name}' for filter: {filter_condition}")
-                            group_context[group_name] = {}
-                    except Exception as e:
-                        print(f"⚠️ Filter error in group '{group_name}': {e}")
-                        group_context[group_name] = {}
-                elif isinstance(raw_data, dict):
-                    group_context[group_name] = raw_data
-                else:
-                    print(f"⚠️ Unsupported group data format in group '{group_name}'")
+        resolve_groups(children, group_context, stats)
 
     if layout_type == "column":
         for block in children:
@@ -164,11 +451,10 @@ def interpret_layout(layout, data_rows, group_context=None):
                 continue  # skip rendering group blocks
             if "children" in block:
                 # nested container, recurse
-                flowables.extend(interpret_layout(block, data_rows, group_context))
+                flowables.extend(interpret_layout(block, data_rows, group_context, indexes, stats, prepared, flowable_cache))
             else:
-                rendered = render_block(block, data_rows, group_context)
-                if rendered:
-                    flowables.append(rendered)
+                rendered = render_block(block, data_rows, group_context, indexes, stats, prepared, flowable_cache)
+                _add_rendered(flowables, rendered)
 
     elif layout_type == "row":
         row_items = []
@@ -177,12 +463,11 @@ def interpret_layout(layout, data_rows, group_context=None):
                 continue
             if "children" in block:
                 # For nested containers inside row, render them and append as flowables
-                nested = interpret_layout(block, data_rows, group_context)
+                nested = interpret_layout(block, data_rows, group_context, indexes, stats, prepared, flowable_cache)
                 row_items.extend(nested)
             else:
-                rendered = render_block(block, data_rows, group_context)
-                if rendered:
-                    row_items.append(rendered)
+                rendered = render_block(block, data_rows, group_context, indexes, stats, prepared, flowable_cache)
+                _add_rendered(row_items, rendered)
         if row_items:
             flowables.append(RLTable([row_items], hAlign='LEFT'))
 
@@ -195,11 +480,15 @@ def interpret_layout(layout, data_rows, group_context=None):
                 if block.get("type") == "group":
                     continue
                 if "children" in block:
-                    nested = interpret_layout(block, data_rows, group_context)
+                    nested = interpret_layout(block, data_rows, group_context, indexes, stats, prepared, flowable_cache)
                     row.extend(nested)
                 else:
-                    rendered = render_block(block, data_rows, group_context)
-                    row.append(rendered)
+                    rendered = render_block(block, data_rows, group_context, indexes, stats, prepared, flowable_cache)
+                    if isinstance(rendered, list):
+                        row.extend(rendered)
+                    else:
+                        # Empty blocks keep their cell so the columns stay aligned
+                        row.append(rendered)
                 if (i + 1) % columns == 0:
                     grid_rows.append(row)
                     row = []
@@ -216,20 +505,19 @@ def interpret_layout(layout, data_rows, group_context=None):
                         continue
                     if "children" in block:
                         # For nested blocks, create a sub-grid
-                        nested = interpret_layout(block, [data_row], group_context)
+                        nested = interpret_layout(block, [data_row], group_context, indexes, stats, prepared, flowable_cache)
                         row.extend(nested)
                     else:
                         # For single blocks, render with current data row
-                        rendered = render_block(block, [data_row], group_context)
-                        if rendered:
-                            row.append(rendered)
+                        rendered = render_block(block, [data_row], group_context, indexes, stats, prepared, flowable_cache)
+                        _add_rendered(row, rendered)
                 if row:
                     grid_rows.append(row)
             if grid_rows:
                 flowables.append(RLTable(grid_rows, hAlign='LEFT'))
 
     else:
-        print(f"⚠️ Unsupported layout type '{layout_type}'. Supported types are: column, row, grid")
+        logger.warning("Unsupported layout type '%s'. Supported types are: column, row, grid", layout_type)
         return []
 
     return flowables
\ No newline at end of file
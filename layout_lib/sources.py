@@ -0,0 +1,227 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+import csv
+import json
+import os
+import re
+
+# Characters read from disk per refill when parsing JSON arrays
+JSON_CHUNK_SIZE = 1 << 16
+
+_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+
+
+class RowSource:
+    """
+    Re-iterable stream of row dicts.
+
+    Every ``iter()`` starts a fresh pass (file sources reopen the file), so
+    a layout can read the same source from several blocks while only one
+    row per active pass is held in memory.
+    """
+
+    def __iter__(self) -> Iterator[Dict]:
+        raise NotImplementedError
+
+    def __bool__(self) -> bool:
+        # Peek one row; bool() must not drain the source
+        for _ in self:
+            return True
+        return False
+
+
+class FileSource(RowSource):
+    def __init__(self, path: Union[str, os.PathLike], encoding: str = "utf-8"):
+        self.path = os.fspath(path)
+        self.encoding = encoding
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r})"
+
+
+class JsonLinesSource(FileSource):
+    """One JSON object per line (NDJSON); blank lines are skipped."""
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, encoding=self.encoding) as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{self.path}:{line_number}: invalid JSON line: {e}") from e
+
+
+class CsvSource(FileSource):
+    """
+    CSV with a header row. With ``numeric`` (the default) plain integer and
+    decimal values are converted to int/float so comparison filters work;
+    everything else stays a string.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], encoding: str = "utf-8",
+                 numeric: bool = True, **reader_options: Any):
+        super().__init__(path, encoding)
+        self.numeric = numeric
+        self.reader_options = reader_options
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, encoding=self.encoding, newline="") as f:
+            for row in csv.DictReader(f, **self.reader_options):
+                if self.numeric:
+                    row = {key: _coerce(value) for key, value in row.items()}
+                yield row
+
+
+def _coerce(value: Any) -> Any:
+    if isinstance(value, str) and _NUMBER.fullmatch(value):
+        return float(value) if "." in value else int(value)
+    return value
+
+
+class JsonArraySource(FileSource):
+    """
+    A top-level JSON array, parsed one element at a time from fixed-size
+    chunks instead of loading the whole document.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], encoding: str = "utf-8",
+                 chunk_size: int = JSON_CHUNK_SIZE):
+        super().__init__(path, encoding)
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, encoding=self.encoding) as f:
+            yield from iter_json_array(f, self.chunk_size)
+
+
+def iter_json_array(f, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of the JSON array read incrementally from text file ``f``."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def refill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def next_char():
+        # First non-whitespace character at or after pos, refilling as needed
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return ""
+            refill()
+
+    if next_char() != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            refill()
+            continue
+        if end == len(buffer) and not eof:
+            # A scalar may continue in the next chunk (e.g. a split number)
+            refill()
+            continue
+        yield item
+        pos = end
+
+        separator = next_char()
+        if separator == ",":
+            pos += 1
+        elif separator == "]":
+            return
+        else:
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {separator!r}")
+
+
+class IterableSource(RowSource):
+    """
+    Wraps any iterable of rows. Re-iterable inputs (tuples, objects whose
+    ``__iter__`` starts a new pass) can be read many times; a one-shot
+    iterator such as a generator can only be consumed once, and a second
+    pass raises instead of silently rendering nothing.
+    """
+
+    def __init__(self, rows: Iterable[Dict]):
+        self.rows = rows
+        self._one_shot = iter(rows) is rows
+        self._consumed = False
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._one_shot:
+            if self._consumed:
+                raise RuntimeError(
+                    "data_rows is a one-shot iterator that was already consumed; "
+                    "pass a list or a RowSource when several blocks read the data"
+                )
+            self._consumed = True
+        return iter(self.rows)
+
+    def __bool__(self) -> bool:
+        if self._one_shot:
+            # Peeking would consume a row of the iterator
+            return True
+        return super().__bool__()
+
+
+SOURCE_TYPES = {
+    ".jsonl": JsonLinesSource,
+    ".ndjson": JsonLinesSource,
+    ".csv": CsvSource,
+    ".json": JsonArraySource,
+}
+
+
+def open_source(path: Union[str, os.PathLike], **options: Any) -> FileSource:
+    """Open a row file by extension: .jsonl/.ndjson, .csv or .json (array)."""
+    extension = os.path.splitext(os.fspath(path))[1].lower()
+    source_type = SOURCE_TYPES.get(extension)
+    if source_type is None:
+        raise ValueError(f"Unsupported data file '{path}'. Supported: {', '.join(SOURCE_TYPES)}")
+    return source_type(path, **options)
+
+
+def as_rows(data: Any) -> Any:
+    """
+    Normalize ``data_rows``: lists and RowSources are returned as is, paths
+    are opened with ``open_source`` and other iterables are wrapped in an
+    IterableSource.
+    """
+    if data is None:
+        return []
+    if isinstance(data, (list, RowSource)):
+        return data
+    if isinstance(data, (str, os.PathLike)):
+        return open_source(data)
+    if isinstance(data, dict):
+        raise TypeError("data_rows must be a list, an iterable of rows or a data file path, not a dict")
+    return IterableSource(data)
+
+
+def first_row(rows: Any) -> Optional[Dict]:
+    """The first row of a list or row source, or None when empty."""
+    if isinstance(rows, list):
+        return rows[0] if rows else None
+    for row in rows:
+        return row
+    return None
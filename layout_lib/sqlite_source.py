@@ -0,0 +1,304 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import os
+import sqlite3
+from pathlib import Path
+
+from layout_lib.filter_utils import OPERATORS, _build_predicate, compile_filter
+from layout_lib.logging_utils import get_logger
+from layout_lib.sources import RowSource
+
+logger = get_logger(__name__)
+
+# Rows fetched from the cursor per round trip
+SQLITE_BATCH_SIZE = 1000
+
+# Operators translated to SQL, captured so that a replaced entry in
+# OPERATORS is evaluated in Python instead of being translated wrongly
+_SQL_OPERATORS = {op: OPERATORS[op] for op in
+                  ("=", "!=", ">", ">=", "<", "<=", "in", "not_in", "contains", "starts_with", "ends_with")}
+
+_RANGE_SQL = {">": ">", ">=": ">=", "<": "<", "<=": "<="}
+
+_BINDABLE = (str, int, float, bytes)
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_affinity(declared_type: str) -> str:
+    """SQLite's type affinity for a declared column type."""
+    declared = (declared_type or "").upper()
+    if "INT" in declared:
+        return "INTEGER"
+    if any(name in declared for name in ("CHAR", "CLOB", "TEXT")):
+        return "TEXT"
+    if not declared or "BLOB" in declared:
+        return "BLOB"
+    if any(name in declared for name in ("REAL", "FLOA", "DOUB")):
+        return "REAL"
+    return "NUMERIC"
+
+
+class _SqlTranslator:
+    """
+    Translates parsed filter nodes (see ``parse_condition``) to SQL.
+
+    Every expression evaluates to 0 or 1, never NULL, so ``NOT`` behaves
+    like Python's ``not``: equality uses ``IS``, ranges and string tests
+    guard against NULL. Fields that are not columns of the table read as
+    NULL, like ``row.get`` gives None.
+    """
+
+    def __init__(self, affinities: Dict[str, str]):
+        self.affinities = affinities
+
+    def column(self, field: str, values: Sequence[Any]) -> str:
+        """
+        The column as an operand. A column's affinity converts the values it
+        is compared with (so a TEXT '5' would equal an INTEGER 5); when the
+        values don't already have the column's type, ``+column`` (which has
+        no affinity) keeps the comparison strict like Python's.
+        """
+        affinity = self.affinities.get(field)
+        if affinity is None:
+            return "NULL"
+        quoted = quote_identifier(field)
+        if affinity == "BLOB":
+            return quoted
+        for value in values:
+            if value is None:
+                continue
+            if affinity == "TEXT" and isinstance(value, str):
+                continue
+            if affinity != "TEXT" and isinstance(value, (int, float)):
+                continue
+            return "+" + quoted
+        return quoted
+
+    def translate(self, node: Tuple) -> Optional[Tuple[str, List[Any]]]:
+        """``(sql, params)`` for the node, or None if it needs Python."""
+        kind = node[0]
+        if kind in ("and", "or"):
+            parts = [self.translate(child) for child in node[1]]
+            if any(part is None for part in parts):
+                return None
+            if not parts:
+                return ("1", []) if kind == "and" else ("0", [])
+            joiner = " AND " if kind == "and" else " OR "
+            return "(" + joiner.join(sql for sql, _ in parts) + ")", [p for _, params in parts for p in params]
+        if kind == "not":
+            inner = self.translate(node[1])
+            return None if inner is None else (f"NOT {inner[0]}", inner[1])
+        if kind == "cmp":
+            return self._compare(*node[1:])
+        return "0", []
+
+    def _compare(self, field: str, op: Optional[str], value: Any) -> Optional[Tuple[str, List[Any]]]:
+        if op is not None and OPERATORS.get(op) is not _SQL_OPERATORS.get(op):
+            return None
+
+        if op in (None, "=", "!="):
+            if value is not None and not isinstance(value, _BINDABLE):
+                return None
+            operator = "IS NOT" if op == "!=" else "IS"
+            return f"{self.column(field, [value])} {operator} ?", [value]
+
+        if op in _RANGE_SQL:
+            if not isinstance(value, (str, int, float)):
+                return None
+            column = self.column(field, [value])
+            return f"({column} IS NOT NULL AND {column} {_RANGE_SQL[op]} ?)", [value]
+
+        if op in ("in", "not_in"):
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                # e.g. a substring test against a string
+                return None
+            if not all(member is None or isinstance(member, _BINDABLE) for member in value):
+                return None
+            members = [member for member in value if member is not None]
+            column = self.column(field, members)
+            parts = []
+            if members:
+                placeholders = ", ".join("?" * len(members))
+                parts.append(f"({column} IS NOT NULL AND {column} IN ({placeholders}))")
+            if len(members) < len(value):
+                parts.append(f"{column} IS NULL")
+            sql = "(" + " OR ".join(parts) + ")" if parts else "0"
+            return (f"NOT {sql}" if op == "not_in" else sql), members
+
+        if op in ("contains", "starts_with", "ends_with"):
+            if not isinstance(value, str):
+                return None
+            column = self.column(field, [value])
+            is_text = f"typeof({column}) = 'text'"
+            if not value:
+                return is_text, []
+            if op == "contains":
+                return f"({is_text} AND instr({column}, ?) > 0)", [value]
+            if op == "starts_with":
+                return f"({is_text} AND substr({column}, 1, ?) = ?)", [len(value), value]
+            return f"({is_text} AND substr({column}, ?) = ?)", [-len(value), value]
+
+        return None
+
+
+def filter_to_sql(condition: Union[str, Dict], affinities: Dict[str, str]) -> Tuple[str, List[Any]]:
+    """
+    Translate a filter condition into a parameterized SQL expression.
+
+    Args:
+        condition: Any filter accepted by ``apply_filter``
+        affinities: Column name -> affinity (see ``column_affinity``) of the
+            table the expression runs against
+
+    Raises:
+        ValueError: The condition uses something SQL cannot express
+            exactly (custom operators, substring ``in`` on a string...)
+    """
+    translated = _SqlTranslator(affinities).translate(compile_filter(condition).node)
+    if translated is None:
+        raise ValueError(f"Filter {condition!r} cannot be translated to SQL")
+    return translated
+
+
+def sql_translatable(condition: Union[str, Dict]) -> bool:
+    """Whether a filter condition runs entirely in SQL, with no Python-side part."""
+    # Translation never depends on the column affinities, only the operands
+    return _SqlTranslator({}).translate(compile_filter(condition).node) is not None
+
+
+def condition_fields(condition: Union[str, Dict]) -> List[str]:
+    """The distinct fields a filter condition reads."""
+    return list(dict.fromkeys(_fields(compile_filter(condition).node)))
+
+
+class SqliteSource(RowSource):
+    """
+    Rows of a SQLite table or view, queried on every pass.
+
+    ``filter`` and ``exclude`` return narrowed sources whose conditions run
+    as a parameterized WHERE clause, and ``project`` limits the selected
+    columns, so only the needed rows and columns leave the database. Parts
+    of a condition SQL can't express exactly are evaluated in Python on the
+    streamed rows; the rest is still pushed down.
+
+    Comparisons follow SQLite where Python would raise (e.g. ``>`` between
+    a string and a number uses SQLite's type ordering instead of failing).
+
+    Args:
+        database: Path of the database file, opened read-only per pass
+        table: Table or view to read
+        where: Optional filter condition applied to every pass
+        columns: Columns to select; None selects all
+        batch_size: Rows fetched per round trip
+    """
+
+    def __init__(self, database: Union[str, os.PathLike], table: str, where: Optional[Union[str, Dict]] = None,
+                 columns: Optional[Sequence[str]] = None, batch_size: int = SQLITE_BATCH_SIZE):
+        self.database = os.fspath(database)
+        self.table = table
+        self.columns = None if columns is None else list(columns)
+        self.batch_size = batch_size
+        # Parsed filter nodes, all of which a row must satisfy
+        self.conditions: Tuple[Tuple, ...] = ()
+        if where is not None:
+            self.conditions = (compile_filter(where).node,)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.database!r}, {self.table!r})"
+
+    def _derive(self, conditions: Tuple[Tuple, ...] = (), columns: Any = False) -> "SqliteSource":
+        source = SqliteSource(self.database, self.table, None,
+                              self.columns if columns is False else columns, self.batch_size)
+        source.conditions = self.conditions + conditions
+        return source
+
+    def filter(self, condition: Union[str, Dict]) -> "SqliteSource":
+        """The rows matching ``condition`` (same semantics as ``apply_filter``)."""
+        return self._derive((compile_filter(condition).node,))
+
+    def exclude(self, conditions: Union[str, Dict, List]) -> "SqliteSource":
+        """The rows matching none of ``conditions``, as ``NOT (c1 OR c2 ...)``."""
+        if not isinstance(conditions, list):
+            conditions = [conditions]
+        nodes = tuple(compile_filter(condition).node for condition in conditions)
+        return self._derive((("not", ("or", nodes)),))
+
+    def project(self, columns: Iterable[str]) -> "SqliteSource":
+        """Select only ``columns`` (missing ones are left out of the rows)."""
+        return self._derive(columns=list(dict.fromkeys(columns)))
+
+    def _connect(self) -> sqlite3.Connection:
+        # as_uri percent-encodes the path, so "%", "?" and "#" in file names survive
+        uri = Path(os.path.abspath(self.database)).as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True)
+
+    def _affinities(self, connection: sqlite3.Connection) -> Dict[str, str]:
+        info = connection.execute(f"PRAGMA table_info({quote_identifier(self.table)})").fetchall()
+        if not info:
+            raise ValueError(f"No table or view '{self.table}' in {self.database}")
+        return {name: column_affinity(declared) for _, name, declared, *_ in info}
+
+    def query(self, affinities: Dict[str, str]) -> Tuple[str, List[Any], List[str], List[Callable[[Dict], bool]]]:
+        """The SELECT statement, its parameters, the selected columns and the Python-side predicates."""
+        translator = _SqlTranslator(affinities)
+        clauses: List[str] = []
+        params: List[Any] = []
+        residual: List[Tuple] = []
+        pending = list(self.conditions)
+        while pending:
+            node = pending.pop(0)
+            if node[0] == "and":
+                # Conjuncts are pushed down independently
+                pending[:0] = node[1]
+                continue
+            translated = translator.translate(node)
+            if translated is None:
+                residual.append(node)
+            else:
+                clauses.append(translated[0])
+                params.extend(translated[1])
+
+        if self.columns is None:
+            selected = list(affinities)
+        else:
+            selected = [name for name in self.columns if name in affinities]
+            # Python-side predicates read their fields from the rows
+            for node in residual:
+                for field in _fields(node):
+                    if field in affinities and field not in selected:
+                        selected.append(field)
+        select_list = ", ".join(map(quote_identifier, selected)) or "NULL"
+        sql = f"SELECT {select_list} FROM {quote_identifier(self.table)}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return sql, params, selected, [_build_predicate(node) for node in residual]
+
+    def __iter__(self) -> Iterator[Dict]:
+        connection = self._connect()
+        try:
+            sql, params, names, predicates = self.query(self._affinities(connection))
+            logger.debug("SQLite query: %s %s", sql, params)
+            cursor = connection.execute(sql, params)
+            while True:
+                batch = cursor.fetchmany(self.batch_size)
+                if not batch:
+                    break
+                for values in batch:
+                    row = dict(zip(names, values))
+                    if all(predicate(row) for predicate in predicates):
+                        yield row
+        finally:
+            connection.close()
+
+
+def _fields(node: Tuple) -> Iterator[str]:
+    kind = node[0]
+    if kind == "cmp":
+        yield node[1]
+    elif kind in ("and", "or"):
+        for child in node[1]:
+            yield from _fields(child)
+    elif kind == "not":
+        yield from _fields(node[1])
@@ -0,0 +1,19 @@
+from functools import lru_cache
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+
+@lru_cache(maxsize=None)
+def sample_style_sheet():
+    """
+    ReportLab's sample stylesheet, built once per process.
+
+    ``getSampleStyleSheet()`` creates every style from scratch on each
+    call; the styles are only read while rendering, so one sheet is shared
+    by all renders and threads. Do not modify the returned styles.
+    """
+    return getSampleStyleSheet()
+
+
+def body_text_style() -> ParagraphStyle:
+    """The shared ``BodyText`` style used for variables and multi-line cells."""
+    return sample_style_sheet()["BodyText"]
@@ -1,107 +1,66 @@
+import heapq
+import re
+import string
+from itertools import islice
+from xml.sax.saxutils import escape
 from reportlab.platypus import Table, TableStyle, Paragraph
 from reportlab.lib import colors
-from reportlab.pdfbase.pdfmetrics import stringWidth
-from reportlab.lib.styles import getSampleStyleSheet
-from layout_lib.transform_utils import TRANSFORMS, parse_lambda
+from layout_lib.aggregates import footer_rows
+from layout_lib.dataset import Dataset, format_column, group_positions, np
+from layout_lib.fast_table import FastTable, is_fast_table_eligible
+from layout_lib.field_map import compile_field_map
+from layout_lib.logging_utils import get_logger
+from layout_lib.profiling import NULL_STATS
+from layout_lib.styles import body_text_style, sample_style_sheet
+from layout_lib.text_metrics import DEFAULT_CELL_FONT, WIDTH_STRATEGIES, estimate_col_widths
+from layout_lib.transform_utils import MAX_TRANSFORM_LENGTH
+
+# Body rows per chunk when a block sets "long_table": true
+LONG_TABLE_CHUNK_ROWS = 100
+
+# "auto" draws eligible tables with at least this many body rows as a FastTable
+FAST_TABLE_MIN_ROWS = 500
+TABLE_RENDERERS = ("auto", "fast", "table")
+
+# Sub-header of each partition of a "group_by" table
+GROUP_LABEL = "{key}: {value}"
+GROUP_LABEL_FIELDS = ("key", "value", "rows")
+GROUP_HEADER_STYLE = "Heading4"
+
+SORT_ORDERS = ("asc", "desc")
+
+# Face of aggregate footer rows, drawn under a heavier rule
+FOOTER_FONT = "Helvetica-Bold"
+
+logger = get_logger(__name__)
 
 def parse_field_map(field_map):
-    final_keys = []
-
-    def get_depth(items):
-        max_depth = 0
-        for item in items:
-            if item.get("group"):
-                max_depth = max(max_depth, 1 + get_depth(item["children"]))
-            else:
-                max_depth = max(max_depth, 1)
-        return max_depth
-
-    depth = get_depth(field_map)
-    header_rows = [[] for _ in range(depth)]
-
-    def recurse(items, row=0, col_ref=[0]):
-        for item in items:
-            col = col_ref[0]
-            if item.get("group"):
-                span = count_leaf_keys(item["children"])
-                header_rows[row] += [""] * (col - len(header_rows[row]))
-                header_rows[row].append(item["label"])
-                for _ in range(1, span):
-                    header_rows[row].append("")
-                recurse(item["children"], row + 1, col_ref)
-            else:
-                header_rows[row] += [""] * (col - len(header_rows[row]))
-                header_rows[row].append(item["label"])
-                for r in range(row + 1, depth):
-                    header_rows[r] += [""] * (col - len(header_rows[r]))
-                    header_rows[r].append("")
-                final_keys.append(item["key"])
-                col_ref[0] += 1
-
-    def count_leaf_keys(items):
-        return sum(count_leaf_keys(i["children"]) if i.get("group") else 1 for i in items)
-
-    recurse(field_map)
-
-    max_len = max(len(r) for r in header_rows)
-    for r in header_rows:
-        while len(r) < max_len:
-            r.append("")
-
-    return header_rows, final_keys
+    plan = compile_field_map(field_map)
+    return plan.header_rows(), list(plan.final_keys)
 
 def build_data_table(field_map, data_rows):
-    header_rows, final_keys = parse_field_map(field_map)
-
-    transform_map = {}
-    def collect_transforms(items):
-        for item in items:
-            if item.get("group"):
-                collect_transforms(item["children"])
-            else:
-                if "transform" in item:
-                    transform = item["transform"]
-                    if isinstance(transform, str):
-                        if transform in TRANSFORMS:
-                            transform_map[item["key"]] = TRANSFORMS[transform]
-                        else:
-                            try:
-                                transform_map[item["key"]] = parse_lambda(transform)
-                            except Exception:
-                                transform_map[item["key"]] = None
-                    elif callable(transform):
-                        transform_map[item["key"]] = transform
-                    else:
-                        transform_map[item["key"]] = None
-
-    collect_transforms(field_map)
+    """
+    Build header and body rows from the output of ``apply_transforms``.
+
+    The rows are already transformed, so values are only laid out in column
+    order here; use ``build_body_rows`` to go straight from source rows.
+    """
+    plan = compile_field_map(field_map)
+    header_rows = plan.header_rows()
 
     body_rows = []
-    style = getSampleStyleSheet()["BodyText"]
-
-    def flatten_row(row, field_map):
-        flat = {}
-        for field in field_map:
-            if field.get("group"):
-                # Recursively flatten children
-                child_flat = flatten_row(row.get(field["label"], {}), field["children"])
-                flat.update(child_flat)
-            else:
-                key = field.get("key")
-                flat[key] = row.get(field["label"], "")
-        return flat
+    style = body_text_style()
+
+    # Rows are keyed by label, nested under their group labels
+    columns = [(leaf.path, leaf.label) for leaf in plan.leaves]
 
     for row in data_rows:
         new_row = []
-        flat_row = flatten_row(row, field_map)
-        for key in final_keys:
-            value = flat_row.get(key, "")
-            transform = transform_map.get(key)
-            if transform:
-                try:
-                    value = transform(value)
-                except Exception as e:
-                    print(f"⚠️ Transform error on key '{key}': {e}")
+        for path, label in columns:
+            source = row
+            for group_label in path:
+                source = source.get(group_label, {})
+            value = source.get(label, "")
             if isinstance(value, str) and "\n" in value:
                 value = Paragraph(value.replace("\n", "<br/>"), style)
             new_row.append(value)
@@ -109,81 +68,494 @@ def build_data_table(field_map, data_rows):
 
     return header_rows + body_rows
 
-def build_table(data, layout):
+def build_body_rows(field_map, data_rows, accumulators=None):
+    """
+    Turn source rows straight into table cell lists in a single pass.
+
+    Each value is extracted and transformed exactly once; multi-line strings
+    become Paragraphs. No intermediate per-row dicts are built.
+    ``accumulators`` (column index -> Accumulator) are fed the raw values
+    of their columns during the same pass.
+    """
+    plan = compile_field_map(field_map)
+    style = body_text_style()
+    if isinstance(data_rows, Dataset):
+        for index, accumulator in (accumulators or {}).items():
+            accumulator.add_column(data_rows.column(plan.leaves[index].key))
+        return dataset_body_rows(plan, data_rows, style)
+    columns = [(leaf.extract, leaf.format) for leaf in plan.leaves]
+    accumulate = [(plan.leaves[index].extract, accumulator.add)
+                  for index, accumulator in (accumulators or {}).items()]
+
+    body_rows = []
+    for row in data_rows:
+        new_row = []
+        for extract, format_value in columns:
+            value = format_value(extract(row))
+            if isinstance(value, str) and "\n" in value:
+                value = Paragraph(value.replace("\n", "<br/>"), style)
+            new_row.append(value)
+        body_rows.append(new_row)
+        for extract, add in accumulate:
+            add(extract(row))
+
+    return body_rows
+
+def dataset_body_rows(plan, dataset, style):
+    """Cell lists for a columnar Dataset, built column by column."""
+    columns = []
+    for leaf in plan.leaves:
+        values = format_column(dataset, leaf)
+        try:
+            # One C-level scan instead of a per-cell check for the usual all-str column
+            multiline = "\n" in "".join(values)
+        except TypeError:
+            multiline = any(isinstance(value, str) and "\n" in value for value in values)
+        if multiline:
+            values = [Paragraph(value.replace("\n", "<br/>"), style)
+                      if isinstance(value, str) and "\n" in value else value for value in values]
+        columns.append(values)
+    return [list(row) for row in zip(*columns)]
+
+FONT_NAME_MAP = {
+    ("helvetica", ""): "Helvetica",
+    ("helvetica", "bold"): "Helvetica-Bold",
+    ("helvetica", "italic"): "Helvetica-Oblique",
+    ("helvetica", "bold-italic"): "Helvetica-BoldOblique",
+    ("times-roman", ""): "Times-Roman",
+    ("times-roman", "bold"): "Times-Bold",
+    ("times-roman", "italic"): "Times-Italic",
+    ("times-roman", "bold-italic"): "Times-BoldItalic",
+    ("courier", ""): "Courier",
+    ("courier", "bold"): "Courier-Bold",
+    ("courier", "italic"): "Courier-Oblique",
+    ("courier", "bold-italic"): "Courier-BoldOblique"
+}
+
+class TableOptions:
+    """
+    Everything about a table block that does not depend on its rows: the
+    resolved fonts, colors and renderer, and the shared TableStyle.
+
+    Built once per block by ``compile_layout``; ``build_table`` builds a
+    throwaway one when called without.
+    """
+
+    def __init__(self, layout, header_rows_count):
+        style_config = layout.get("style", {})
+        font_name = style_config.get("font_name", "Helvetica")
+        font_style = style_config.get("font_style", "").lower()
+        self.font_name = FONT_NAME_MAP.get((font_name.lower(), font_style), font_name)
+        self.font_size = style_config.get("font_size", 10)
+        self.body_font_size = style_config.get("body_font_size", self.font_size)
+        self.header_rows_count = header_rows_count
+
+        self.col_widths = style_config.get("col_widths")
+        self.width_strategy = style_config.get("width_strategy", "exact")
+        if self.width_strategy not in WIDTH_STRATEGIES:
+            raise ValueError(f"Unsupported width strategy '{self.width_strategy}'. Supported: {', '.join(WIDTH_STRATEGIES)}")
+        self.width_sample_size = style_config.get("width_sample_size", 200)
+        self.width_percentile = style_config.get("width_percentile", 95)
+
+        self.renderer = layout.get("renderer", "auto")
+        if self.renderer not in TABLE_RENDERERS:
+            raise ValueError(f"Unsupported table renderer '{self.renderer}'. Supported: {', '.join(TABLE_RENDERERS)}")
+        self.chunk_rows = long_table_chunk_rows(layout)
+
+        self.header_background = getattr(colors, style_config.get("header_background", "grey"))
+        self.header_text_color = getattr(colors, style_config.get("header_text_color", "whitesmoke"))
+        self.body_background = getattr(colors, style_config.get("body_background", "beige"))
+        self.grid = style_config.get("grid", True)
+        self.row_height = style_config.get("row_height")
+        self.header_height = style_config.get("header_height")
+
+        self.sort_by, self.offset, self.limit = table_order(layout)
+        self.group_by = group_by_keys(layout)
+        self.group_label = layout.get("group_label", GROUP_LABEL)
+        if not isinstance(self.group_label, str):
+            raise ValueError(f"group_label must be a format string, got {self.group_label!r}")
+        try:
+            _LABEL_FORMATTER.format(self.group_label, key="", value="", rows=0)
+        except (ValueError, IndexError, KeyError) as e:
+            raise ValueError(f"Invalid group_label {self.group_label!r}: {e}") from e
+
+        self.plan = compile_field_map(layout["field_map"])
+        self.footers = footer_rows(layout, self.plan)
+        max_header_row = header_rows_count - 1
+        style = [
+            ('BACKGROUND', (0, 0), (-1, max_header_row), self.header_background),
+            ('TEXTCOLOR', (0, 0), (-1, max_header_row), self.header_text_color),
+            ('FONTNAME', (0, 0), (-1, max_header_row), self.font_name),
+            ('FONTSIZE', (0, 0), (-1, max_header_row), self.font_size),
+            ('FONTSIZE', (0, header_rows_count), (-1, -1), self.body_font_size),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, max_header_row), 10),
+            ('BACKGROUND', (0, header_rows_count), (-1, -1), self.body_background)
+        ]
+
+        if self.grid:
+            style.append(('GRID', (0, 0), (-1, -1), 1, colors.black))
+
+        style.extend(self.plan.span_commands(max_header_row))
+        # Only read when applied to a Table, so one instance serves every render
+        self.table_style = TableStyle(style)
+
+def build_table(data, layout, stats=NULL_STATS, header_rows_count=None, options=None, col_widths=None,
+                footer_rows_count=0):
     max_cols = max(len(row) for row in data)
     for row in data:
         while len(row) < max_cols:
             row.append("")
 
-    style_config = layout.get("style", {})
-    font_name = style_config.get("font_name", "Helvetica")
-    font_size = style_config.get("font_size", 10)
-    body_font_size = style_config.get("body_font_size", font_size)
-    font_style = style_config.get("font_style", "").lower()
-
-    font_name_map = {
-        ("helvetica", ""): "Helvetica",
-        ("helvetica", "bold"): "Helvetica-Bold",
-        ("helvetica", "italic"): "Helvetica-Oblique",
-        ("helvetica", "bold-italic"): "Helvetica-BoldOblique",
-        ("times-roman", ""): "Times-Roman",
-        ("times-roman", "bold"): "Times-Bold",
-        ("times-roman", "italic"): "Times-Italic",
-        ("times-roman", "bold-italic"): "Times-BoldItalic",
-        ("courier", ""): "Courier",
-        ("courier", "bold"): "Courier-Bold",
-        ("courier", "italic"): "Courier-Oblique",
-        ("courier", "bold-italic"): "Courier-BoldOblique"
-    }
-    font_key = (font_name.lower(), font_style)
-    resolved_font_name = font_name_map.get(font_key, font_name)
-
-    col_widths = style_config.get("col_widths")
+    if options is None:
+        if header_rows_count is None:
+            header_rows_count = len(data) - len(layout["data_rows"])
+        options = TableOptions(layout, header_rows_count)
+    header_rows_count = options.header_rows_count
+
+    col_widths = col_widths or options.col_widths
     if not col_widths:
-        col_widths = []
-        for col in range(max_cols):
-            max_width = 0
-            for row in data:
-                cell = row[col]
-                text = cell.getPlainText() if hasattr(cell, 'getPlainText') else str(cell)
-                max_width = max(max_width, stringWidth(text, font_name, font_size))
-            col_widths.append(max_width + 10)
+        col_widths = table_col_widths(data, options, stats, footer_rows_count)
+
+    if use_fast_table(data, options):
+        return FastTable(
+            data,
+            col_widths,
+            header_rows_count,
+            spans=options.plan.spans,
+            header_font=options.font_name,
+            header_font_size=options.font_size,
+            body_font=DEFAULT_CELL_FONT,
+            body_font_size=options.body_font_size,
+            header_background=options.header_background,
+            header_text_color=options.header_text_color,
+            body_background=options.body_background,
+            grid=options.grid,
+            row_height=options.row_height,
+            header_height=options.header_height,
+            footer_rows=footer_rows_count,
+            footer_font=FOOTER_FONT,
+        )
+
+    chunk_rows = options.chunk_rows
+    if chunk_rows and len(data) - header_rows_count > chunk_rows:
+        return build_table_chunks(data, header_rows_count, chunk_rows, col_widths, options.table_style,
+                                  footer_rows_count)
 
     table = Table(data, colWidths=col_widths)
+    table.setStyle(options.table_style)
+    if footer_rows_count:
+        table.setStyle(footer_style(len(data) - footer_rows_count))
+    return table
 
-    header_rows_count = len(data) - len(layout["data_rows"])
-    max_header_row = header_rows_count - 1
-
-    style = [
-        ('BACKGROUND', (0, 0), (-1, max_header_row), getattr(colors, style_config.get("header_background", "grey"))),
-        ('TEXTCOLOR', (0, 0), (-1, max_header_row), getattr(colors, style_config.get("header_text_color", "whitesmoke"))),
-        ('FONTNAME', (0, 0), (-1, max_header_row), resolved_font_name),
-        ('FONTSIZE', (0, 0), (-1, max_header_row), font_size),
-        ('FONTSIZE', (0, header_rows_count), (-1, -1), body_font_size),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (-1, max_header_row), 10),
-        ('BACKGROUND', (0, header_rows_count), (-1, -1), getattr(colors, style_config.get("body_background", "beige")))
+def footer_style(first_row):
+    """Bold face and a rule above the aggregate footer rows starting at ``first_row``."""
+    return [
+        ('FONTNAME', (0, first_row), (-1, -1), FOOTER_FONT),
+        ('LINEABOVE', (0, first_row), (-1, first_row), 1.5, colors.black),
     ]
 
-    if style_config.get("grid", True):
-        style.append(('GRID', (0, 0), (-1, -1), 1, colors.black))
-
-    def count_leaf_keys(items):
-        return sum(count_leaf_keys(i["children"]) if i.get("group") else 1 for i in items)
-
-    def apply_spans(field_map, start_col=0, row=0, max_row=max_header_row):
-        col = start_col
-        for item in field_map:
-            if item.get("group"):
-                span = count_leaf_keys(item["children"])
-                style.append(('SPAN', (col, row), (col + span - 1, row)))
-                apply_spans(item["children"], col, row + 1, max_row)
-                col += span
-            else:
-                style.append(('SPAN', (col, row), (col, max_row)))
-                col += 1
-        return col
-
-    apply_spans(layout["field_map"])
-    table.setStyle(TableStyle(style))
-    return table
\ No newline at end of file
+def table_col_widths(data, options, stats=NULL_STATS, footer_rows_count=0):
+    """
+    Column widths estimated over ``data`` with the block's fonts and
+    strategy, the last ``footer_rows_count`` rows in the footer face.
+    """
+    with stats.phase("column_widths", "table") as record:
+        record.cells = len(data) * max((len(row) for row in data), default=0)
+        return estimate_col_widths(
+            data,
+            options.header_rows_count,
+            options.font_name,
+            options.font_size,
+            DEFAULT_CELL_FONT,
+            options.body_font_size,
+            strategy=options.width_strategy,
+            sample_size=options.width_sample_size,
+            percentile=options.width_percentile,
+            footer_rows_count=footer_rows_count,
+            footer_font=FOOTER_FONT,
+        )
+
+def group_by_keys(layout):
+    """Fields of a block's ``group_by`` option as a tuple, empty when off."""
+    group_by = layout.get("group_by")
+    if not group_by:
+        return ()
+    keys = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+    if not all(isinstance(key, str) for key in keys):
+        raise ValueError(f"group_by must be a field name or a list of field names, got {group_by!r}")
+    return keys
+
+def table_order(layout):
+    """
+    A block's ``sort_by``, ``offset`` and ``limit`` (or ``top_n``) options as
+    ``((field, descending), ...), offset, limit``; limit is None when unset.
+    """
+    sort_by = layout.get("sort_by") or ()
+    if isinstance(sort_by, (str, dict)):
+        sort_by = [sort_by]
+    keys = []
+    for entry in sort_by:
+        if isinstance(entry, str):
+            entry = {"key": entry}
+        order = entry.get("order", "asc") if isinstance(entry, dict) else None
+        if order not in SORT_ORDERS or not isinstance(entry.get("key"), str):
+            raise ValueError(f'sort_by entries must be field names or {{"key": ..., "order": "asc" or "desc"}}, '
+                             f"got {entry!r}")
+        keys.append((entry["key"], order == "desc"))
+
+    limit = layout.get("limit")
+    top_n = layout.get("top_n")
+    if limit is not None and top_n is not None and limit != top_n:
+        raise ValueError(f"limit and top_n disagree: {limit!r} != {top_n!r}")
+    limit = top_n if limit is None else limit
+    offset = layout.get("offset", 0)
+    for name, value in (("limit", limit), ("offset", offset)):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise ValueError(f"{name} must be a non-negative integer, got {value!r}")
+    return tuple(keys), offset, limit
+
+class _Descending:
+    """Sort key wrapper inverting the order of the key it holds."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+def _sort_value(value, descending):
+    # Numbers before strings before anything else, never comparing across
+    # types; missing values always sort last
+    if value is None:
+        return (-1,) if descending else (3,)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, repr(value))
+
+def sort_key(sort_by):
+    """
+    ``(key, reverse)`` ordering tuples of values (one per ``sort_by`` field)
+    the way ``sorted(..., key=key, reverse=reverse)`` expects.
+    """
+    directions = [descending for _, descending in sort_by]
+    if all(directions) or not any(directions):
+        descending = directions[0]
+        if len(directions) == 1:
+            return (lambda values: _sort_value(values[0], descending)), descending
+        return (lambda values: tuple(_sort_value(v, descending) for v in values)), descending
+
+    def mixed(values):
+        return tuple(_Descending(_sort_value(v, True)) if d else _sort_value(v, False)
+                     for v, d in zip(values, directions))
+    return mixed, False
+
+def order_rows(rows, sort_by=(), offset=0, limit=None):
+    """
+    Apply a block's ``sort_by``, ``offset`` and ``limit`` to its rows.
+
+    Sorting is stable. With a limit only the first ``offset + limit`` rows
+    in sort order are kept, in a bounded heap (O(n log k)), so the sorted
+    list is never built; without sorting, iterators are sliced lazily and
+    rows past the window are never read. A Dataset is ordered by position
+    and sliced column by column.
+    """
+    stop = None if limit is None else offset + limit
+    if isinstance(rows, Dataset):
+        return _order_dataset(rows, sort_by, offset, stop)
+    if not sort_by:
+        if isinstance(rows, list):
+            return rows[offset:stop]
+        return islice(rows, offset, stop)
+
+    fields = [field for field, _ in sort_by]
+    key, reverse = sort_key(sort_by)
+    if len(fields) == 1:
+        field = fields[0]
+        row_key = lambda row: key((row.get(field),))
+    else:
+        row_key = lambda row: key([row.get(field) for field in fields])
+    if stop is None:
+        ordered = sorted(rows, key=row_key, reverse=reverse)
+    elif reverse:
+        ordered = heapq.nlargest(stop, rows, key=row_key)
+    else:
+        ordered = heapq.nsmallest(stop, rows, key=row_key)
+    return ordered[offset:] if offset else ordered
+
+def _order_dataset(dataset, sort_by, offset, stop):
+    length = len(dataset)
+    if not sort_by:
+        return dataset.select(range(offset, length if stop is None else min(stop, length)))
+    if len(sort_by) == 1 and np is not None:
+        (field, descending), = sort_by
+        column = dataset.columns.get(field)
+        if isinstance(column, np.ndarray) and column.dtype.kind in "if":
+            return dataset.select(_top_positions(-column if descending else column, stop)[offset:])
+    key, reverse = sort_key(sort_by)
+    values = list(zip(*(dataset.values(field) for field, _ in sort_by)))
+    position_key = lambda position: key(values[position])
+    if stop is None:
+        positions = sorted(range(length), key=position_key, reverse=reverse)
+    elif reverse:
+        positions = heapq.nlargest(stop, range(length), key=position_key)
+    else:
+        positions = heapq.nsmallest(stop, range(length), key=position_key)
+    return dataset.select(positions[offset:])
+
+def _top_positions(column, stop):
+    """
+    Positions of the ``stop`` smallest values of a numeric array in stable
+    order (all of them when ``stop`` is None), vectorized: a partial
+    partition finds the cut-off value and only the rows up to it are sorted.
+    """
+    if stop is None or stop >= len(column):
+        return np.argsort(column, kind="stable")
+    if stop == 0:
+        return column[:0].astype(np.intp)
+    threshold = np.partition(column, stop - 1)[stop - 1]
+    if threshold != threshold:
+        # NaN (sorted last) reached the cut-off
+        return np.argsort(column, kind="stable")[:stop]
+    candidates = np.flatnonzero(column <= threshold)
+    return candidates[np.argsort(column[candidates], kind="stable")][:stop]
+
+def partition_rows(rows, keys):
+    """
+    Split ``rows`` by their values of ``keys`` in a single hashed pass.
+
+    Returns ``(value, rows)`` pairs in order of first appearance, rows in
+    input order; the value is a tuple when there are several keys, and rows
+    without a key share the None partition. A Dataset is split into
+    Datasets column by column.
+    """
+    if isinstance(rows, Dataset):
+        return rows.partition(keys)
+    if not isinstance(rows, list):
+        rows = list(rows)
+    if len(keys) == 1:
+        key = keys[0]
+        values = (row.get(key) for row in rows)
+    else:
+        values = (tuple(row.get(key) for key in keys) for row in rows)
+    return [(value, [rows[i] for i in positions]) for value, positions in group_positions(values)]
+
+class _LabelFormatter(string.Formatter):
+    """
+    ``str.format`` for layout-supplied labels: only the GROUP_LABEL_FIELDS
+    by name (no attribute or index lookups, no positional fields) and
+    widths up to MAX_TRANSFORM_LENGTH.
+    """
+
+    def get_field(self, field_name, args, kwargs):
+        if field_name not in GROUP_LABEL_FIELDS:
+            raise ValueError(f"field '{{{field_name}}}' is not one of "
+                             f"{', '.join('{%s}' % name for name in GROUP_LABEL_FIELDS)}")
+        return kwargs[field_name], field_name
+
+    def format_field(self, value, format_spec):
+        for number in re.findall(r"\d+", format_spec):
+            if int(number) > MAX_TRANSFORM_LENGTH:
+                raise ValueError(f"width {number} exceeds MAX_TRANSFORM_LENGTH ({MAX_TRANSFORM_LENGTH})")
+        return super().format_field(value, format_spec)
+
+
+_LABEL_FORMATTER = _LabelFormatter()
+
+def group_label(options, value, row_count):
+    """Sub-header text of one partition, with the key and values escaped for Paragraph."""
+    values = value if len(options.group_by) > 1 else (value,)
+    text = ", ".join("" if v is None else str(v) for v in values)
+    return _LABEL_FORMATTER.format(options.group_label, key=escape(", ".join(options.group_by)),
+                                   value=escape(text), rows=row_count)
+
+def build_grouped_tables(header_rows, sections, layout, stats=NULL_STATS, options=None, footer_rows_count=0):
+    """
+    A sub-header and a table for each ``(value, body_rows)`` section of a
+    ``group_by`` block, the last ``footer_rows_count`` rows of each section
+    being its aggregate footers.
+
+    Every table shares ``options`` and one set of column widths estimated
+    over all sections, so the columns line up from one section to the next.
+    """
+    if options is None:
+        options = TableOptions(layout, len(header_rows))
+    col_widths = options.col_widths
+    if not col_widths:
+        # Footers of every section go last, to be measured in the footer face
+        split = [len(body) - footer_rows_count for _, body in sections]
+        rows = (header_rows + [row for (_, body), end in zip(sections, split) for row in body[:end]]
+                + [row for (_, body), end in zip(sections, split) for row in body[end:]])
+        col_widths = table_col_widths(rows, options, stats, footer_rows_count * len(sections))
+
+    heading = sample_style_sheet()[GROUP_HEADER_STYLE]
+    flowables = []
+    for value, body_rows in sections:
+        flowables.append(Paragraph(group_label(options, value, len(body_rows) - footer_rows_count), heading))
+        table = build_table(header_rows + body_rows, layout, stats, options=options, col_widths=col_widths,
+                            footer_rows_count=footer_rows_count)
+        if isinstance(table, list):
+            flowables.extend(table)
+        else:
+            flowables.append(table)
+    return flowables
+
+def use_fast_table(data, options):
+    """
+    Whether a table block is drawn as a FastTable.
+
+    ``"renderer": "fast"`` asks for it whenever the data allows, ``"table"``
+    never uses it, and ``"auto"`` (the default) uses it for eligible tables
+    of at least FAST_TABLE_MIN_ROWS body rows.
+    """
+    renderer = options.renderer
+    header_rows_count = options.header_rows_count
+    if renderer == "table":
+        return False
+    if renderer == "auto" and len(data) - header_rows_count < FAST_TABLE_MIN_ROWS:
+        return False
+    if not is_fast_table_eligible(data, header_rows_count):
+        if renderer == "fast":
+            logger.warning("Table has multi-line or flowable cells; using the standard table renderer")
+        return False
+    return True
+
+def long_table_chunk_rows(layout):
+    """Body rows per chunk for a block's ``long_table`` option, 0 when off."""
+    long_table = layout.get("long_table")
+    if long_table is True:
+        return LONG_TABLE_CHUNK_ROWS
+    if not long_table:
+        return 0
+    chunk_rows = int(long_table)
+    if chunk_rows < 1:
+        raise ValueError(f"long_table must be true or a positive row count, got {long_table!r}")
+    return chunk_rows
+
+def build_table_chunks(data, header_rows_count, chunk_rows, col_widths, table_style, footer_rows_count=0):
+    """
+    Split ``data`` into Tables of at most ``chunk_rows`` body rows each.
+
+    Every chunk repeats the header rows and shares the column widths and
+    TableStyle, whose commands are all relative to the header/body boundary
+    or the last row, so they apply unchanged to each chunk. Chunks are small
+    enough that splitting one across a page only re-lays out that chunk.
+    """
+    header = data[:header_rows_count]
+    footer_start = len(data) - footer_rows_count
+    tables = []
+    for start in range(header_rows_count, len(data), chunk_rows):
+        table = Table(header + data[start:start + chunk_rows],
+                      colWidths=col_widths, repeatRows=header_rows_count)
+        table.setStyle(table_style)
+        if footer_rows_count and footer_start < start + chunk_rows:
+            table.setStyle(footer_style(header_rows_count + max(footer_start - start, 0)))
+        tables.append(table)
+    return tables
\ No newline at end of file
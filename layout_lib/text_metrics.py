@@ -0,0 +1,158 @@
+from typing import Any, Dict, List, Optional, Sequence
+import heapq
+import re
+import threading
+from functools import lru_cache
+from xml.sax.saxutils import unescape
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Font ReportLab tables use for cells without a FONTNAME command
+DEFAULT_CELL_FONT = "Helvetica"
+
+# Distinct (text, font) widths remembered across tables
+WIDTH_MEMO_SIZE = 65536
+
+WIDTH_STRATEGIES = ("exact", "sampled", "percentile")
+
+_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+
+
+class _CharWidths(dict):
+    """Per-character advance widths of one font at size 1000, filled lazily."""
+
+    def __init__(self, font_name: str):
+        super().__init__()
+        self.font_name = font_name
+
+    def __missing__(self, char: str) -> float:
+        width = stringWidth(char, self.font_name, 1000)
+        self[char] = width
+        return width
+
+
+_char_widths: Dict[str, _CharWidths] = {}
+_char_widths_lock = threading.Lock()
+
+
+def char_widths(font_name: str) -> _CharWidths:
+    """The shared advance-width table for ``font_name``."""
+    table = _char_widths.get(font_name)
+    if table is None:
+        with _char_widths_lock:
+            table = _char_widths.setdefault(font_name, _CharWidths(font_name))
+    return table
+
+
+@lru_cache(maxsize=WIDTH_MEMO_SIZE)
+def _width_1000(text: str, font_name: str) -> float:
+    return sum(map(char_widths(font_name).__getitem__, text))
+
+
+def text_width(text: str, font_name: str, font_size: float) -> float:
+    """
+    Width of a single line of text, equal to ``stringWidth`` for the
+    standard fonts but summed from cached per-character advances and
+    memoized per distinct string.
+    """
+    if not text:
+        return 0.0
+    return _width_1000(text, font_name) * font_size / 1000
+
+
+def cell_lines(cell: Any) -> List[str]:
+    """The lines of text a table cell is drawn with."""
+    if hasattr(cell, "getPlainText"):
+        text = getattr(cell, "text", None)
+        if text is None:
+            return [cell.getPlainText()]
+        return [unescape(_TAG.sub("", part)) for part in _BREAK.split(text)]
+    return str(cell).split("\n")
+
+
+def cell_width(cell: Any, font_name: str, font_size: float) -> float:
+    """Widest line of a cell; Paragraphs are measured in their own style."""
+    if isinstance(cell, str) and "\n" not in cell:
+        return text_width(cell, font_name, font_size)
+    style = getattr(cell, "style", None)
+    if style is not None and hasattr(cell, "getPlainText"):
+        font_name, font_size = style.fontName, style.fontSize
+    return max(text_width(line, font_name, font_size) for line in cell_lines(cell))
+
+
+def _text_length(cell: Any) -> int:
+    if isinstance(cell, str) and "\n" not in cell:
+        return len(cell)
+    return max(len(line) for line in cell_lines(cell))
+
+
+def estimate_col_widths(
+    data: Sequence[Sequence[Any]],
+    header_rows_count: int,
+    header_font: str,
+    header_font_size: float,
+    body_font: str = DEFAULT_CELL_FONT,
+    body_font_size: Optional[float] = None,
+    strategy: str = "exact",
+    sample_size: int = 200,
+    percentile: float = 95,
+    padding: float = 10,
+    footer_rows_count: int = 0,
+    footer_font: Optional[str] = None,
+) -> List[float]:
+    """
+    Estimate column widths for table ``data`` (header rows first, then the
+    body, then ``footer_rows_count`` footer rows).
+
+    Header rows are always measured exactly in the header face, and footer
+    rows exactly in ``footer_font`` (default: the body face) at the body
+    size. Body cells are measured according to ``strategy``:
+
+    - ``exact``: every cell
+    - ``sampled``: only the ``sample_size`` longest cells (by character
+      count) of each column
+    - ``percentile``: every cell, but the column is sized to the given
+      percentile of body widths so a few outliers cannot blow it up
+    """
+    if strategy not in WIDTH_STRATEGIES:
+        raise ValueError(f"Unsupported width strategy '{strategy}'. Supported: {', '.join(WIDTH_STRATEGIES)}")
+    if body_font_size is None:
+        body_font_size = header_font_size
+
+    max_cols = max((len(row) for row in data), default=0)
+    if footer_font is None:
+        footer_font = body_font
+
+    header = data[:header_rows_count]
+    body_end = len(data) - footer_rows_count if footer_rows_count else len(data)
+    body = data[header_rows_count:body_end]
+    footer = data[body_end:]
+
+    col_widths = []
+    for col in range(max_cols):
+        header_width = max(
+            (cell_width(row[col], header_font, header_font_size) for row in header if col < len(row)),
+            default=0,
+        )
+        cells = [row[col] for row in body if col < len(row)]
+
+        if strategy == "sampled" and len(cells) > sample_size:
+            cells = heapq.nlargest(sample_size, cells, key=_text_length)
+
+        widths = [cell_width(cell, body_font, body_font_size) for cell in cells]
+        if not widths:
+            body_width = 0
+        elif strategy == "percentile":
+            widths.sort()
+            rank = min(len(widths) - 1, max(0, int(round(percentile / 100 * (len(widths) - 1)))))
+            body_width = widths[rank]
+        else:
+            body_width = max(widths)
+
+        footer_width = max(
+            (cell_width(row[col], footer_font, body_font_size) for row in footer if col < len(row)),
+            default=0,
+        )
+        col_widths.append(max(header_width, body_width, footer_width) + padding)
+    return col_widths
@@ -1,6 +1,9 @@
-from typing import Any, Callable, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Union
+import ast
 import json
+import re
 from datetime import datetime
+from functools import lru_cache
 
 def dollarize(value: Union[str, float, int]) -> str:
     """Format number as dollar amount."""
@@ -36,71 +39,252 @@ TRANSFORMS: Dict[str, Callable] = {
     "join_lines": join_lines
 }
 
-def parse_lambda(lambda_str: str) -> Callable:
-    """Parse a lambda function string into a callable function."""
+# Upper bound on the number of distinct lambda expressions kept compiled
+LAMBDA_CACHE_SIZE = 512
+
+# Longest string, and widest format width or precision, a lambda transform may ask for
+MAX_TRANSFORM_LENGTH = 10_000
+
+# Digit runs of a format spec ("0>12,.2f") and the %-specs of a "%" format string
+_SPEC_NUMBERS = re.compile(r"\d+")
+_PERCENT_SPEC = re.compile(r"%(?:\([^)]*\))?([-#0 +]*[\d*]*(?:\.[\d*]*)?)")
+
+
+def _check_length(length: Any) -> None:
+    if isinstance(length, int) and length > MAX_TRANSFORM_LENGTH:
+        raise ValueError(f"result of {length} characters exceeds MAX_TRANSFORM_LENGTH ({MAX_TRANSFORM_LENGTH})")
+
+
+def _check_spec(spec: str) -> None:
+    for number in _SPEC_NUMBERS.findall(spec):
+        _check_length(int(number))
+
+
+def _checked_format(value: Any, spec: str = "") -> str:
+    """``format`` with the width and precision of ``spec`` bounded."""
+    if isinstance(spec, str):
+        _check_spec(spec)
+    return format(value, spec)
+
+
+def _checked_mul(left: Any, right: Any) -> Any:
+    """``left * right``, refusing repetitions longer than MAX_TRANSFORM_LENGTH."""
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, (str, bytes, list, tuple)) and isinstance(count, int):
+            _check_length(len(sequence) * count)
+    return left * right
+
+
+def _checked_mod(left: Any, right: Any) -> Any:
+    """``left % right``, bounding the widths of a %-format string."""
+    if isinstance(left, str):
+        for spec in _PERCENT_SPEC.findall(left):
+            if "*" in spec:
+                raise ValueError("'*' widths are not allowed")
+            _check_spec(spec)
+    return left % right
+
+
+def _checked_method(obj: Any, name: str, *args: Any, **kwargs: Any) -> Any:
+    """Call a SAFE_METHODS method, bounding the length of padded, replaced and joined strings."""
+    if name in ("ljust", "rjust", "center", "zfill"):
+        _check_length(args[0] if args else kwargs.get("width"))
+    elif name == "replace" and isinstance(obj, str) and len(args) >= 2:
+        old, new = args[0], args[1]
+        if isinstance(old, str) and isinstance(new, str):
+            count = obj.count(old) if old else len(obj) + 1
+            limit = args[2] if len(args) > 2 else kwargs.get("count", -1)
+            if isinstance(limit, int) and limit >= 0:
+                count = min(count, limit)
+            _check_length(len(obj) + count * (len(new) - len(old)))
+    elif name == "join" and isinstance(obj, str) and args:
+        items = list(args[0])
+        _check_length(len(obj) * max(len(items) - 1, 0)
+                      + sum(len(item) for item in items if isinstance(item, str)))
+        args = (items,) + args[1:]
+    return getattr(obj, name)(*args, **kwargs)
+
+
+_CONVERSIONS = {ord("s"): str, ord("r"): repr, ord("a"): ascii}
+
+# Helpers the checked rewrite of a lambda calls; lambda arguments cannot shadow them
+_CHECKED_HELPERS: Dict[str, Callable] = {
+    "__format": _checked_format,
+    "__mul": _checked_mul,
+    "__mod": _checked_mod,
+    "__method": _checked_method,
+    "__convert": lambda value, conversion: _CONVERSIONS[conversion](value),
+}
+
+# Names a lambda transform may reference besides its own arguments
+SAFE_BUILTINS: Dict[str, Callable] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "round": round,
+    "abs": abs,
+    "len": len,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "format": _checked_format,
+}
+
+# String methods a lambda transform may call
+SAFE_METHODS = frozenset({
+    "upper", "lower", "title", "capitalize", "swapcase",
+    "strip", "lstrip", "rstrip", "replace", "split", "join",
+    "startswith", "endswith", "zfill", "ljust", "rjust", "center",
+})
+
+_SAFE_NODES = (
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.UnaryOp, ast.UAdd, ast.USub, ast.Not,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.Is, ast.IsNot, ast.In, ast.NotIn,
+    ast.IfExp, ast.Constant, ast.Name, ast.Load, ast.Call, ast.keyword,
+    ast.Attribute, ast.Subscript, ast.Slice, ast.Tuple, ast.List,
+    ast.JoinedStr, ast.FormattedValue,
+)
+
+
+def _validate_lambda(tree: ast.Expression) -> None:
+    """Reject anything outside the arithmetic/formatting/string subset."""
+    lam = tree.body
+    if not isinstance(lam, ast.Lambda):
+        raise ValueError("expression is not a lambda")
+    args = lam.args
+    if (args.vararg or args.kwarg or args.kwonlyargs or args.defaults
+            or getattr(args, "posonlyargs", None)):
+        raise ValueError("only plain positional arguments are supported")
+    if any(a.arg.startswith("__") for a in args.args):
+        raise ValueError("argument names cannot start with '__'")
+    allowed_names = {a.arg for a in args.args} | set(SAFE_BUILTINS)
+
+    method_calls = set()
+    for node in ast.walk(lam.body):
+        if not isinstance(node, _SAFE_NODES):
+            raise ValueError(f"'{type(node).__name__}' is not allowed")
+        if isinstance(node, ast.Name) and node.id not in allowed_names:
+            raise ValueError(f"name '{node.id}' is not allowed")
+        if isinstance(node, ast.Call):
+            if any(kw.arg is None for kw in node.keywords):
+                raise ValueError("'**' arguments are not allowed")
+            if isinstance(node.func, ast.Attribute):
+                method_calls.add(id(node.func))
+            elif not (isinstance(node.func, ast.Name) and node.func.id in SAFE_BUILTINS):
+                raise ValueError("only builtins and string methods can be called")
+        if isinstance(node, ast.Attribute):
+            if node.attr not in SAFE_METHODS:
+                raise ValueError(f"attribute '{node.attr}' is not allowed")
+
+    # Attributes are only valid as the target of a method call
+    for node in ast.walk(lam.body):
+        if isinstance(node, ast.Attribute) and id(node) not in method_calls:
+            raise ValueError(f"attribute '{node.attr}' is not allowed")
+
+
+class _BoundSizes(ast.NodeTransformer):
+    """
+    Route the operations that can build large strings (``*``, ``%``,
+    format specs and the padding/replace/join methods) through the
+    _CHECKED_HELPERS, as widths and counts may come from the row data.
+    """
+
+    @staticmethod
+    def _call(helper: str, *args: ast.expr, keywords=()) -> ast.Call:
+        return ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=list(args), keywords=list(keywords))
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Mult):
+            return self._call("__mul", node.left, node.right)
+        if isinstance(node.op, ast.Mod):
+            return self._call("__mod", node.left, node.right)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Attribute):
+            return self._call("__method", node.func.value, ast.Constant(node.func.attr), *node.args,
+                              keywords=node.keywords)
+        return node
+
+    def visit_FormattedValue(self, node: ast.FormattedValue) -> ast.FormattedValue:
+        self.generic_visit(node)
+        if node.format_spec is None:
+            return node
+        value = node.value
+        if node.conversion != -1:
+            value = self._call("__convert", value, ast.Constant(node.conversion))
+        return ast.FormattedValue(value=self._call("__format", value, node.format_spec),
+                                  conversion=-1, format_spec=None)
+
+
+@lru_cache(maxsize=LAMBDA_CACHE_SIZE)
+def compile_lambda(lambda_str: str) -> Callable:
+    """
+    Compile a lambda transform string into a callable.
+
+    The expression is parsed and checked against a restricted grammar
+    (arithmetic, comparisons, conditionals, f-strings, a few builtins and
+    string methods) before being compiled without access to ``__builtins__``.
+    Operations that can build large strings raise ValueError at call time
+    past MAX_TRANSFORM_LENGTH characters. Results are cached by expression
+    text for the whole process.
+    """
     try:
-        # Remove 'lambda' keyword and any whitespace
-        lambda_body = lambda_str.strip()
-        if not lambda_body.startswith('lambda'):
-            raise ValueError("Invalid lambda function format")
-        
-        # Extract the lambda expression
-        lambda_expr = lambda_body[6:].strip()  # Remove 'lambda' keyword
-        
-        # Create the function
-        return eval(lambda_expr)
-    except Exception as e:
+        tree = ast.parse(lambda_str.strip(), mode="eval")
+        _validate_lambda(tree)
+        tree = ast.fix_missing_locations(_BoundSizes().visit(tree))
+        code = compile(tree, "<transform>", "eval")
+        return eval(code, {"__builtins__": {}, **SAFE_BUILTINS, **_CHECKED_HELPERS})
+    except (SyntaxError, ValueError) as e:
         raise ValueError(f"Invalid lambda function: {e}")
 
+def parse_lambda(lambda_str: str) -> Callable:
+    """Parse a lambda function string into a callable function."""
+    lambda_body = lambda_str.strip()
+    if not lambda_body.startswith('lambda'):
+        raise ValueError("Invalid lambda function format")
+    return compile_lambda(lambda_body)
+
+def resolve_transform(transform: Union[str, Callable, None]) -> Optional[Callable]:
+    """
+    Resolve a field's ``transform`` option to a callable.
+
+    Registered names come from TRANSFORMS, other strings are compiled as
+    lambdas (raising ValueError when invalid) and callables are used as is.
+    """
+    if not transform:
+        return None
+    if isinstance(transform, str):
+        if transform in TRANSFORMS:
+            return TRANSFORMS[transform]
+        return parse_lambda(transform)
+    if callable(transform):
+        return transform
+    return None
+
 def apply_transforms(field_map: List[Dict], data_rows: List[Dict]) -> List[Dict]:
     """Apply transforms to data rows based on field map."""
+    # Imported here as field_map builds on resolve_transform above
+    from layout_lib.field_map import compile_field_map
+
+    plan = compile_field_map(field_map)
+    leaves = [leaf for leaf in plan.leaves if leaf.key]
     transformed_rows = []
     
     for row in data_rows:
         transformed_row = {}
-        for field in field_map:
-            if "children" in field:
-                # Handle nested fields
-                transformed_row[field["label"]] = apply_transforms(field["children"], [row])[0]
-            else:
-                key = field.get("key", "")
-                transform = field.get("transform")
-                
-                if not key:
-                    continue
-                
-                # Get the value(s)
-                if "|" in key:
-                    keys = key.split("|")
-                    values = [row.get(k.strip(), "") for k in keys]
-                else:
-                    values = row.get(key, "")
-                
-                # Apply transform if specified
-                if transform:
-                    if isinstance(transform, str):
-                        # Check if it's a predefined transform
-                        if transform in TRANSFORMS:
-                            transform_func = TRANSFORMS[transform]
-                        else:
-                            # Try to parse as lambda
-                            transform_func = parse_lambda(transform)
-                    else:
-                        # Direct function reference
-                        transform_func = transform
-                    
-                    try:
-                        transformed_row[field["label"]] = transform_func(values)
-                    except Exception as e:
-                        print(f"⚠️ Transform error for field '{key}': {e}")
-                        transformed_row[field["label"]] = str(values)
-                else:
-                    # No transform, just join if list
-                    if isinstance(values, list):
-                        transformed_row[field["label"]] = " ".join(str(v) for v in values)
-                    else:
-                        transformed_row[field["label"]] = str(values)
-        
+        for leaf in leaves:
+            # Nested fields go under their group labels
+            target = transformed_row
+            for label in leaf.path:
+                target = target.setdefault(label, {})
+            target[leaf.label] = leaf.format(leaf.extract(row))
         transformed_rows.append(transformed_row)
     
-    return transformed_rows
\ No newline at end of file
+    return transformed_rows
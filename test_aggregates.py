@@ -0,0 +1,124 @@
+import unittest
+from unittest import mock
+
+from layout_lib.aggregates import Accumulator, aggregate_rows
+from layout_lib.compiled_layout import compile_layout
+from layout_lib.dataset import Dataset
+from layout_lib.fast_table import FastTable
+from layout_lib.renderer import interpret_layout
+from layout_lib.table import FOOTER_FONT
+from layout_lib.text_metrics import cell_width
+
+ROWS = [
+    {"Ticker": "AAPL", "Ask": 175.25, "Volume1": 12500000, "Exchange": "NASDAQ"},
+    {"Ticker": "MSFT", "Ask": 420.1, "Volume1": 8500000, "Exchange": "NASDAQ"},
+    {"Ticker": "GC", "Ask": 2350.75, "Volume1": 50000, "Exchange": "COMEX"},
+    {"Ticker": "NONE", "Ask": float("nan"), "Exchange": "COMEX"},
+]
+
+FIELD_MAP = [
+    {"label": "Ticker", "key": "Ticker"},
+    {"label": "Ask", "key": "Ask", "transform": "dollarize"},
+    {"label": "Volume", "key": "Volume1"},
+]
+
+AGGREGATES = [
+    {"label": "Total", "columns": {"Volume1": "total", "Ask": "max"}},
+    {"label": "Rows", "columns": {"Volume1": "count"}},
+]
+
+
+class TestAccumulator(unittest.TestCase):
+    def test_rows_and_columns_agree(self):
+        """Row-at-a-time and column reductions give the same results"""
+        by_row = aggregate_rows(ROWS, ["Ask", "Volume1", "Ticker"])
+        by_column = aggregate_rows(Dataset.from_rows(ROWS), ["Ask", "Volume1", "Ticker"])
+        for field in by_row:
+            for function in ("total", "average", "min", "max", "count"):
+                with self.subTest(field=field, function=function):
+                    self.assertEqual(by_row[field].result(function), by_column[field].result(function))
+        self.assertAlmostEqual(by_row["Volume1"].result("average"), 21050000 / 3)
+        self.assertEqual(by_row["Ask"].result("count"), 4)
+        self.assertIsNone(by_row["Ticker"].result("total"))
+
+    def test_skips_missing_and_non_numbers(self):
+        accumulator = Accumulator()
+        for value in (None, "", "x", True, 3, 1.5):
+            accumulator.add(value)
+        self.assertEqual((accumulator.count, accumulator.result("total"), accumulator.result("min")), (4, 4.5, 1.5))
+
+
+class TestTableFooters(unittest.TestCase):
+    def _table(self, **options):
+        block = dict({"type": "table", "field_map": FIELD_MAP, "aggregates": AGGREGATES, "renderer": "table"},
+                     **options)
+        return interpret_layout({"type": "column", "children": [block]}, ROWS)
+
+    def test_footer_rows(self):
+        """Footers are formatted with the column transform and take the label in a free column"""
+        table, = self._table()
+        self.assertEqual(table._cellvalues[-2:], [["Total", "$2,350.75", "21050000"], ["Rows", "", "3"]])
+
+    def test_footers_per_partition_and_chunk(self):
+        """group_by gets totals per partition; only the last chunk carries the footer"""
+        tables = [f for f in self._table(group_by="Exchange") if hasattr(f, "_cellvalues")]
+        self.assertEqual([t._cellvalues[-2][2] for t in tables], ["21000000", "50000"])
+        chunks = self._table(long_table=2)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[-1]._cellvalues[-2][0], "Total")
+
+    def test_footers_on_fast_path(self):
+        """FastTable draws footer rows in the footer face under a heavier rule, also in a split piece"""
+        table, = self._table(renderer="fast")
+        self.assertIsInstance(table, FastTable)
+        self.assertEqual(table.footer_rows, 2)
+        pieces = [table, table._piece(len(table.data) - 1, len(table.data))]
+        for piece, fonts in zip(pieces, (["Helvetica", "Helvetica-Bold"], ["Helvetica-Bold"])):
+            with self.subTest(start=piece.start):
+                piece.canv = mock.MagicMock()
+                piece.draw()
+                body_fonts = [call.args[0] for call in piece.canv.setFont.call_args_list[1:]]
+                self.assertEqual(body_fonts, fonts)
+                self.assertEqual(piece.canv.setLineWidth.call_args.args, (1.5,) if piece is table else (1,))
+
+    def test_columns_fit_footer_face(self):
+        """Auto column widths measure footer rows in the footer font, also with group_by"""
+        label = "Grand total over every exchange"
+        aggregates = [{"label": label, "columns": {"Volume1": "total"}}]
+        self.assertGreater(cell_width(label, FOOTER_FONT, 10), cell_width(label, "Helvetica", 10))
+        for options in ({}, {"group_by": "Exchange"}):
+            with self.subTest(**options):
+                tables = [f for f in self._table(aggregates=aggregates, **options) if hasattr(f, "_cellvalues")]
+                for table in tables:
+                    self.assertEqual(table._cellvalues[-1][0], label)
+                    self.assertAlmostEqual(table._colWidths[0], cell_width(label, FOOTER_FONT, 10) + 10)
+
+    def test_invalid_aggregates(self):
+        for aggregates in ({"columns": {"Volume1": "median"}}, {"columns": {"Nope": "total"}}, ["Total"]):
+            block = {"type": "table", "field_map": FIELD_MAP, "aggregates": aggregates}
+            with self.subTest(aggregates=aggregates), self.assertRaises(ValueError):
+                compile_layout({"type": "column", "children": [block]})
+
+
+class TestVariableAggregates(unittest.TestCase):
+    LAYOUT = {"type": "column", "children": [
+        {"type": "group", "group_name": "nasdaq", "data": ROWS, "filter": {"Exchange": "NASDAQ"}},
+        {"type": "variable", "label": "NASDAQ volume", "key": "Volume1", "group_name": "nasdaq",
+         "aggregate": "total", "transform": "volume_millions"},
+        {"type": "variable", "label": "Average ask", "key": "Ask", "aggregate": "avg"},
+        {"type": "variable", "label": "Rows", "key": "Ticker", "aggregate": "count"},
+    ]}
+
+    def test_values_and_single_pass(self):
+        """Every aggregated field of a row source is accumulated in one pass"""
+        with mock.patch("layout_lib.renderer.aggregate_rows", wraps=aggregate_rows) as spy:
+            flowables = interpret_layout(self.LAYOUT, ROWS[:3])
+        self.assertEqual([p.text for p in flowables],
+                         ["NASDAQ volume: 21.00M", "Average ask: 982.0333333333333", "Rows: 3"])
+        # One pass over the group's rows and one over data_rows
+        self.assertEqual(spy.call_count, 2)
+        self.assertEqual(compile_layout(self.LAYOUT).render(ROWS[:3])[:4], b"%PDF")
+
+
+if __name__ == '__main__':
+    unittest.main()
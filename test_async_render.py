@@ -0,0 +1,95 @@
+import asyncio
+import json
+import threading
+import unittest
+from layout_lib.async_render import AsyncRenderer, RenderQueueFull
+from layout_lib.compiled_layout import compile_layout
+
+LAYOUT = {
+    "type": "column",
+    "children": [
+        {"type": "variable", "label": "First", "key": "RIC"},
+        {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}]},
+    ],
+}
+
+
+def blocking_layout(release):
+    """A layout whose only cell waits for ``release`` while being rendered."""
+    def wait(value):
+        release.wait(5)
+        return str(value)
+
+    return {"type": "column", "children": [
+        {"type": "table", "field_map": [{"label": "RIC", "key": "RIC", "transform": wait}]},
+    ], "data_rows": [{"RIC": "A"}]}
+
+
+class TestAsyncRender(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.rows = json.load(f)
+
+    def test_concurrent_renders(self):
+        """Layouts, compiled layouts and async data sources render off the loop"""
+        async def rows():
+            for row in self.rows:
+                await asyncio.sleep(0)
+                yield row
+
+        async def main():
+            async with AsyncRenderer(max_workers=2) as renderer:
+                results = await asyncio.gather(
+                    renderer.render(dict(LAYOUT, data_rows=self.rows)),
+                    renderer.render(dict(LAYOUT, data_rows=iter(self.rows))),
+                    renderer.render(LAYOUT, data=rows()),
+                    renderer.render(compile_layout(dict(LAYOUT, data_rows=self.rows))),
+                )
+                self.assertEqual(renderer.pending, 0)
+            return results
+
+        for pdf in asyncio.run(main()):
+            self.assertTrue(pdf.startswith(b"%PDF"))
+
+    def test_backpressure_and_timeout(self):
+        """Slots stay taken until the worker finishes, even after a timeout"""
+        release = threading.Event()
+
+        async def main():
+            renderer = AsyncRenderer(max_workers=1, max_pending=1)
+            try:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await renderer.render(blocking_layout(release), timeout=0.05)
+                self.assertEqual(renderer.pending, 1)
+                with self.assertRaises(RenderQueueFull):
+                    await renderer.render(dict(LAYOUT, data_rows=self.rows), wait=False)
+
+                waiting = asyncio.ensure_future(renderer.render(dict(LAYOUT, data_rows=self.rows)))
+                await asyncio.sleep(0.05)
+                self.assertFalse(waiting.done())
+                release.set()
+                self.assertTrue((await waiting).startswith(b"%PDF"))
+            finally:
+                release.set()
+                renderer.close()
+
+        asyncio.run(main())
+
+    def test_process_executor(self):
+        """Process pools render picklable layouts and reject compiled ones"""
+        async def main():
+            async with AsyncRenderer("process", max_workers=1) as renderer:
+                pdf = await renderer.render(dict(LAYOUT, data_rows="data/data.json"))
+                with self.assertRaises(TypeError):
+                    await renderer.render(compile_layout(LAYOUT))
+                self.assertEqual(renderer.pending, 0)
+            return pdf
+
+        self.assertTrue(asyncio.run(main()).startswith(b"%PDF"))
+        with self.assertRaises(ValueError):
+            AsyncRenderer("fiber")
+
+
+if __name__ == '__main__':
+    unittest.main()
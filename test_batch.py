@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from layout_lib.batch import document_filename, main, partition_rows, render_batch, unique_paths
+
+LAYOUT = {
+    "type": "column",
+    "children": [
+        {"type": "group", "group_name": "client", "filter": "RIC=UNUSED"},
+        {"type": "variable", "label": "RIC", "key": "RIC", "group_name": "client"},
+        {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}, {"label": "Ask", "key": "Ask"}]},
+    ],
+}
+
+
+class TestBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.rows = json.load(f)
+
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_partition_single_pass(self):
+        """Partitions keep first-appearance order; rows without a key are counted"""
+        rows = [{"k": "b"}, {"k": "a"}, {"k": "b"}, {"x": 1}]
+        partitions, missing = partition_rows(rows, "k")
+        self.assertEqual(list(partitions), ["b", "a"])
+        self.assertEqual(len(partitions["b"]), 2)
+        self.assertEqual(missing, 1)
+        self.assertEqual(document_filename("{index}-{value}.pdf", "A/B C", 3), "3-A_B_C.pdf")
+
+    def test_render_in_process(self):
+        """One PDF per partition, with the partition as group and table data"""
+        report = render_batch(LAYOUT, self.rows, "RIC", self.out_dir, workers=0)
+        self.assertEqual([doc.value for doc in report.documents],
+                         list(dict.fromkeys(row["RIC"] for row in self.rows)))
+        self.assertFalse(report.failures)
+        for doc in report.documents:
+            self.assertTrue(os.path.getsize(doc.path) > 0)
+            self.assertEqual(doc.rows, 1)
+
+    def test_colliding_file_names(self):
+        """Values cleaned to the same file name get distinct paths instead of overwriting"""
+        rows = [{"RIC": "a/b", "Ask": 1}, {"RIC": "a_b", "Ask": 2}, {"RIC": "A_B", "Ask": 3}]
+        with self.assertLogs("layout_lib.batch", level="WARNING"):
+            report = render_batch(LAYOUT, rows, "RIC", self.out_dir, workers=0)
+        paths = [doc.path for doc in report.documents]
+        self.assertEqual([os.path.basename(path) for path in paths], ["a_b.pdf", "a_b-1.pdf", "A_B-2.pdf"])
+        self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+        self.assertEqual(unique_paths(["x.pdf", "x-1.pdf", "x.pdf"]), ["x.pdf", "x-1.pdf", "x-2.pdf"])
+
+    def test_process_pool_reports_failures(self):
+        """Worker failures are reported per document instead of raised"""
+        layout = dict(LAYOUT, children=LAYOUT["children"] + [{"type": "table", "field_map": []}])
+        report = render_batch(layout, self.rows[:2], "RIC", self.out_dir, workers=2)
+        self.assertEqual(len(report.failures), 2)
+        self.assertIn("Traceback", report.failures[0].error)
+        self.assertEqual(report.to_dict()["failed"], 2)
+
+        report = render_batch(LAYOUT, self.rows, "RIC", self.out_dir, data_rows=self.rows, workers=2)
+        self.assertFalse(report.failures)
+
+    def test_cli(self):
+        """The CLI renders every partition and writes the JSON report"""
+        layout_path = os.path.join(self.out_dir, "layout.json")
+        with open(layout_path, "w") as f:
+            json.dump(LAYOUT, f)
+        report_path = os.path.join(self.out_dir, "report.json")
+        status = main([layout_path, "data/data.json", "--key", "Exchange", "--out-dir", self.out_dir,
+                       "--workers", "0", "--table-data", "data/data.json", "--report", report_path])
+        self.assertEqual(status, 0)
+        with open(report_path) as f:
+            report = json.load(f)
+        self.assertEqual(report["succeeded"], len({row["Exchange"] for row in self.rows}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import copy
+import io
+import json
+import threading
+import unittest
+from unittest import mock
+from layout_lib.compiled_layout import compile_layout
+from layout_lib.document import generate_pdf_from_layout
+from layout_lib.renderer import resolve_groups
+
+
+def make_layout(rows, group_rows):
+    return {
+        "type": "column",
+        "children": [
+            {"type": "group", "group_name": "grp", "data": group_rows, "filter": "RIC=MSFT.O"},
+            {"type": "variable", "label": "Ticker", "key": "Ticker", "group_name": "grp"},
+            {"type": "variable", "label": "Ask", "key": "Ask", "transform": "lambda x: f'{x:.1f}'",
+             "group_name": "grp"},
+            {"type": "separator", "color": "blue", "dash": [2, 1]},
+            {"type": "row", "children": [
+                {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}],
+                 "negative_filter": ["RIC=AAPL.O"], "style": {"font_style": "bold"}},
+            ]},
+        ],
+        "data_rows": rows,
+    }
+
+
+class TestCompiledLayout(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.rows = json.load(f)
+
+    def test_render_outputs(self):
+        """render writes to paths and file objects or returns bytes"""
+        compiled = compile_layout(make_layout(self.rows, self.rows))
+        pdf = compiled.render()
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        buffer = io.BytesIO()
+        self.assertIsNone(compiled.render(self.rows[:2], out=buffer))
+        self.assertTrue(buffer.getvalue().startswith(b"%PDF"))
+
+    def test_groups_resolved_per_render_and_overridable(self):
+        """Group data is read at render time; group_context replaces it per render"""
+        group_rows = [dict(row) for row in self.rows]
+        layout = make_layout(self.rows, group_rows)
+        compiled = compile_layout(layout)
+        with mock.patch("layout_lib.renderer.resolve_groups", wraps=resolve_groups) as resolve, \
+                mock.patch("layout_lib.renderer.compile_field_map") as compile_field_map:
+            compiled.render()
+            group_rows[1] = dict(group_rows[1], Ticker="CHANGED")
+            compiled.render()
+            compiled.render(group_context={"grp": [self.rows[0]]})
+        self.assertEqual(resolve.call_count, 2)
+        self.assertEqual([call.args[1]["grp"][0]["Ticker"] for call in resolve.call_args_list], ["MSFT", "CHANGED"])
+        compile_field_map.assert_not_called()
+
+    def test_options_deep_copied(self):
+        """Nested options are copied at compile time, block data is shared"""
+        layout = make_layout(self.rows, self.rows)
+        compiled = compile_layout(layout)
+        table = layout["children"][4]["children"][0]
+        compiled_table = compiled.tree["children"][4]["children"][0]
+        table["style"]["font_style"] = "italic"
+        table["field_map"].append({"label": "Ask", "key": "Ask"})
+        self.assertEqual(compiled_table["style"], {"font_style": "bold"})
+        self.assertEqual(len(compiled_table["field_map"]), 1)
+        self.assertIs(compiled.tree["children"][0]["data"], layout["children"][0]["data"])
+
+    def test_layout_never_mutated_and_thread_safe(self):
+        """Concurrent renders of one compiled layout leave the layout untouched"""
+        layout = make_layout(self.rows, self.rows)
+        before = copy.deepcopy(layout)
+        compiled = compile_layout(layout)
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(5):
+                    self.assertTrue(compiled.render().startswith(b"%PDF"))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(layout, before)
+
+        generate_pdf_from_layout(layout, io.BytesIO())
+        self.assertEqual(layout, before)
+
+    def test_validation(self):
+        """Structural errors surface at compile time"""
+        invalid = [
+            {"type": "column", "children": [{"type": "table"}]},
+            {"type": "column", "children": [{"type": "chart"}]},
+            {"type": "stack", "children": []},
+            {"type": "column", "children": [{"type": "separator", "direction": "diagonal"}]},
+            {"type": "column", "children": [{"type": "variable", "key": "x", "transform": "lambda x: x.__class__"}]},
+            {"type": "column", "children": [{"type": "group", "group_name": "g", "data": []}]},
+            {"type": "column", "children": [{"type": "table", "field_map": [], "renderer": "gpu"}]},
+            {"type": "column", "children": [{"type": "table", "field_map": [], "negative_filter": "no-equals"}]},
+            {"type": "column", "children": [{"type": "table", "field_map": [], "style": {"body_background": "nope"}}]},
+        ]
+        for layout in invalid:
+            with self.assertRaises(ValueError, msg=layout):
+                compile_layout(layout)
+
+
+if __name__ == '__main__':
+    unittest.main()
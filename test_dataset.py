@@ -0,0 +1,88 @@
+import json
+import random
+import unittest
+from unittest import mock
+from layout_lib.dataset import Dataset, np
+from layout_lib.filter_utils import apply_filter, exclude_matching
+from layout_lib.table import build_body_rows
+
+CONDITIONS = [
+    "RIC=AAPL.O",
+    {"RIC": "GOOGL.O"},
+    {"Ask": {">": 100}},
+    {"Ask": {"<=": 175.25}},
+    {"Ask": "175.25"},
+    {"Ask": {"!=": None}},
+    {"Volume1": {"<=": 1000000}},
+    {"Volume1": {"in": [12500000, 3]}},
+    {"Currency": {"in": ["USD", "EUR"]}},
+    {"Exchange": {"not_in": ["NASDAQ"]}},
+    {"RIC": {"contains": "O"}},
+    {"Note": {"starts_with": "n"}},
+    {"Note": None},
+    {"and": [{"Exchange": "NASDAQ"}, {"Currency": "USD"}]},
+    {"or": [{"Exchange": "NASDAQ"}, {"not": {"Exchange": "COMEX"}}]},
+    {"and": [{"Ask": {">": 100}}, {"not": {"Last": {"<": 200}}}]},
+    {"invalid": {"$invalid": "value"}},
+]
+
+FIELD_MAP = [
+    {"label": "RIC", "key": "RIC"},
+    {"label": "Ask", "key": "Ask", "transform": "dollarize"},
+    {"label": "Volume", "key": "Volume1", "transform": "volume_millions"},
+    {"label": "Volumes", "key": "Volume1|Volume2", "transform": "join_lines"},
+    {"label": "Note", "key": "Note"},
+    {"label": "Last", "key": "Last"},
+]
+
+
+class TestDataset(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.rows = json.load(f)
+        rng = random.Random(3)
+        for row in cls.rows:
+            if rng.random() < 0.5:
+                row["Note"] = rng.choice(["note", "n/a", "other"])
+
+    def check_equivalent(self):
+        dataset = Dataset.from_rows(self.rows)
+        self.assertEqual(list(dataset), self.rows)
+        for condition in CONDITIONS:
+            self.assertEqual(list(dataset.filter(condition)), apply_filter(self.rows, condition), condition)
+        self.assertEqual(list(dataset.exclude(CONDITIONS[:3])), exclude_matching(self.rows, CONDITIONS[:3]))
+        self.assertEqual(
+            [[getattr(c, "text", c) for c in row] for row in build_body_rows(FIELD_MAP, dataset)],
+            [[getattr(c, "text", c) for c in row] for row in build_body_rows(FIELD_MAP, self.rows)],
+        )
+        return dataset
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_numpy_columns_match_row_semantics(self):
+        """Vectorized masks and column transforms agree with the row path"""
+        dataset = self.check_equivalent()
+        self.assertIsInstance(dataset.column("Volume1"), np.ndarray)
+        self.assertIsInstance(dataset.column("Note"), list)
+
+    def test_list_fallback_matches_row_semantics(self):
+        """Without numpy every column is a list with the same results"""
+        with mock.patch("layout_lib.dataset.np", None):
+            dataset = self.check_equivalent()
+            self.assertIsInstance(dataset.column("Volume1"), list)
+
+    def test_mixed_numbers_keep_python_types(self):
+        """Int/float mixes stay lists so ints still render without decimals"""
+        dataset = Dataset.from_rows([{"x": 5}, {"x": 2.5}, {"y": 1}])
+        self.assertIsInstance(dataset.column("x"), list)
+        self.assertEqual(list(dataset), [{"x": 5}, {"x": 2.5}, {"y": 1}])
+
+    def test_short_circuit_like_predicates(self):
+        """A later 'and' child is never evaluated on rows already rejected"""
+        rows = [{"kind": "num", "v": 3}, {"kind": "text", "v": "x"}]
+        condition = {"and": [{"kind": "num"}, {"v": {">": 1}}]}
+        self.assertEqual(list(Dataset.from_rows(rows).filter(condition)), rows[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from layout_lib.compiled_layout import compile_layout
+from layout_lib.document import PDF_CHUNK_SIZE, generate_pdf_from_layout, iter_chunks, iter_pdf, pdf_bytes_from_layout
+from layout_lib.profiling import RenderStats
+
+LAYOUT = {
+    "type": "column",
+    "children": [
+        {"type": "variable", "label": "First", "key": "RIC"},
+        {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}, {"label": "Ask", "key": "Ask"}]},
+    ],
+}
+
+
+class RecordingStream(io.RawIOBase):
+    """Write-only stream remembering the size of every write."""
+
+    def __init__(self):
+        self.writes = []
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, chunk):
+        self.writes.append(len(chunk))
+        self.data += chunk
+        return len(chunk)
+
+
+class TestDocumentOutput(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.layout = dict(LAYOUT, data_rows=json.load(f))
+
+    def test_outputs_match(self):
+        """Paths, file objects and returned bytes hold the same document"""
+        pdf = pdf_bytes_from_layout(self.layout)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+
+        buffer = io.BytesIO()
+        self.assertIsNone(generate_pdf_from_layout(self.layout, buffer))
+        stats = RenderStats()
+        self.assertIs(generate_pdf_from_layout(self.layout, io.BytesIO(), stats=stats), stats)
+        with self.assertRaises(ValueError):
+            generate_pdf_from_layout(self.layout, None)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.pdf")
+            generate_pdf_from_layout(self.layout, path)
+            with open(path, "rb") as f:
+                from_file = f.read()
+        # Only the creation timestamp and document id may differ
+        self.assertEqual(len(buffer.getvalue()), len(pdf))
+        self.assertEqual(len(from_file), len(pdf))
+
+    def test_chunked_streaming(self):
+        """Streams are written and yielded in bounded chunks"""
+        stream = RecordingStream()
+        compile_layout(self.layout).render(out=stream)
+        self.assertTrue(stream.data.startswith(b"%PDF"))
+        self.assertTrue(all(size <= PDF_CHUNK_SIZE for size in stream.writes))
+
+        chunks = list(iter_pdf(self.layout, chunk_size=512))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 512 for chunk in chunks))
+        self.assertTrue(b"".join(chunks).rstrip().endswith(b"%%EOF"))
+
+        chunks = list(compile_layout(self.layout).iter_render(chunk_size=1000))
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+        self.assertEqual(list(iter_chunks(b"abcde", 2)), [b"ab", b"cd", b"e"])
+        with self.assertRaises(ValueError):
+            iter_pdf(self.layout, chunk_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import json
+import random
+import unittest
+from unittest import mock
+from layout_lib.filter_utils import (
+    FilterEvaluator, FilterSet, apply_filter, compile_filter, exclude_matching, iter_excluding, parse_condition,
+)
+from layout_lib.filter_index import FilterIndex, IndexRegistry
+from layout_lib.renderer import interpret_layout
+
+
+class TestCompiledFilters(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.test_data = json.load(f)
+        cls.filter_evaluator = FilterEvaluator(cls.test_data)
+
+    def test_compiled_matches_interpreter(self):
+        """Compiled predicates agree with evaluate_condition row by row"""
+        conditions = [
+            {"RIC": "GOOGL.O"},
+            {"Ask": {">": 100}},
+            {"Volume1": {"<=": 1000000}},
+            {"Currency": {"in": ["USD", "EUR"]}},
+            {"Exchange": {"not_in": ["NASDAQ"]}},
+            {"RIC": {"contains": "O"}},
+            {"and": [{"Exchange": "NASDAQ"}, {"Currency": "USD"}]},
+            {"or": [{"Exchange": "NASDAQ"}, {"not": {"Exchange": "COMEX"}}]},
+            {"invalid": {"$invalid": "value"}},
+            {},
+        ]
+        for condition in conditions:
+            predicate = compile_filter(condition)
+            for item in self.test_data:
+                self.assertEqual(
+                    predicate(item),
+                    self.filter_evaluator.evaluate_condition(item, condition),
+                    condition,
+                )
+
+    def test_compiled_filter_is_cached(self):
+        """Equal specs share one compiled predicate"""
+        first = compile_filter({"and": [{"RIC": "GOOGL.O"}, {"Ask": {">": 1}}]})
+        second = compile_filter({"and": [{"RIC": "GOOGL.O"}, {"Ask": {">": 1}}]})
+        self.assertIs(first, second)
+        self.assertIs(compile_filter("RIC=GOOGL.O"), compile_filter("RIC=GOOGL.O"))
+
+    def test_legacy_condition(self):
+        """Legacy "field=value" strings parse to an equality test"""
+        self.assertEqual(parse_condition(" RIC = GOOGL.O "), ("cmp", "RIC", None, "GOOGL.O"))
+
+
+class TestFilterIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(3)
+        cls.rows = [
+            {
+                "RIC": f"R{i}.{rng.choice('ONL')}",
+                "Last": rng.choice([rng.uniform(0, 500), rng.randint(0, 500)]),
+                "Exchange": rng.choice(["NASDAQ", "NYSE", "COMEX"]),
+                "Currency": rng.choice(["USD", "EUR", None]),
+            }
+            for i in range(500)
+        ]
+        cls.index = FilterIndex(cls.rows)
+
+    def test_index_matches_scan(self):
+        """Index lookups return the same rows, in order, as a full scan"""
+        conditions = [
+            "Exchange=NYSE",
+            {"Currency": None},
+            {"Currency": {"!=": "USD"}},
+            {"Exchange": {"in": ["NYSE", "COMEX"]}},
+            {"Currency": {"not_in": ["USD", None]}},
+            {"Last": {">": 250}},
+            {"Last": {">=": 100}},
+            {"Last": {"<": 50.5}},
+            {"Last": {"<=": 400}},
+            {"RIC": {"starts_with": "R1"}},
+            {"RIC": {"ends_with": ".N"}},
+            {"or": [{"Exchange": "NYSE"}, {"and": [{"Last": {">": 300}}, {"not": {"Currency": "EUR"}}]}]},
+        ]
+        for condition in conditions:
+            self.assertEqual(
+                self.index.filter(condition),
+                compile_filter(condition).filter(self.rows),
+                condition,
+            )
+
+    def test_index_keeps_short_circuit(self):
+        """Range tests on mixed-type fields only see rows left by earlier terms"""
+        condition = {"and": [{"Currency": {"!=": None}}, {"Currency": {">": "EUR"}}]}
+        self.assertEqual(self.index.filter(condition), compile_filter(condition).filter(self.rows))
+        with self.assertRaises(TypeError):
+            self.index.filter({"Currency": {">": "EUR"}})
+
+    def test_nan_like_scan(self):
+        """NaN probes and values give the same rows with and without an index"""
+        nan = float("nan")
+        rows = [{"Last": nan}, {"Last": 1.0}, {"Last": float("nan")}, {"Last": 2.0}]
+        index = FilterIndex(rows)
+        for condition in ({"Last": nan}, {"Last": {"=": nan}}, {"Last": {"!=": nan}},
+                          {"Last": {"in": [nan, 1.0]}}, {"Last": {"not_in": [nan]}}, {"Last": 1.0}):
+            with self.subTest(condition=condition):
+                self.assertEqual(index.filter(condition), compile_filter(condition).filter(rows))
+
+    def test_apply_filter_with_index(self):
+        """apply_filter accepts an index built over the same list"""
+        result = apply_filter(self.rows, {"Exchange": "COMEX"}, self.index)
+        self.assertEqual(result, [r for r in self.rows if r["Exchange"] == "COMEX"])
+
+
+class TestFilterSet(unittest.TestCase):
+    def test_partition_matches_individual_filters(self):
+        """One pass gives every condition the rows apply_filter would"""
+        rows = [{"RIC": f"R{i % 30}", "Last": i % 11, "Flag": [True, 1, 1.0, None][i % 4], "Tags": ["x"] * (i % 2)}
+                for i in range(300)]
+        conditions = [f"RIC=R{i}" for i in range(30)] + [
+            {"RIC": "R3"},
+            {"Flag": True},
+            {"Flag": 1.0},
+            {"Flag": None},
+            {"Tags": ["x"]},
+            {"Tags": "x"},
+            {"RIC": {"in": ["R1", "R2", "R1"]}},
+            {"and": [{"RIC": "R4"}, {"Last": {">": 5}}]},
+            {"Last": {"<": 2}},
+            {"Missing": "R1"},
+        ]
+        filter_set = FilterSet(conditions)
+        buckets, errors = filter_set.partition(rows)
+        self.assertEqual(errors, {})
+        for condition, bucket in zip(conditions, buckets):
+            self.assertEqual(bucket, apply_filter(rows, condition), condition)
+        for row in rows[:50]:
+            expected = [n for n, condition in enumerate(conditions) if compile_filter(condition)(row)]
+            self.assertEqual(sorted(filter_set.matching(row)), expected)
+        self.assertEqual(list(iter_excluding(rows, conditions[:10])),
+                         [row for row in rows if not any(compile_filter(c)(row) for c in conditions[:10])])
+
+    def test_failing_condition_is_isolated(self):
+        """A condition raising on some row doesn't affect the others"""
+        rows = [{"A": 1}, {"A": "x"}, {"A": 2}]
+        buckets, errors = FilterSet([{"A": {">": 1}}, {"A": 2}]).partition(rows)
+        self.assertEqual(list(errors), [0])
+        self.assertIsInstance(errors[0], TypeError)
+        self.assertEqual(buckets[1], [{"A": 2}])
+
+
+class TestNegativeFilters(unittest.TestCase):
+    def test_duplicate_rows_excluded_by_position(self):
+        """Equal-but-distinct rows are judged on their own"""
+        rows = [{"RIC": "A"}, {"RIC": "B"}, {"RIC": "A"}, {"RIC": "C"}]
+        self.assertEqual(exclude_matching(rows, ["RIC=A"]), [{"RIC": "B"}, {"RIC": "C"}])
+        self.assertEqual(exclude_matching(rows, {"RIC": "Z"}), rows)
+
+    def test_indexed_exclusion_matches_scan(self):
+        """Exclusion through an index keeps the same rows as the single pass"""
+        rows = [{"RIC": f"R{i % 40}", "Last": i % 17} for i in range(400)]
+        filters = [f"RIC=R{i}" for i in range(0, 40, 3)] + [{"Last": {">": 14}}]
+        self.assertEqual(
+            exclude_matching(rows, filters, FilterIndex(rows)),
+            exclude_matching(rows, filters),
+        )
+
+    def test_failing_condition_skipped_per_row(self):
+        """With on_error a condition doesn't match the rows it raises on, whatever their order"""
+        rows = [{"A": 3}, {"A": "x"}, {"A": 0}, {"A": "y", "B": 1}]
+        errors = []
+        kept = list(iter_excluding(rows, [{"A": {">": 1}}, {"B": 1}], lambda c, e: errors.append(c)))
+        self.assertEqual(kept, [{"A": "x"}, {"A": 0}])
+        self.assertEqual(errors, [{"A": {">": 1}}])
+        self.assertEqual(exclude_matching(rows[::-1], [{"A": {">": 1}}, {"B": 1}], on_error=lambda c, e: None),
+                         kept[::-1])
+        with self.assertRaises(TypeError):
+            exclude_matching(rows, {"A": {">": 1}})
+
+    def test_render_scans_without_index(self):
+        """Table negative filters take the single pass unless an IndexRegistry is passed"""
+        rows = [{"RIC": f"R{i % 40}"} for i in range(400)]
+        layout = {"type": "column", "children": [
+            {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}], "negative_filter": ["RIC=R1"]}]}
+        with mock.patch("layout_lib.filter_index.FilterIndex.resolve") as resolve:
+            table, = interpret_layout(layout, rows)
+        resolve.assert_not_called()
+        self.assertEqual(len(table._cellvalues), 391)
+        table, = interpret_layout(layout, rows, indexes=IndexRegistry())
+        self.assertEqual(len(table._cellvalues), 391)
+
+
+if __name__ == '__main__':
+    unittest.main()
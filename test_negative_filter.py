@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import json
-from layout_lib.filter_utils import apply_filter
+from layout_lib.filter_utils import apply_filter, exclude_matching
 
 # Test data
 test_data = [
@@ -23,22 +23,13 @@ for i, obj in enumerate(test_data):
 print(f"\n🔍 Negative filters: {negative_filters}")
 print("\n🔍 Processing each negative filter:")
 
-excluded_indices = set()
-
 for filter_condition in negative_filters:
     print(f"\n  Processing: {filter_condition}")
     filtered_data = apply_filter(test_data, filter_condition)
     print(f"  Objects matching this filter: {len(filtered_data)}")
-    
-    for i, obj in enumerate(test_data):
-        if obj in filtered_data:
-            excluded_indices.add(i)
-            print(f"    → Excluding object {i}: {obj['RIC']}")
-
-print(f"\n🔍 Excluded indices: {excluded_indices}")
 
-# Keep only objects that were NOT excluded
-remaining_data = [obj for i, obj in enumerate(test_data) if i not in excluded_indices]
+# Keep only objects that were NOT excluded (matched by position, in one pass)
+remaining_data = exclude_matching(test_data, negative_filters)
 
 print(f"\n📋 Remaining data ({len(remaining_data)} objects):")
 for i, obj in enumerate(remaining_data):
@@ -0,0 +1,137 @@
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from layout_lib.render_cache import DirectoryCache, MemoryCache, RenderCache, UncacheableInput, render_key
+from layout_lib.sqlite_source import SqliteSource
+
+LAYOUT = {
+    "type": "column",
+    "children": [
+        {"type": "group", "group_name": "grp", "filter": "RIC=MSFT.O"},
+        {"type": "variable", "label": "Ask", "key": "Ask", "group_name": "grp"},
+        {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}]},
+    ],
+}
+
+
+class TestRenderCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.rows = json.load(f)
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_key_is_stable_and_content_addressed(self):
+        """Key order and data file paths don't change the key; any value does"""
+        layout = dict(LAYOUT, data_rows=self.rows)
+        reordered = {key: layout[key] for key in reversed(list(layout))}
+        reordered_rows = [dict(reversed(list(row.items()))) for row in self.rows]
+        self.assertEqual(render_key(layout), render_key(reordered, reordered_rows))
+
+        copy = os.path.join(self.tmp, "copy.json")
+        shutil.copy("data/data.json", copy)
+        self.assertEqual(render_key(LAYOUT, "data/data.json"), render_key(LAYOUT, copy))
+
+        changed = [dict(row) for row in self.rows]
+        changed[-1]["Ask"] = -1
+        self.assertNotEqual(render_key(LAYOUT, self.rows), render_key(LAYOUT, changed))
+        self.assertNotEqual(render_key(LAYOUT, self.rows), render_key(LAYOUT, self.rows, {"grp": {}}))
+
+    def test_key_encodes_types(self):
+        """Key types and tuples vs lists are part of the key; unencodable values are uncacheable"""
+        self.assertNotEqual(render_key(LAYOUT, [], {"grp": {1: "x"}}), render_key(LAYOUT, [], {"grp": {"1": "x"}}))
+        self.assertNotEqual(render_key(LAYOUT, [], {"grp": [(1, 2)]}), render_key(LAYOUT, [], {"grp": [[1, 2]]}))
+        self.assertNotEqual(render_key(LAYOUT, [{"A": (1,)}]), render_key(LAYOUT, [{"A": [1]}]))
+        self.assertEqual(render_key(LAYOUT, [], {"grp": {1: "x", "b": 2}}),
+                         render_key(LAYOUT, [], {"grp": {"b": 2, 1: "x"}}))
+        circular = []
+        circular.append(circular)
+        with self.assertRaises(UncacheableInput):
+            render_key(LAYOUT, [], {"grp": circular})
+
+    def test_hits_skip_rendering(self):
+        """A repeated render returns the stored PDF and counts hits and misses"""
+        cache = RenderCache()
+        layout = dict(LAYOUT, data_rows=self.rows)
+        pdf = cache.pdf_bytes_from_layout(layout)
+        with mock.patch("layout_lib.render_cache.pdf_bytes_from_layout") as generate:
+            self.assertEqual(cache.pdf_bytes_from_layout(dict(layout)), pdf)
+            buffer = io.BytesIO()
+            cache.generate_pdf_from_layout(dict(layout, data_rows=iter(self.rows)), buffer)
+        generate.assert_not_called()
+        self.assertEqual(buffer.getvalue(), pdf)
+        self.assertEqual((cache.metrics.hits, cache.metrics.misses), (2, 1))
+        self.assertAlmostEqual(cache.metrics.to_dict()["hit_ratio"], 2 / 3)
+
+    def test_lazy_sources_keyed_by_rows(self):
+        """A SQLite table is keyed by its file without querying it; one-shot iterators bypass the cache"""
+        db = os.path.join(self.tmp, "quotes.db")
+        with sqlite3.connect(db) as connection:
+            connection.execute("CREATE TABLE quotes (RIC TEXT, Ask REAL)")
+            connection.executemany("INSERT INTO quotes VALUES (?, ?)", [(r["RIC"], r["Ask"]) for r in self.rows])
+        connection.close()
+        table = dict(LAYOUT["children"][2], data=SqliteSource(db, "quotes"))
+        layout = dict(LAYOUT, children=[table])
+
+        cache = RenderCache()
+        before = cache.pdf_bytes_from_layout(layout)
+        with mock.patch.object(SqliteSource, "__iter__") as query:
+            self.assertEqual(cache.pdf_bytes_from_layout(layout), before)
+        query.assert_not_called()
+        filtered = dict(table, data=table["data"].filter("RIC=X"))
+        self.assertNotEqual(render_key(layout), render_key(dict(LAYOUT, children=[filtered])))
+        with sqlite3.connect(db) as connection:
+            connection.execute("UPDATE quotes SET RIC = 'CHANGED' WHERE rowid = 1")
+        connection.close()
+        # Coarse file system timestamps could otherwise hide the write
+        os.utime(db, ns=(0, os.stat(db).st_mtime_ns + 1))
+        self.assertNotEqual(cache.pdf_bytes_from_layout(layout), before)
+        self.assertEqual((cache.metrics.hits, cache.metrics.misses), (1, 2))
+
+        streamed = dict(LAYOUT, children=[dict(table, data=iter(self.rows))])
+        with self.assertLogs("layout_lib.render_cache", level="WARNING"):
+            pdf = cache.pdf_bytes_from_layout(streamed)
+        self.assertEqual(pdf[:4], b"%PDF")
+        self.assertEqual(cache.metrics.bypasses, 1)
+
+    def test_backends_evict_by_size(self):
+        """Memory and directory backends stay within their byte budgets"""
+        memory = MemoryCache(max_bytes=10)
+        memory.set("a", b"12345")
+        memory.set("b", b"12345")
+        memory.get("a")
+        memory.set("c", b"123")
+        self.assertIsNone(memory.get("b"))
+        self.assertEqual(memory.get("a"), b"12345")
+        self.assertEqual((memory.size, memory.evictions), (8, 1))
+        memory.set("huge", b"x" * 11)
+        self.assertIsNone(memory.get("huge"))
+
+        directory = DirectoryCache(os.path.join(self.tmp, "cache"), max_bytes=10)
+        directory.set("a", b"12345")
+        os.utime(directory._file("a"), (1, 1))
+        directory.set("b", b"12345")
+        directory.set("c", b"123")
+        self.assertIsNone(directory.get("a"))
+        self.assertEqual(directory.get("c"), b"123")
+        self.assertEqual(directory.evictions, 1)
+
+        cache = RenderCache(DirectoryCache(os.path.join(self.tmp, "shared")))
+        pdf = cache.pdf_bytes_from_layout(dict(LAYOUT, data_rows=self.rows))
+        other = RenderCache(DirectoryCache(os.path.join(self.tmp, "shared")))
+        self.assertEqual(other.pdf_bytes_from_layout(dict(LAYOUT, data_rows=self.rows)), pdf)
+        self.assertEqual(other.metrics.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from layout_lib.dataset import Dataset
+from layout_lib.document import generate_pdf_from_layout
+from layout_lib.filter_utils import exclude_matching, iter_excluding, iter_filter, apply_filter
+from layout_lib.renderer import interpret_layout
+from layout_lib.sources import (
+    CsvSource, IterableSource, JsonArraySource, JsonLinesSource, as_rows, iter_json_array, open_source,
+)
+
+
+class TestSources(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.rows = json.load(f)
+        cls.tmp = tempfile.mkdtemp()
+        cls.jsonl = os.path.join(cls.tmp, "rows.jsonl")
+        with open(cls.jsonl, "w") as f:
+            for row in cls.rows:
+                f.write(json.dumps(row) + "\n\n")
+        cls.csv = os.path.join(cls.tmp, "rows.csv")
+        with open(cls.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(cls.rows[0]))
+            writer.writeheader()
+            writer.writerows(cls.rows)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_json_array_in_small_chunks(self):
+        """Chunk boundaries anywhere in the document parse the same as json.load"""
+        for chunk_size in (1, 7, 64, 1 << 16):
+            self.assertEqual(list(JsonArraySource("data/data.json", chunk_size=chunk_size)), self.rows)
+        self.assertEqual(list(iter_json_array(io.StringIO("[1, 23456, \"x\", [] ]"), 2)), [1, 23456, "x", []])
+        self.assertEqual(list(iter_json_array(io.StringIO(" [ ] "))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO("{}")))
+
+    def test_file_sources_are_reiterable(self):
+        """Each pass reopens the file; CSV numbers come back as numbers"""
+        source = open_source(self.jsonl)
+        self.assertIsInstance(source, JsonLinesSource)
+        self.assertEqual(list(source), self.rows)
+        self.assertEqual(list(source), self.rows)
+        csv_rows = list(open_source(self.csv))
+        self.assertIsInstance(open_source(self.csv), CsvSource)
+        self.assertEqual(csv_rows, self.rows)
+        with self.assertRaises(ValueError):
+            open_source("rows.xlsx")
+
+    def test_one_shot_iterators(self):
+        """Generators can be read once; a second pass raises"""
+        source = as_rows(row for row in self.rows)
+        self.assertIsInstance(source, IterableSource)
+        self.assertEqual(list(source), self.rows)
+        with self.assertRaises(RuntimeError):
+            list(source)
+        self.assertIs(as_rows(self.rows), self.rows)
+
+    def test_generator_filter_stages(self):
+        """Streaming stages select the same rows as the list functions"""
+        negative = ["RIC=AAPL.O", {"Exchange": "COMEX"}]
+        self.assertEqual(list(iter_excluding(iter(self.rows), negative)), exclude_matching(self.rows, negative))
+        condition = {"Ask": {">": 100}}
+        self.assertEqual(list(iter_filter(iter(self.rows), condition)), apply_filter(self.rows, condition))
+
+    def test_render_from_streams(self):
+        """generate_pdf_from_layout reads paths and generators as data_rows"""
+        layout = {
+            "type": "column",
+            "children": [
+                {"type": "variable", "label": "First", "key": "RIC"},
+                {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}], "negative_filter": "RIC=AAPL.O"},
+            ],
+        }
+        out = os.path.join(self.tmp, "out.pdf")
+        for data_rows in (self.jsonl, self.csv, "data/data.json"):
+            generate_pdf_from_layout(dict(layout, data_rows=data_rows), out)
+            self.assertGreater(os.path.getsize(out), 0)
+
+        table_only = {"type": "column", "children": layout["children"][1:]}
+        generate_pdf_from_layout(dict(table_only, data_rows=(row for row in self.rows)), out)
+        self.assertGreater(os.path.getsize(out), 0)
+
+    def test_failing_negative_filter_on_streams(self):
+        """A condition raising on a row doesn't match it, the same for lists, streams and datasets"""
+        rows = [dict(row, Volume1="n/a") if n % 3 == 1 else row for n, row in enumerate(self.rows)]
+        layout = {"type": "column", "children": [
+            {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}],
+             "negative_filter": [{"Volume1": {">": 10000000}}, "Exchange=NYSE"]},
+        ]}
+        with self.assertLogs("layout_lib.renderer", level="WARNING") as logs:
+            expected, = interpret_layout(layout, rows)
+        self.assertIn("Negative filter error", logs.output[0])
+        kept = [row["RIC"] for row in rows if row.get("Exchange") != "NYSE"
+                and (isinstance(row["Volume1"], str) or row["Volume1"] <= 10000000)]
+        self.assertEqual([cells[0] for cells in expected._cellvalues[1:]], kept)
+        for data_rows in (iter(rows), IterableSource(reversed(rows)), Dataset.from_rows(rows)):
+            with self.subTest(data_rows=type(data_rows).__name__):
+                with self.assertLogs("layout_lib.renderer", level="WARNING") as logs:
+                    table, = interpret_layout(layout, data_rows)
+                self.assertIn("Negative filter error", logs.output[0])
+                cells = table._cellvalues[1:]
+                if isinstance(data_rows, IterableSource):
+                    cells = cells[::-1]
+                self.assertEqual([row[0] for row in cells], kept)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from layout_lib.document import generate_pdf_from_layout
+from layout_lib.filter_utils import OPERATORS, apply_filter, exclude_matching
+from layout_lib.renderer import interpret_layout, resolve_groups
+from layout_lib.sqlite_source import SqliteSource, filter_to_sql
+
+TYPES = {str: "TEXT", int: "INTEGER", float: "REAL"}
+
+
+class TestSqliteSource(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("data/data.json") as f:
+            cls.rows = json.load(f)
+        # One row without an Exchange, one with a NULL Currency
+        cls.rows = [dict(row) for row in cls.rows]
+        del cls.rows[1]["Exchange"]
+        cls.rows[2]["Currency"] = None
+        cls.tmp = tempfile.mkdtemp()
+        cls.db = os.path.join(cls.tmp, "quotes.db")
+        columns = {key: TYPES[type(value)] for key, value in cls.rows[0].items()}
+        with sqlite3.connect(cls.db) as connection:
+            connection.execute("CREATE TABLE quotes (%s)" % ", ".join(f'"{k}" {t}' for k, t in columns.items()))
+            for row in cls.rows:
+                connection.execute("INSERT INTO quotes (%s) VALUES (%s)" % (
+                    ", ".join(f'"{k}"' for k in row), ", ".join("?" * len(row))), list(row.values()))
+        connection.close()
+        # SQLite has no "missing key", so compare against rows with explicit None
+        cls.expected_rows = [{key: row.get(key) for key in columns} for row in cls.rows]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_filters_match_python(self):
+        """Pushed-down filters select the same rows as apply_filter"""
+        source = SqliteSource(self.db, "quotes")
+        conditions = [
+            "RIC=GOOGL.O",
+            "Volume1=12500000",  # legacy strings never equal numbers
+            {"Exchange": None},
+            {"Currency": {"!=": "USD"}},
+            {"Ask": {">": 150}},
+            {"Ask": {"<=": 175.25}},
+            {"RIC": {"in": ["AAPL.O", "MSFT.O", None]}},
+            {"Exchange": {"not_in": ["NASDAQ"]}},
+            {"Ticker": {"contains": "OO"}},
+            {"RIC": {"starts_with": "GO"}},
+            {"RIC": {"ends_with": ".O"}},
+            {"Ask": {"contains": "1"}},
+            {"Nope": {"=": None}},
+            {"or": [{"Exchange": "COMEX"}, {"not": {"Currency": "USD"}}]},
+            {"and": [{"Exchange": "NASDAQ"}, {"RIC": {"in": "AAPL.O MSFT.O"}}]},
+        ]
+        for condition in conditions:
+            with self.subTest(condition=condition):
+                self.assertEqual(list(source.filter(condition)), apply_filter(self.expected_rows, condition))
+
+        negative = ["RIC=AAPL.O", {"Ask": {">": 1000}}, {"Exchange": None}]
+        self.assertEqual(list(source.exclude(negative)), exclude_matching(self.expected_rows, negative))
+
+    def test_special_characters_in_path(self):
+        """Paths with '%', '?', '#' or spaces open the file they name"""
+        for name in ("q%41.db", "q?x#y.db", "my quotes%.db"):
+            with self.subTest(name=name):
+                path = os.path.join(self.tmp, name)
+                shutil.copy(self.db, path)
+                if name == "q%41.db":
+                    # What an unescaped "file:" URI would decode the name to
+                    open(os.path.join(self.tmp, "qA.db"), "w").close()
+                self.assertEqual(len(list(SqliteSource(path, "quotes"))), len(self.rows))
+
+    def test_sql_translation(self):
+        """Conditions become parameterized SQL; inexpressible ones are refused"""
+        affinities = {"RIC": "TEXT", "Ask": "REAL"}
+        sql, params = filter_to_sql({"and": ["RIC=A", {"Ask": {">": 1}}]}, affinities)
+        self.assertEqual(sql, '("RIC" IS ? AND ("Ask" IS NOT NULL AND "Ask" > ?))')
+        self.assertEqual(params, ["A", 1])
+        self.assertEqual(filter_to_sql({"Ask": "1"}, affinities)[0], '+"Ask" IS ?')
+        with self.assertRaises(ValueError):
+            filter_to_sql({"RIC": {"in": "ABC"}}, affinities)
+        with mock.patch.dict(OPERATORS, {"contains": lambda x, y: False}):
+            with self.assertRaises(ValueError):
+                filter_to_sql({"RIC": {"contains": "A"}}, affinities)
+
+        source = SqliteSource(self.db, "quotes").project(["RIC", "Missing"]).filter(
+            {"and": [{"Exchange": "NASDAQ"}, {"Ticker": {"in": "GOOGL"}}]})
+        sql, _, columns, predicates = source.query({"RIC": "TEXT", "Exchange": "TEXT", "Ticker": "TEXT"})
+        self.assertEqual(columns, ["RIC", "Ticker"])
+        self.assertIn('WHERE "Exchange" IS ?', sql)
+        self.assertEqual(len(predicates), 1)
+
+    def test_layout_pushdown(self):
+        """Tables select only mapped columns; groups and negative filters run in SQL"""
+        source = SqliteSource(self.db, "quotes")
+        layout = {"type": "column", "children": [
+            {"type": "group", "group_name": "grp", "data": source, "filter": "RIC=MSFT.O"},
+            {"type": "variable", "label": "Ask", "key": "Ask", "group_name": "grp"},
+            {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}, {"label": "V", "key": "Volume1|Volume2"}],
+             "negative_filter": ["RIC=AAPL.O", {"Ask": {"<": 10}}]},
+        ], "data_rows": source}
+
+        group_context = {}
+        resolve_groups(layout["children"], group_context)
+        self.assertEqual([row["RIC"] for row in group_context["grp"]], ["MSFT.O"])
+
+        seen = []
+        original = SqliteSource.query
+
+        def query(self, affinities):
+            result = original(self, affinities)
+            seen.append(result)
+            return result
+
+        with mock.patch.object(SqliteSource, "query", query):
+            flowables = interpret_layout(layout, source)
+        table_sql, _, columns, predicates = seen[-1]
+        self.assertEqual(columns, ["RIC", "Volume1", "Volume2"])
+        self.assertIn("NOT", table_sql)
+        self.assertEqual(predicates, [])
+        table_rows = flowables[-1]._cellvalues[1:]
+        expected = exclude_matching(self.expected_rows, layout["children"][2]["negative_filter"])
+        self.assertEqual([row[0] for row in table_rows], [row["RIC"] for row in expected])
+
+        out = os.path.join(self.tmp, "out.pdf")
+        generate_pdf_from_layout(layout, out)
+        self.assertGreater(os.path.getsize(out), 0)
+
+    def test_failing_negative_filter(self):
+        """A condition raising on a row doesn't match it; the other conditions still apply"""
+        layout = {"type": "column", "children": [
+            {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}],
+             "negative_filter": [{"Exchange": {"in": "NASDAQ"}}, "RIC=XAU="]},
+        ]}
+        with self.assertLogs("layout_lib.renderer", level="WARNING") as logs:
+            table, = interpret_layout(layout, SqliteSource(self.db, "quotes"))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Negative filter error", logs.output[0])
+        # The row without an Exchange is kept whatever its position
+        expected = [row["RIC"] for row in self.rows
+                    if "Exchange" not in row or row["Exchange"] not in "NASDAQ" and row["RIC"] != "XAU="]
+        self.assertIn(self.rows[1]["RIC"], expected)
+        self.assertEqual([row[0] for row in table._cellvalues[1:]], expected)
+        with self.assertLogs("layout_lib.renderer", level="WARNING"):
+            from_list, = interpret_layout(layout, self.expected_rows)
+        self.assertEqual(from_list._cellvalues, table._cellvalues)
+
+    def test_sort_by_unmapped_column(self):
+        """Columns only used for sorting are still selected from the database"""
+        source = SqliteSource(self.db, "quotes")
+        layout = {"type": "column", "children": [
+            {"type": "table", "field_map": [{"label": "RIC", "key": "RIC"}],
+             "sort_by": {"key": "Ask", "order": "desc"}, "top_n": 3},
+        ]}
+        table, = interpret_layout(layout, source)
+        expected = sorted(self.rows, key=lambda row: row["Ask"], reverse=True)[:3]
+        self.assertEqual([row[0] for row in table._cellvalues[1:]], [row["RIC"] for row in expected])
+
+
+if __name__ == '__main__':
+    unittest.main()
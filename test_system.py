@@ -1,8 +1,15 @@
 import json
+import logging
+import os
+import tempfile
 import unittest
 from reportlab.platypus import SimpleDocTemplate
-from layout_lib.renderer import interpret_layout
-from layout_lib.filter_utils import FilterEvaluator
+from unittest import mock
+from layout_lib.renderer import FlowableCache, interpret_layout, resolve_groups
+from layout_lib.filter_utils import FilterEvaluator, FilterSet
+from layout_lib.logging_utils import disable_logging, enable_logging
+from layout_lib.document import generate_pdf_from_layout
+from layout_lib.profiling import RenderStats
 
 class TestPDFTemplateSystem(unittest.TestCase):
     @classmethod
@@ -211,6 +218,44 @@ class TestPDFTemplateSystem(unittest.TestCase):
         flowables = interpret_layout(layout, self.test_data)
         doc.build(flowables)
 
+    def test_flowable_cache(self):
+        """Group-only and static blocks are built once per render in a grid"""
+        layout = {
+            "type": "grid",
+            "children": [
+                {"type": "variable", "label": "Ticker", "key": "RIC"},
+                {"type": "variable", "label": "Client", "key": "Ticker", "group_name": "grp"},
+                {"type": "separator", "length": 50, "dash": [2, 1]},
+            ]
+        }
+        group_context = {"grp": [self.test_data[0]]}
+        cache = FlowableCache()
+        flowables = interpret_layout(layout, self.test_data, group_context, flowable_cache=cache)
+        rows = flowables[0]._cellvalues
+        self.assertEqual(len(rows), len(self.test_data))
+        self.assertTrue(all(row[1] is rows[0][1] and row[2] is rows[0][2] for row in rows))
+        self.assertEqual(len({id(row[0]) for row in rows}), len({row["RIC"] for row in self.test_data}))
+        self.assertEqual(cache.misses, 2 + len({row["RIC"] for row in self.test_data}))
+
+        # Typed keys: equal but differently typed values render differently
+        layout = {"type": "column", "children": [{"type": "variable", "label": "V", "key": "v"}]}
+        texts = [interpret_layout(layout, [{"v": v}], flowable_cache=cache)[0].text for v in (1, 1.0, True)]
+        self.assertEqual(texts, ["V: 1", "V: 1.0", "V: True"])
+
+    def test_groups_resolved_in_one_pass(self):
+        """Groups over the same list share one partitioning pass"""
+        groups = [{"type": "group", "group_name": row["RIC"], "data": self.test_data, "filter": f"RIC={row['RIC']}"}
+                  for row in self.test_data]
+        groups.append({"type": "group", "group_name": "bad", "data": self.test_data, "filter": {"Ask": {">": "x"}}})
+        groups.append({"type": "group", "group_name": "none", "data": self.test_data, "filter": "RIC=NOPE"})
+        context = {}
+        with mock.patch("layout_lib.renderer.FilterSet", wraps=FilterSet) as filter_set:
+            resolve_groups(groups, context)
+        filter_set.assert_called_once()
+        for row in self.test_data:
+            self.assertEqual(context[row["RIC"]], [row])
+        self.assertEqual((context["bad"], context["none"]), ({}, {}))
+
     def test_transforms(self):
         """Test different transform approaches"""
         layout = {
@@ -353,5 +398,72 @@ class TestPDFTemplateSystem(unittest.TestCase):
         doc.build(flowables)
         print("✅ Table with transforms test completed")
 
+    def test_logging_instrumentation(self):
+        """Table blocks log a summary at INFO and payloads only at DEBUG"""
+        layout = {
+            "type": "column",
+            "children": [
+                {
+                    "type": "table",
+                    "negative_filter": "RIC=GOOGL.O",
+                    "field_map": [{"label": "RIC", "key": "RIC"}],
+                }
+            ]
+        }
+        with self.assertLogs("layout_lib", level="INFO") as logs:
+            interpret_layout(layout, self.test_data)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("after negative filters", logs.output[0])
+
+        with self.assertLogs("layout_lib", level="DEBUG") as logs:
+            interpret_layout(layout, self.test_data)
+        self.assertTrue(any(r.levelno == logging.DEBUG for r in logs.records))
+
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        library_logger = logging.getLogger("layout_lib")
+        library_logger.addHandler(handler)
+        disable_logging()
+        try:
+            interpret_layout(layout, self.test_data)
+        finally:
+            enable_logging()
+            library_logger.removeHandler(handler)
+        self.assertEqual(records, [])
+
+        # Unconfigured applications don't get warnings from logging.lastResort
+        self.assertTrue(any(isinstance(h, logging.NullHandler) for h in library_logger.handlers))
+        with mock.patch.object(logging, "lastResort") as last_resort, \
+                mock.patch.object(logging.getLogger(), "handlers", []):
+            logging.getLogger("layout_lib.renderer").warning("unseen")
+        last_resort.handle.assert_not_called()
+
+    def test_render_stats(self):
+        """Profiling records per-phase timings and counters"""
+        with open("layout.json") as f:
+            layout = json.load(f)
+        layout["data_rows"] = self.test_data
+        for block in layout["children"]:
+            if block.get("type") == "group":
+                block["data"] = self.group_data
+        layout["children"][-1]["style"].pop("col_widths")
+
+        seen = []
+        stats = RenderStats(callback=seen.append, track_allocations=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            result = generate_pdf_from_layout(layout, os.path.join(tmp, "stats.pdf"), stats=stats)
+            self.assertTrue(os.path.getsize(os.path.join(tmp, "stats.pdf")) > 0)
+
+        self.assertIs(result, stats)
+        self.assertEqual(len(seen), len(stats.records))
+        totals = stats.totals()
+        for phase in ("group_filter", "negative_filter", "transform", "column_widths",
+                      "table_build", "block", "layout", "doc_build", "write", "render"):
+            self.assertIn(phase, totals)
+        self.assertEqual(totals["transform"]["rows"], len(self.test_data) - 1)
+        self.assertIsNotNone(stats.records[0].alloc_bytes)
+        self.assertEqual(json.loads(stats.to_json())["totals"].keys(), totals.keys())
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,302 @@
+import unittest
+from layout_lib.field_map import compile_field_map
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph
+from layout_lib.fast_table import FastTable, is_fast_table_eligible
+from layout_lib.renderer import interpret_layout
+from layout_lib.dataset import Dataset
+from layout_lib.table import build_body_rows, build_data_table, build_table, order_rows, parse_field_map, partition_rows, table_order
+from layout_lib.text_metrics import cell_width, estimate_col_widths, text_width
+from layout_lib.transform_utils import apply_transforms
+
+FIELD_MAP = [
+    {
+        "label": "Financial Data",
+        "group": True,
+        "children": [
+            {"label": "Ticker", "key": "Ticker"},
+            {
+                "label": "Price",
+                "group": True,
+                "children": [
+                    {"label": "Ask", "key": "Ask", "transform": "dollarize"},
+                    {"label": "Bid", "key": "Bid", "transform": "dollarize"},
+                ]
+            },
+            {"label": "Volume", "key": "Volume1|Volume2", "transform": "join_pipes"},
+        ]
+    },
+    {"label": "Exchange", "key": "Exchange"},
+]
+
+ROWS = [
+    {"Ticker": "AAPL", "Ask": 175.25, "Bid": 175.2, "Volume1": 1, "Volume2": 2, "Exchange": "NASDAQ"},
+    {"Ticker": "MSFT", "Ask": 420.1, "Bid": 420.05, "Volume1": 3, "Volume2": 4, "Exchange": "NASDAQ"},
+]
+
+
+class TestFieldMapPlan(unittest.TestCase):
+    def test_plan_headers_and_spans(self):
+        """Header rows, leaf keys and SPANs are computed once per field map"""
+        plan = compile_field_map(FIELD_MAP)
+        self.assertEqual(plan.header_rows(), [
+            ["Financial Data", "", "", "", "Exchange"],
+            ["Ticker", "Price", "", "Volume", ""],
+            ["", "Ask", "Bid", "", ""],
+        ])
+        self.assertEqual(plan.final_keys, ["Ticker", "Ask", "Bid", "Volume1|Volume2", "Exchange"])
+        self.assertEqual(plan.leaves[3].keys, ("Volume1", "Volume2"))
+        self.assertIn(('SPAN', (1, 1), (2, 1)), plan.span_commands())
+        self.assertIn(('SPAN', (4, 0), (4, 2)), plan.span_commands())
+        self.assertEqual(parse_field_map(FIELD_MAP), (plan.header_rows(), plan.final_keys))
+
+    def test_plan_cached_by_content(self):
+        """Equal field maps share one plan, header copies are independent"""
+        plan = compile_field_map(FIELD_MAP)
+        self.assertIs(compile_field_map([dict(f) for f in FIELD_MAP]), plan)
+        plan.header_rows()[0].append("x")
+        self.assertEqual(len(plan.header_rows()[0]), 5)
+
+    def test_apply_transforms_nesting(self):
+        """apply_transforms nests values under group labels"""
+        rows = apply_transforms(FIELD_MAP, ROWS[:1])
+        self.assertEqual(rows, [{
+            "Financial Data": {
+                "Ticker": "AAPL",
+                "Price": {"Ask": "$175.25", "Bid": "$175.20"},
+                "Volume": "1 | 2",
+            },
+            "Exchange": "NASDAQ",
+        }])
+
+
+class TestBodyRows(unittest.TestCase):
+    def test_single_pass_matches_legacy_pipeline(self):
+        """Source rows map to the same cells as apply_transforms + build_data_table"""
+        legacy = build_data_table(FIELD_MAP, apply_transforms(FIELD_MAP, ROWS))
+        plan = compile_field_map(FIELD_MAP)
+        self.assertEqual(plan.header_rows() + build_body_rows(FIELD_MAP, ROWS), legacy)
+
+    def test_transform_applied_once(self):
+        """A non-idempotent transform is not applied a second time"""
+        field_map = [{"label": "Pct", "key": "Chg", "transform": "lambda x: str(x) + '%'"}]
+        self.assertEqual(build_body_rows(field_map, [{"Chg": 1.5}]), [["1.5%"]])
+
+    def test_multiline_cells_become_paragraphs(self):
+        """Multi-line values are wrapped in Paragraphs"""
+        field_map = [{"label": "Vol", "key": "Volume1|Volume2", "transform": "join_lines"}]
+        [[cell]] = build_body_rows(field_map, ROWS[:1])
+        self.assertIsInstance(cell, Paragraph)
+
+
+class TestColumnWidths(unittest.TestCase):
+    def test_text_width_matches_stringwidth(self):
+        """Cached per-character widths add up to ReportLab's measurement"""
+        for font in ("Helvetica", "Helvetica-BoldOblique", "Courier", "Times-Roman"):
+            for text in ("AAPL.O", "$1,234.56", "Volume Traded", "WWW iii"):
+                self.assertAlmostEqual(text_width(text, font, 9), stringWidth(text, font, 9))
+
+    def test_multiline_cells_use_widest_line(self):
+        """Multi-line strings and Paragraphs are sized by their longest line"""
+        self.assertAlmostEqual(cell_width("a\nlonger line", "Helvetica", 10),
+                               stringWidth("longer line", "Helvetica", 10))
+        [[paragraph]] = build_body_rows(
+            [{"label": "V", "key": "A|B", "transform": "join_lines"}], [{"A": "x", "B": "wider text"}])
+        self.assertAlmostEqual(cell_width(paragraph, "Courier", 20),
+                               stringWidth("wider text", "Helvetica", 10))
+
+    def test_header_measured_in_resolved_face(self):
+        """Header rows use the bold/italic face, body rows the cell font"""
+        data = [["Header"], ["b"]]
+        [width] = estimate_col_widths(data, 1, "Helvetica-Bold", 12, "Helvetica", 8, padding=0)
+        self.assertAlmostEqual(width, stringWidth("Header", "Helvetica-Bold", 12))
+
+    def test_width_strategies(self):
+        """Sampled keeps the longest cells, percentile ignores outliers"""
+        data = [["H"]] + [["x" * 5]] * 99 + [["x" * 80]]
+        exact = estimate_col_widths(data, 1, "Helvetica", 10, padding=0)
+        sampled = estimate_col_widths(data, 1, "Helvetica", 10, strategy="sampled", sample_size=3, padding=0)
+        capped = estimate_col_widths(data, 1, "Helvetica", 10, strategy="percentile", percentile=95, padding=0)
+        self.assertEqual(exact, sampled)
+        self.assertAlmostEqual(capped[0], stringWidth("x" * 5, "Helvetica", 10))
+        with self.assertRaises(ValueError):
+            estimate_col_widths(data, 1, "Helvetica", 10, strategy="guess")
+
+
+class TestLongTable(unittest.TestCase):
+    def _build(self, count, long_table):
+        rows = [dict(ROWS[0], Ticker=f"T{i}") for i in range(count)]
+        plan = compile_field_map(FIELD_MAP)
+        data = plan.header_rows() + build_body_rows(plan, rows)
+        block = {"field_map": FIELD_MAP, "data_rows": rows, "long_table": long_table}
+        return build_table(data, block)
+
+    def test_chunks_repeat_header_with_fixed_widths(self):
+        """Each chunk carries the full header and the same column widths"""
+        chunks = self._build(250, 100)
+        self.assertEqual([len(t._cellvalues) for t in chunks], [103, 103, 53])
+        header = compile_field_map(FIELD_MAP).header_rows()
+        for table in chunks:
+            self.assertEqual(table._cellvalues[:3], header)
+            self.assertEqual(table.repeatRows, 3)
+            self.assertEqual(table._colWidths, chunks[0]._colWidths)
+        self.assertEqual(chunks[2]._cellvalues[3][0], "T200")
+
+    def test_short_or_disabled_stays_single_table(self):
+        """Tables within one chunk, or without the option, are not split"""
+        self.assertFalse(isinstance(self._build(50, True), list))
+        self.assertFalse(isinstance(self._build(250, False), list))
+        with self.assertRaises(ValueError):
+            self._build(250, -1)
+
+    def test_chunks_flattened_into_column_layout(self):
+        """A long table contributes one flowable per chunk to the story"""
+        rows = [dict(ROWS[0], Ticker=f"T{i}") for i in range(30)]
+        layout = {"type": "column", "children": [
+            {"type": "table", "field_map": FIELD_MAP, "long_table": 10},
+        ]}
+        self.assertEqual(len(interpret_layout(layout, rows)), 3)
+
+
+class TestFastTable(unittest.TestCase):
+    def _build(self, count, renderer, rows=None):
+        rows = rows or [dict(ROWS[0], Ticker=f"T{i}") for i in range(count)]
+        plan = compile_field_map(FIELD_MAP)
+        data = plan.header_rows() + build_body_rows(plan, rows)
+        block = {"field_map": FIELD_MAP, "data_rows": rows, "renderer": renderer}
+        return build_table(data, block)
+
+    def test_renderer_selection(self):
+        """"fast" forces FastTable, "auto" only for large plain tables"""
+        self.assertIsInstance(self._build(10, "fast"), FastTable)
+        self.assertNotIsInstance(self._build(10, "auto"), FastTable)
+        self.assertIsInstance(self._build(600, "auto"), FastTable)
+        self.assertNotIsInstance(self._build(600, "table"), FastTable)
+        with self.assertRaises(ValueError):
+            self._build(10, "canvas")
+
+    def test_multiline_cells_fall_back(self):
+        """Paragraph cells are not eligible and use the platypus Table"""
+        rows = [dict(ROWS[0], Volume1="a\nb")]
+        field_map = [{"label": "V", "key": "Volume1"}]
+        self.assertFalse(is_fast_table_eligible(build_body_rows(field_map, rows), 0))
+        with self.assertLogs("layout_lib.table", level="WARNING"):
+            table = self._build(0, "fast", [dict(ROWS[0], Ticker="a\nb")])
+        self.assertNotIsInstance(table, FastTable)
+
+    def test_split_slices_row_range(self):
+        """Splitting yields pieces over the shared data with the header on each"""
+        table = self._build(100, "fast")
+        header_height = 3 * table.header_height
+        first, rest = table.split(500, header_height + 10.5 * table.row_height)
+        self.assertIs(first.data, rest.data)
+        self.assertEqual((first.start, first.stop, rest.start, rest.stop), (3, 13, 13, 103))
+        self.assertAlmostEqual(first.wrap(500, 1000)[1], header_height + 10 * table.row_height)
+        self.assertEqual(table.split(500, header_height), [])
+        self.assertEqual(rest.split(500, 10 ** 6), [rest])
+
+
+class TestGroupBy(unittest.TestCase):
+    ROWS = [
+        dict(ROWS[0], Exchange="NYSE"),
+        dict(ROWS[1]),
+        dict(ROWS[0], Ticker="IBM", Exchange="NYSE"),
+        dict(ROWS[1], Ticker="GE", Exchange=None),
+        dict(ROWS[1], Ticker="T", Exchange="A&B"),
+    ]
+
+    def test_partition_order_and_dataset(self):
+        """Partitions keep first-appearance order, and Datasets split the same way"""
+        partitions = partition_rows(self.ROWS, ("Exchange",))
+        self.assertEqual([value for value, _ in partitions], ["NYSE", "NASDAQ", None, "A&B"])
+        self.assertEqual([row["Ticker"] for row in partitions[0][1]], ["AAPL", "IBM"])
+        columnar = partition_rows(Dataset.from_rows(self.ROWS), ("Exchange",))
+        self.assertEqual([(value, list(rows)) for value, rows in columnar],
+                         [(value, rows) for value, rows in partitions])
+        pairs = partition_rows(iter(self.ROWS), ("Exchange", "Ticker"))
+        self.assertEqual(pairs[0][0], ("NYSE", "AAPL"))
+
+    def test_section_per_key_shares_widths(self):
+        """Each partition gets a sub-header and a table, all with the same column widths"""
+        layout = {"type": "column", "children": [
+            {"type": "table", "field_map": FIELD_MAP, "group_by": "Exchange", "renderer": "table",
+             "group_label": "{value} ({rows})"}
+        ]}
+        flowables = interpret_layout(layout, iter(self.ROWS))
+        headers = [f for f in flowables if isinstance(f, Paragraph)]
+        tables = [f for f in flowables if not isinstance(f, Paragraph)]
+        self.assertEqual([h.text for h in headers],
+                         ["NYSE (2)", "NASDAQ (1)", "(1)", "A&amp;B (1)"])
+        self.assertEqual([len(t._cellvalues) - 3 for t in tables], [2, 1, 1, 1])
+        self.assertEqual(len({tuple(t._colWidths) for t in tables}), 1)
+
+    def test_sections_expand_in_rows_and_grids(self):
+        """Row and grid layouts expand grouped and chunked tables into cells like a column does"""
+        grouped = {"type": "table", "field_map": FIELD_MAP, "group_by": "Exchange", "renderer": "table",
+                   "data": self.ROWS}
+        chunked = {"type": "table", "field_map": FIELD_MAP, "long_table": 2, "renderer": "table", "data": self.ROWS}
+        for block, count in ((grouped, 8), (chunked, 3)):
+            self.assertEqual(len(interpret_layout({"type": "column", "children": [block]}, [])), count)
+            # Grids lay blocks out on their own, or once per data row
+            for layout_type, data_rows in (("row", []), ("grid", []), ("grid", self.ROWS[:1])):
+                with self.subTest(layout_type=layout_type, rows=len(data_rows), block=block.get("group_by")):
+                    layout = {"type": layout_type, "columns": 1, "children": [block]}
+                    table, = interpret_layout(layout, data_rows)
+                    cells = table._cellvalues[0]
+                    self.assertEqual(len(cells), count)
+                    self.assertFalse(any(isinstance(cell, list) for cell in cells))
+
+    def test_group_label_fields_only(self):
+        """group_label allows only {key}, {value} and {rows}, with the key escaped too"""
+        block = {"type": "table", "field_map": [{"label": "A&B", "key": "A&B"}], "group_by": "A&B",
+                 "group_label": "{key!s:>6}|{value}"}
+        header, _ = interpret_layout({"type": "column", "children": [block]}, [{"A&B": "<x>"}])
+        self.assertEqual(header.text, "A&amp;B|&lt;x&gt;")
+        for label in ("{value.__class__}", "{value[0]}", "{0}", "{}", "{other}", "{value:>99999999}", "{"):
+            with self.subTest(label=label), self.assertRaises(ValueError):
+                interpret_layout({"type": "column", "children": [dict(block, group_label=label)]}, [{"A&B": 1}])
+
+
+class TestOrdering(unittest.TestCase):
+    ROWS = [{"Ticker": f"T{i}", "Exchange": "NYSE" if i % 3 else "NASDAQ", "Volume1": (i * 37) % 11}
+            for i in range(40)] + [{"Ticker": "NONE", "Exchange": "NYSE"}]
+
+    def _expected(self, sort_by):
+        rows = [r for r in self.ROWS if "Volume1" in r]
+        for field, descending in reversed(sort_by):
+            rows.sort(key=lambda r: r[field], reverse=descending)
+        return rows + [r for r in self.ROWS if "Volume1" not in r]
+
+    def test_sort_top_n_and_offset(self):
+        """Heap top-N and offsets match a stable full sort, missing values last"""
+        sort_by, offset, limit = table_order({"sort_by": ["Exchange", {"key": "Volume1", "order": "desc"}],
+                                              "top_n": 7, "offset": 2})
+        expected = self._expected(sort_by)
+        self.assertEqual(order_rows(iter(self.ROWS), sort_by, offset, limit), expected[2:9])
+        self.assertEqual(order_rows(self.ROWS, sort_by), expected)
+        desc = (("Volume1", True),)
+        self.assertEqual(order_rows(self.ROWS, desc, 0, 41), self._expected(desc))
+        columnar = order_rows(Dataset.from_rows(self.ROWS), sort_by, offset, limit)
+        self.assertEqual(list(columnar), expected[2:9])
+        numeric = order_rows(Dataset.from_rows(self.ROWS[:-1]), desc, 0, 5)
+        self.assertEqual(list(numeric), self._expected(desc)[:5])
+
+    def test_unsorted_window_stops_reading(self):
+        """Without sort_by an iterator is sliced lazily"""
+        source = iter(self.ROWS)
+        layout = {"type": "column", "children": [
+            {"type": "table", "field_map": [{"label": "T", "key": "Ticker"}], "offset": 3, "limit": 2}
+        ]}
+        table, = interpret_layout(layout, source)
+        self.assertEqual([row[0] for row in table._cellvalues[1:]], ["T3", "T4"])
+        self.assertEqual(next(source)["Ticker"], "T5")
+
+    def test_invalid_options(self):
+        for block in ({"sort_by": [{"key": "Ask", "order": "up"}]}, {"limit": -1},
+                      {"limit": 2, "top_n": 3}, {"offset": "1"}, {"sort_by": [1]}):
+            with self.subTest(block=block), self.assertRaises(ValueError):
+                table_order(block)
+
+
+if __name__ == '__main__':
+    unittest.main()
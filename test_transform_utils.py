@@ -0,0 +1,76 @@
+import unittest
+from layout_lib.transform_utils import (apply_transforms, compile_lambda, parse_lambda, resolve_transform,
+                                        MAX_TRANSFORM_LENGTH, TRANSFORMS)
+
+
+class TestLambdaTransforms(unittest.TestCase):
+    def test_lambda_formatting(self):
+        """Lambda strings compile to working callables"""
+        price = parse_lambda("lambda x: f'${float(x):,.2f}' if x else '-'")
+        self.assertEqual(price(1234.5), "$1,234.50")
+        self.assertEqual(price(""), "-")
+
+        pair = parse_lambda("lambda v: v[0].upper() + ' / ' + str(round(v[1] * 100, 1)) + '%'")
+        self.assertEqual(pair(["aapl", 0.1234]), "AAPL / 12.3%")
+
+    def test_lambda_is_cached(self):
+        """The same expression text compiles once per process"""
+        self.assertIs(parse_lambda("lambda x: x * 2"), parse_lambda("  lambda x: x * 2 "))
+        self.assertGreater(compile_lambda.cache_info().hits, 0)
+
+    def test_unsafe_lambdas_rejected(self):
+        """Anything outside the restricted grammar raises ValueError"""
+        unsafe = [
+            "lambda x: __import__('os').system('true')",
+            "lambda x: x.__class__.__mro__",
+            "lambda x: open('/etc/passwd').read()",
+            "lambda x: (lambda: 1)()",
+            "lambda x: [c for c in x]",
+            "lambda x: x ** 99999999",
+            "lambda x, *rest: x",
+            "lambda __mul: __mul",
+            "lambda x: x.upper",
+            "x + 1",
+        ]
+        for expression in unsafe:
+            with self.assertRaises(ValueError, msg=expression):
+                parse_lambda(expression)
+
+    def test_string_sizes_bounded(self):
+        """Repetition, padding and format widths past MAX_TRANSFORM_LENGTH raise when called"""
+        huge = MAX_TRANSFORM_LENGTH + 1
+        bounded = [
+            "lambda x: 'a' * x",
+            "lambda x: [0] * x",
+            "lambda x: 'a'.ljust(x)",
+            "lambda x: 'a'.zfill(width=x)",
+            "lambda x: format(1, '>' + str(x))",
+            "lambda x: f'{1.5:.{x}f}'",
+            "lambda x: f'{x!r:>{x}}'",
+            "lambda x: ('%' + str(x) + 's') % 'a'",
+            "lambda x: '%*d' % (x, 1)",
+            "lambda x: ('a' * 100).replace('', 'b' * 100)",
+            "lambda x: ('a' * 200).join('b' * 200)",
+        ]
+        for expression in bounded:
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                parse_lambda(expression)(huge)
+        self.assertEqual(parse_lambda("lambda x: f'{x!r:*>6}' + x.zfill(4) + '%5.1f' % 2")("ab"), "**'ab'00ab  2.0")
+        self.assertEqual(parse_lambda("lambda x: '-' * x")(3), "---")
+
+    def test_resolve_transform(self):
+        """Names, lambdas and callables resolve to callables"""
+        self.assertIs(resolve_transform("dollarize"), TRANSFORMS["dollarize"])
+        self.assertIs(resolve_transform(len), len)
+        self.assertIsNone(resolve_transform(None))
+        self.assertEqual(resolve_transform("lambda x: x + 1")(1), 2)
+
+    def test_apply_transforms_with_lambda(self):
+        """apply_transforms accepts lambda transforms in the field map"""
+        field_map = [{"label": "Vol", "key": "Volume1", "transform": "lambda x: str(x // 1000) + 'K'"}]
+        rows = apply_transforms(field_map, [{"Volume1": 12500000}])
+        self.assertEqual(rows, [{"Vol": "12500K"}])
+
+
+if __name__ == '__main__':
+    unittest.main()